@@ -1,15 +1,47 @@
 from google.adk.agents import Agent
-from google.adk.models.lite_llm import LiteLlm
+from google.adk.apps import App
 from google.adk.runners import InMemoryRunner
+
+from adk_common.ollama import OllamaSettings, ollama_llm
+from adk_common.payload_store import PayloadPlugin, default_store
+from adk_common.response_cache import CachedLlm, ResponseCache
+from adk_common.telemetry import TelemetryPlugin, setup_from_env
+from adk_common.tool_budget import ToolOutputBudget
+
 from .tools.tools import search_web, read_website
 
 # --- Configuration ---
-ollama_model = LiteLlm(
-    model="ollama_chat/llama3.1:8b", 
+# keep_alive keeps llama3.1 in memory for 30 minutes after the last request, so a
+# question after a break does not pay the model load again. num_parallel must match
+# the server: start it with `OLLAMA_NUM_PARALLEL=4 ollama serve`.
+ollama_settings = OllamaSettings(keep_alive="30m", num_ctx=8192, num_parallel=4)
+llama = ollama_llm(
+    "ollama_chat/llama3.1:8b",
     api_base="http://localhost:11434",
+    settings=ollama_settings,
+    # Start loading llama3.1 as the first question comes in, while LiteLlm is still being
+    # imported; importing this module makes no network call. A server with a startup
+    # hook can `await llama.warm_up()` there instead.
+    warm_up_on_first_call=True,
     temperature=0.3 # Slightly higher temp for better writing flow
 )
 
+# Repeated questions (and tool turns whose search/page results are identical) are
+# answered from the cache for 10 minutes instead of running llama3.1 again.
+ollama_model = CachedLlm(
+    llm=llama,
+    cache=ResponseCache(ttl_seconds=600, max_entries=200),
+)
+
+# Every tool result is re-sent on every later turn, and on llama3.1 each of those
+# tokens is prefill time. Drop `raw_results` (the `sources` list already has the
+# titles and links), cap each page and keep all tool output of one call under
+# ~2,400 of the 8,192 context tokens. Tokens per tool land in state["tool_tokens"].
+tool_budget = ToolOutputBudget(
+    turn_budget=2_400,
+    tool_budgets={"search_web": 400, "read_website": 1_200},
+)
+
 # --- The "Journalist" Agent ---
 root_agent = Agent(
     name="investigative_journalist",
@@ -31,6 +63,15 @@ root_agent = Agent(
     * Cite your sources naturally (e.g., "According to the official gov.cn portal...").
     """,
     tools=[search_web, read_website],
+    after_tool_callback=tool_budget.after_tool_callback,
+    before_model_callback=tool_budget.before_model_callback,
 )
 
-runner = InMemoryRunner(agent=root_agent)
\ No newline at end of file
+# Spans and metrics for every agent, model call and tool call (see adk_common/telemetry.py).
+# Set ADK_METRICS_PORT and/or OTEL_EXPORTER_OTLP_ENDPOINT to export them.
+setup_from_env()
+# Scraped pages and raw search results are stored once on disk and referenced by handle in the
+# session; the model still gets the full text (see adk_common/payload_store.py).
+# The plugins are registered on the App, so `adk web` (which loads `app`) runs them too.
+app = App(name="helpful_agent_ollama", root_agent=root_agent, plugins=[PayloadPlugin(default_store), TelemetryPlugin()])
+runner = InMemoryRunner(app=app)
@@ -1,6 +1,9 @@
-from duckduckgo_search import DDGS
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+
+from adk_common.cpu_pool import cpu_bound
+
+# duckduckgo_search, requests and BeautifulSoup are imported inside the tools, so
+# loading the agent (e.g. `adk web` listing it) does not import them.
 
 # --- Tool 1: The Searcher ---
 def search_web(query: str) -> dict:
@@ -9,6 +12,8 @@ def search_web(query: str) -> dict:
     Use this to find WHERE to look for information.
     """
     try:
+        from duckduckgo_search import DDGS
+
         # Get top 5 results to have a good pool of sources
         results = list(DDGS().text(query, max_results=5))
         
@@ -29,31 +34,44 @@ def search_web(query: str) -> dict:
         return {"status": "error", "message": str(e)}
 
 # --- Tool 2: The Reader (The "Deep Dive") ---
-def read_website(url: str) -> dict:
+# Parsing a large page holds the GIL for tens of milliseconds, so it runs in a
+# worker process (adk_common/cpu_pool.py). Only the page bytes go in and only
+# the extracted text comes back.
+@cpu_bound
+def extract_text(html: bytes, max_chars: int = 10000) -> str:
+    """Returns the readable text of an HTML page, cut to `max_chars`."""
+    from bs4 import BeautifulSoup
+
+    # Parse text with BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Kill all script and style elements (removes javascript code/css)
+    for script in soup(["script", "style", "nav", "footer"]):
+        script.decompose()
+
+    # Get text
+    text = soup.get_text(separator=' ', strip=True)
+    return text[:max_chars] + "... [content truncated]"
+
+
+async def read_website(url: str) -> dict:
     """
     Visits a specific URL and scrapes its textual content.
     Use this to read the full details of a source found by search_web.
     """
     try:
+        import requests
+
         # Fake a browser user-agent to avoid being blocked by some sites
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        response = requests.get(url, headers=headers, timeout=10)
+        # The download waits in a thread, the parse runs in the CPU pool: the event loop stays free.
+        response = await asyncio.to_thread(requests.get, url, headers=headers, timeout=10)
         response.raise_for_status()
-        
-        # Parse text with BeautifulSoup
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Kill all script and style elements (removes javascript code/css)
-        for script in soup(["script", "style", "nav", "footer"]):
-            script.decompose()
-            
-        # Get text
-        text = soup.get_text(separator=' ', strip=True)
-        
+
         # Truncate if too long (Ollama has limits, keep it under ~4000 chars of context per site)
         return {
             "status": "success",
-            "content": text[:10000] + "... [content truncated]"
+            "content": await extract_text(response.content)
         }
     except Exception as e:
         return {"status": "error", "message": f"Could not read website: {str(e)}"}
@@ -1,8 +1,10 @@
-from google.genai import types
 from google.adk.agents import LlmAgent
 from google.adk.models.google_llm import Gemini
 from google.adk.runners import InMemoryRunner
 
+from adk_common.retry import RetryingLlm
+from adk_common.tool_dispatch import default_dispatcher
+
 
 def show_python_code_and_result(response):
     for i in range(len(response)):
@@ -24,13 +26,6 @@ def show_python_code_and_result(response):
                     print("Generated Python Response >> ", response_code["result"])
 
 
-
-retry_config=types.HttpRetryOptions(
-    attempts=5,  # Maximum retry attempts
-    exp_base=7,  # Delay multiplier
-    initial_delay=1, # Initial delay before first retry (in seconds)
-    http_status_codes=[429, 500, 503, 504] # Retry on these HTTP errors
-)
 # Pay attention to the docstring, type hints, and return value.
 def get_fee_for_payment_method(method: str) -> dict:
     """Looks up the transaction fee percentage for a given payment method.
@@ -108,7 +103,7 @@ def get_exchange_rate(base_currency: str, target_currency: str) -> dict:
 # Currency agent with custom function tools
 root_agent = LlmAgent(
     name="currency_agent",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite")),
     instruction="""You are a smart currency conversion assistant.
 
     For currency conversion requests:
@@ -122,7 +117,8 @@ root_agent = LlmAgent(
 
     If any tool returns status "error", explain the issue to the user clearly.
     """,
-    tools=[get_fee_for_payment_method, get_exchange_rate],
+    # Both lookups of a turn run at the same time, in threads (see adk_common/tool_dispatch.py).
+    tools=default_dispatcher.tools([get_fee_for_payment_method, get_exchange_rate]),
 )
 
 runner = InMemoryRunner(agent=root_agent)
\ No newline at end of file
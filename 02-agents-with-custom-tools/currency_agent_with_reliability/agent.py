@@ -1,10 +1,12 @@
-from google.genai import types
 from google.adk.agents import LlmAgent
 from google.adk.models.google_llm import Gemini
 from google.adk.runners import InMemoryRunner
 from google.adk.tools import AgentTool
 from google.adk.code_executors import BuiltInCodeExecutor
 
+from adk_common.retry import RetryingLlm
+from adk_common.tool_dispatch import default_dispatcher
+
 
 def show_python_code_and_result(response):
     for i in range(len(response)):
@@ -26,15 +28,6 @@ def show_python_code_and_result(response):
                     print("Generated Python Response >> ", response_code["result"])
 
 
-
-retry_config=types.HttpRetryOptions(
-    attempts=5,  # Maximum retry attempts
-    exp_base=7,  # Delay multiplier
-    initial_delay=1, # Initial delay before first retry (in seconds)
-    http_status_codes=[429, 500, 503, 504] # Retry on these HTTP errors
-)
-
-
 # Pay attention to the docstring, type hints, and return value.
 def get_fee_for_payment_method(method: str) -> dict:
     """Looks up the transaction fee percentage for a given payment method.
@@ -111,7 +104,7 @@ def get_exchange_rate(base_currency: str, target_currency: str) -> dict:
 
 calculation_agent = LlmAgent(
     name="CalculationAgent",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite")),
     instruction="""You are a specialized calculator that ONLY responds with Python code. You are forbidden from providing any text, explanations, or conversational responses.
  
      Your task is to take a request for a calculation and translate it into a single block of Python code that calculates the answer.
@@ -131,7 +124,7 @@ calculation_agent = LlmAgent(
 
 root_agent = LlmAgent(
     name="enhanced_currency_agent",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite")),
     # Updated instruction
     instruction="""You are a smart currency conversion assistant. You must strictly follow these steps and use the available tools.
 
@@ -149,11 +142,12 @@ root_agent = LlmAgent(
            * The amount remaining after deducting the fee.
            * The exchange rate applied.
     """,
-    tools=[
+    # The fee and rate lookups of a turn run at the same time, in threads (see adk_common/tool_dispatch.py).
+    tools=default_dispatcher.tools([
         get_fee_for_payment_method,
         get_exchange_rate,
         AgentTool(agent=calculation_agent),  # Using another agent as a tool!
-    ],
+    ]),
 )
 
 runner = InMemoryRunner(agent=root_agent)
\ No newline at end of file
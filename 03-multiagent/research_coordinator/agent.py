@@ -2,23 +2,14 @@ from google.adk.agents import Agent, SequentialAgent, ParallelAgent, LoopAgent
 from google.adk.models.google_llm import Gemini
 from google.adk.runners import InMemoryRunner
 from google.adk.tools import AgentTool, FunctionTool, google_search
-from google.genai import types
 
+from adk_common.retry import RetryingLlm
 
-retry_config=types.HttpRetryOptions(
-    attempts=5,  # Maximum retry attempts
-    exp_base=7,  # Delay multiplier
-    initial_delay=1, # Initial delay before first retry (in seconds)
-    http_status_codes=[429, 500, 503, 504] # Retry on these HTTP errors
-)
 
 # Research Agent: Its job is to use the google_search tool and present findings.
 research_agent = Agent(
     name="ResearchAgent",
-    model=Gemini(
-        model="gemini-2.5-flash-lite",
-        retry_options=retry_config
-    ),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite")),
     instruction="""You are a specialized research agent. Your only job is to use the
     google_search tool to find 2-3 pieces of relevant information on the given topic and present the findings with citations.""",
     tools=[google_search],
@@ -30,10 +21,7 @@ research_agent = Agent(
 # Summarizer Agent: Its job is to summarize the text it receives.
 summarizer_agent = Agent(
     name="SummarizerAgent",
-    model=Gemini(
-        model="gemini-2.5-flash-lite",
-        retry_options=retry_config
-    ),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite")),
     # The instruction is modified to request a bulleted list for a clear output format.
     instruction="""Read the provided research findings: {research_findings}
 Create a concise summary as a bulleted list with 3-5 key points.""",
@@ -47,10 +35,7 @@ Create a concise summary as a bulleted list with 3-5 key points.""",
 # Root Coordinator: Orchestrates the workflow by calling the sub-agents as tools.
 root_agent = Agent(
     name="ResearchCoordinator",
-    model=Gemini(
-        model="gemini-2.5-flash-lite",
-        retry_options=retry_config
-    ),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite")),
     # This instruction tells the root agent HOW to use its tools (which are the other agents).
     instruction="""You are a research coordinator. Your goal is to answer the user's query by orchestrating a workflow.
 1. First, you MUST call the `ResearchAgent` tool to find relevant information on the topic provided by the user.
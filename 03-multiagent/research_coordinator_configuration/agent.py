@@ -1,87 +1,228 @@
 import yaml
 import os
-from google.adk.agents import Agent
+from google.adk.agents import Agent, LoopAgent, ParallelAgent, SequentialAgent
 from google.adk.models.google_llm import Gemini
 from google.adk.runners import InMemoryRunner
-from google.adk.tools import AgentTool, google_search
-from google.genai import types
+from google.adk.tools import AgentTool, exit_loop, google_search
+
+from adk_common.retry import RetryingLlm, RetryPolicy
 
 # 1. Load the YAML Config
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), './config/agents.yaml')
 
-with open(CONFIG_PATH, 'r') as file:
-    config = yaml.safe_load(file)
+
+def load_config(path=CONFIG_PATH):
+    """Reads, parses and validates the YAML agent configuration."""
+    with open(path, 'r') as file:
+        cfg = yaml.safe_load(file)
+    validate_config(cfg)
+    return cfg
+
 
 # 2. Setup Shared Model Configuration
-retry_settings = config['settings']['retry_config']
-retry_options = types.HttpRetryOptions(
-    attempts=retry_settings['attempts'],
-    exp_base=retry_settings['exp_base'],
-    initial_delay=retry_settings['initial_delay'],
-    http_status_codes=retry_settings['http_status_codes']
-)
-
-def get_model():
+def build_retry_policy(cfg):
+    """Builds the shared RetryPolicy from the `settings` block."""
+    retry_settings = cfg['settings']['retry_config']
+    return RetryPolicy(
+        attempts=retry_settings['attempts'],
+        base_delay=retry_settings['base_delay'],
+        max_delay=retry_settings['max_delay'],
+        retry_statuses=tuple(retry_settings['http_status_codes'])
+    )
+
+
+def get_model(cfg=None):
     """Helper to return a fresh model instance with config applied."""
-    return Gemini(
-        model=config['settings']['model_name'],
-        retry_options=retry_options
+    cfg = cfg or config
+    return RetryingLlm(
+        llm=Gemini(model=cfg['settings']['model_name']),
+        policy=build_retry_policy(cfg)
     )
 
+
 # 3. Define a registry of standard tools
 # Maps the string name in YAML to the actual Python function
 TOOL_REGISTRY = {
-    "google_search": google_search
+    "google_search": google_search,
+    "exit_loop": exit_loop,  # Lets an agent inside a `loop` node stop the loop
+}
+
+# Workflow node types, selected with `type:` in the YAML.
+# Agents without a `type` (or with `type: agent`) are regular LLM agents.
+WORKFLOW_TYPES = {
+    "sequential": SequentialAgent,
+    "parallel": ParallelAgent,
+    "loop": LoopAgent,
 }
 
+
+def agent_dependencies(agent_cfg, cfg):
+    """Returns the keys of the other agents this agent references (as tools or sub-agents)."""
+    tool_refs = [name for name in agent_cfg.get('tools', []) if name in cfg['agents']]
+    return tool_refs + list(agent_cfg.get('sub_agents', []))
+
+
+def validate_config(cfg):
+    """
+    Checks the agent graph before anything is built.
+
+    Raises ValueError listing every unknown type, missing reference,
+    sub-agent with more than one parent and reference cycle.
+    """
+    errors = []
+    agents = cfg.get('agents') or {}
+    if 'root_agent' not in agents:
+        errors.append("missing the 'root_agent' entry")
+
+    parents = {}
+    for key, agent_cfg in agents.items():
+        agent_type = agent_cfg.get('type', 'agent')
+        sub_agents = agent_cfg.get('sub_agents', [])
+
+        if agent_type != 'agent' and agent_type not in WORKFLOW_TYPES:
+            errors.append(f"'{key}' has unknown type '{agent_type}'")
+        if agent_type in WORKFLOW_TYPES:
+            if not sub_agents:
+                errors.append(f"'{key}' is a {agent_type} node but lists no sub_agents")
+            if agent_cfg.get('tools'):
+                errors.append(f"'{key}' is a {agent_type} node and cannot have tools")
+        if 'max_iterations' in agent_cfg and agent_type != 'loop':
+            errors.append(f"'{key}' sets max_iterations but is not a loop node")
+
+        for tool_name in agent_cfg.get('tools', []):
+            if tool_name not in TOOL_REGISTRY and tool_name not in agents:
+                errors.append(f"'{key}' uses tool '{tool_name}', which is neither a registered tool nor an agent")
+        for sub_key in sub_agents:
+            if sub_key not in agents:
+                errors.append(f"'{key}' lists unknown sub-agent '{sub_key}'")
+            else:
+                parents.setdefault(sub_key, []).append(key)
+
+    # ADK agents can only have one parent
+    for sub_key, owners in parents.items():
+        if len(owners) > 1:
+            errors.append(f"'{sub_key}' is a sub-agent of more than one node: {', '.join(owners)}")
+
+    # Depth-first search for reference cycles (tools and sub-agents alike)
+    visiting, done = [], set()
+
+    def visit(key):
+        if key in done or key not in agents:
+            return
+        if key in visiting:
+            cycle = visiting[visiting.index(key):] + [key]
+            errors.append(f"reference cycle: {' -> '.join(cycle)}")
+            return
+        visiting.append(key)
+        for dep in agent_dependencies(agents[key], cfg):
+            visit(dep)
+        visiting.pop()
+        done.add(key)
+
+    for key in agents:
+        visit(key)
+
+    if errors:
+        raise ValueError("Invalid agent config:\n  - " + "\n  - ".join(errors))
+
+
+# Load and validate the config once at import time
+config = load_config()
+retry_policy = build_retry_policy(config)
+
 # Dictionary to hold created agent instances
 created_agents = {}
 
-def build_agent(agent_key):
+
+def build_agent(agent_key, cfg=None, registry=None):
     """
     Recursively builds an agent from the YAML config.
+
+    `cfg` and `registry` default to the module-level `config` and
+    `created_agents`; the hot reloader passes its own so that agents which
+    did not change are reused instead of rebuilt.
     """
-    if agent_key in created_agents:
-        return created_agents[agent_key]
+    if cfg is None:
+        cfg = config
+    if registry is None:
+        registry = created_agents
+
+    if agent_key in registry:
+        return registry[agent_key]
+
+    agent_cfg = cfg['agents'][agent_key]
+    agent_type = agent_cfg.get('type', 'agent')
+
+    # Resolve Sub-agents (built first so the parent can own them)
+    sub_agents = [build_agent(sub_key, cfg, registry) for sub_key in agent_cfg.get('sub_agents', [])]
+
+    if agent_type in WORKFLOW_TYPES:
+        # Sequential / Parallel / Loop nodes run their sub-agents directly,
+        # without spending coordinator LLM turns on the orchestration.
+        workflow_kwargs = {}
+        if agent_type == 'loop':
+            workflow_kwargs['max_iterations'] = agent_cfg.get('max_iterations')
+        new_agent = WORKFLOW_TYPES[agent_type](
+            name=agent_cfg['name'],
+            description=agent_cfg.get('description', ''),
+            sub_agents=sub_agents,
+            **workflow_kwargs
+        )
+        registry[agent_key] = new_agent
+        print(f"✅ Built {agent_type.title()} Workflow: {agent_cfg['name']}")
+        return new_agent
 
-    agent_cfg = config['agents'][agent_key]
-    
     # Resolve Tools
     resolved_tools = []
     for tool_name in agent_cfg.get('tools', []):
         if tool_name in TOOL_REGISTRY:
             # It's a standard function tool (like google_search)
             resolved_tools.append(TOOL_REGISTRY[tool_name])
-        elif tool_name in config['agents']:
+        elif tool_name in cfg['agents']:
             # It's another AGENT referenced as a tool (Sub-agent)
             # Recursively build that agent first
-            sub_agent = build_agent(tool_name)
+            sub_agent = build_agent(tool_name, cfg, registry)
             # Wrap it in AgentTool so the parent can call it
             resolved_tools.append(AgentTool(sub_agent))
-        else:
-            print(f"⚠️ Warning: Tool '{tool_name}' not found in registry or agent list.")
 
     # Create the Agent
     new_agent = Agent(
         name=agent_cfg['name'],
-        model=get_model(),
+        model=get_model(cfg),
+        description=agent_cfg.get('description', ''),
         instruction=agent_cfg['instruction'],
         tools=resolved_tools,
+        sub_agents=sub_agents,
         output_key=agent_cfg.get('output_key', None) # Optional
     )
-    
+
     # Register and return
-    created_agents[agent_key] = new_agent
+    registry[agent_key] = new_agent
     print(f"✅ Built Agent: {agent_cfg['name']}")
     return new_agent
 
 # 4. Build the Root Agent
-# This triggers the chain reaction to build the sub-agents (researcher/summarizer) automatically
+# This triggers the chain reaction to build the sub-agents (researcher/summarizer) automatically.
+# `load_config` has already rejected cycles and missing references, so this cannot recurse forever.
 root_agent = build_agent('root_agent')
 
 # 5. Initialize Runner
 runner = InMemoryRunner(agent=root_agent)
 
+# 6. Optional Hot Reload
+# Set AGENTS_YAML_HOT_RELOAD=1 to pick up edits to config/agents.yaml without
+# restarting a process that runs `runner`. `adk web` builds its own runner and
+# does not see the swap; run it with `--reload_agents` instead.
+if os.environ.get("AGENTS_YAML_HOT_RELOAD") == "1":
+    from .reloader import ConfigReloader
+
+    def _rebind_root(new_root):
+        global root_agent
+        root_agent = new_root
+
+    reloader = ConfigReloader(runner, config, created_agents, on_swap=_rebind_root)
+    reloader.start()
+
 # --- Usage Example ---
 if __name__ == "__main__":
     if os.environ.get("GOOGLE_API_KEY"):
@@ -89,4 +230,4 @@ if __name__ == "__main__":
         response = runner.run("What are the latest breakthroughs in solid-state batteries?")
         print(response.text)
     else:
-        print("❌ Error: GOOGLE_API_KEY not found in environment.")
\ No newline at end of file
+        print("❌ Error: GOOGLE_API_KEY not found in environment.")
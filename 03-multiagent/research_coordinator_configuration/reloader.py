@@ -0,0 +1,166 @@
+import hashlib
+import os
+import threading
+
+import yaml
+
+from .agent import CONFIG_PATH, agent_dependencies, build_agent, load_config
+
+
+def _fingerprint(section) -> str:
+    """Stable hash of one YAML section, used to detect which agents changed."""
+    dumped = yaml.safe_dump(section, sort_keys=True)
+    return hashlib.sha256(dumped.encode("utf-8")).hexdigest()
+
+
+def _dependents(cfg, changed: set) -> set:
+    """
+    Expands `changed` with every agent that has to be rebuilt along with them.
+
+    Dirtiness only travels up: an agent that references a rebuilt agent (as a
+    tool or a sub-agent) is rebuilt too, its unchanged sub-agents are not.
+    """
+    referenced_by = {}
+    for key, agent_cfg in cfg["agents"].items():
+        for dep in agent_dependencies(agent_cfg, cfg):
+            referenced_by.setdefault(dep, set()).add(key)
+
+    dirty = set(changed)
+    pending = list(changed)
+    while pending:
+        for parent in referenced_by.get(pending.pop(), ()):
+            if parent not in dirty:
+                dirty.add(parent)
+                pending.append(parent)
+    return dirty
+
+
+def _register_subtree(key, agent, cfg, registry: dict):
+    registry[key] = agent
+    for sub_key, sub_agent in zip(cfg["agents"][key].get("sub_agents", []), agent.sub_agents):
+        _register_subtree(sub_key, sub_agent, cfg, registry)
+
+
+def _copy_reused(cfg, dirty: set, registry: dict):
+    """
+    Replaces the reused sub-agents of the nodes about to be rebuilt with fresh copies.
+
+    ADK refuses a sub-agent that already has a parent, and the old tree keeps
+    serving the runs that already started, so its agents (and their
+    `parent_agent` links) must not change. `clone()` copies the unchanged
+    subtree without rebuilding its models; the copies replace the originals
+    in `registry`, which only the new tree uses.
+    """
+    for key in dirty:
+        for child in cfg["agents"][key].get("sub_agents", []):
+            if child in registry and child not in dirty:
+                _register_subtree(child, registry[child].clone(), cfg, registry)
+
+
+class ConfigReloader:
+    """
+    Watches `config/agents.yaml` and swaps a rebuilt root agent into a runner.
+
+    Only agents whose YAML section changed and the agents that reference them
+    are rebuilt; everything else is reused from the previous graph, the
+    unchanged sub_agents of a rebuilt node as copies (see `_copy_reused`).
+    Runs that already started keep the agent tree they were started with,
+    untouched, because the runner only reads `runner.agent` when a new run
+    begins.
+
+    Only `runner` (and whatever `on_swap` rebinds) sees the new tree: a
+    server that built its own runner from the module's `root_agent`, like
+    `adk web`, keeps the agents it loaded.
+    """
+
+    def __init__(self, runner, config, registry, path=CONFIG_PATH,
+                 root_key="root_agent", poll_interval=1.0, on_swap=None):
+        self.runner = runner
+        self.on_swap = on_swap
+        """Called with every new root agent, e.g. to rebind a module-level `root_agent`."""
+        self.path = path
+        self.root_key = root_key
+        self.poll_interval = poll_interval
+        self.config = config
+        self.registry = dict(registry)
+        self._settings_fp = _fingerprint(config["settings"])
+        self._agent_fps = {k: _fingerprint(v) for k, v in config["agents"].items()}
+        self._mtime = os.stat(path).st_mtime_ns
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Watching ---
+    def start(self):
+        """Starts polling the YAML file in a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="agents-yaml-reloader", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                continue  # Editors often replace the file; wait for it to reappear.
+            if mtime != self._mtime:
+                self._mtime = mtime
+                self.reload()
+
+    # --- Rebuilding ---
+    def reload(self):
+        """
+        Re-reads the YAML and rebuilds the changed subtree.
+
+        Returns the list of rebuilt agent keys. On a parse or build error the
+        current graph stays in place and an empty list is returned.
+        """
+        with self._lock:
+            try:
+                new_config = load_config(self.path)
+                settings_fp = _fingerprint(new_config["settings"])
+                agent_fps = {k: _fingerprint(v) for k, v in new_config["agents"].items()}
+
+                if settings_fp != self._settings_fp:
+                    # Model name or retry settings apply to every agent.
+                    changed = set(agent_fps)
+                else:
+                    changed = {k for k, fp in agent_fps.items() if self._agent_fps.get(k) != fp}
+                dirty = _dependents(new_config, changed)
+
+                registry = {
+                    k: v for k, v in self.registry.items()
+                    if k in agent_fps and k not in dirty
+                }
+                _copy_reused(new_config, dirty, registry)
+                new_root = build_agent(self.root_key, new_config, registry)
+            except Exception as e:
+                print(f"⚠️ Hot reload skipped, keeping the current agents: {e}")
+                return []
+
+            rebuilt = sorted(k for k in dirty if k in registry)
+            self.config = new_config
+            self.registry = registry
+            self._settings_fp = settings_fp
+            self._agent_fps = agent_fps
+            self._swap_root(new_root)
+
+        print(f"🔄 Reloaded agents.yaml, rebuilt: {', '.join(rebuilt) or 'nothing'}")
+        return rebuilt
+
+    def _swap_root(self, new_root):
+        # A single attribute assignment: a run either sees the old tree or the
+        # new one, never a mix.
+        app = getattr(self.runner, "app", None)
+        if app is not None:
+            self.runner.app = app.model_copy(update={"root_agent": new_root})
+        self.runner.agent = new_root
+        if self.on_swap is not None:
+            self.on_swap(new_root)
@@ -1,23 +1,18 @@
 from google.adk.agents import Agent, SequentialAgent, LoopAgent
 from google.adk.models.google_llm import Gemini
 from google.adk.runners import InMemoryRunner
-from google.adk.tools import FunctionTool
-from google.genai import types
+from google.adk.tools import FunctionTool, ToolContext
+
+from adk_common.compaction import ContextCompactor, instruction_keys
+from adk_common.retry import RetryingLlm
+
+from .controller import LoopController, finish_loop_metrics, record_model_usage, reset_loop_metrics
 
 
-retry_config=types.HttpRetryOptions(
-    attempts=5,  # Maximum retry attempts
-    exp_base=7,  # Delay multiplier
-    initial_delay=1, # Initial delay before first retry (in seconds)
-    http_status_codes=[429, 500, 503, 504] # Retry on these HTTP errors
-)
 # This agent runs ONCE at the beginning to create the first draft.
 initial_writer_agent = Agent(
     name="InitialWriterAgent",
-    model=Gemini(
-        model="gemini-2.5-flash-lite",
-        retry_options=retry_config
-    ),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite")),
     instruction="""Based on the user's prompt, write the first draft of a short story (around 100-150 words).
     Output only the story text, with no introduction or explanation.""",
     output_key="current_story",  # Stores the first draft in the state.
@@ -27,10 +22,7 @@ initial_writer_agent = Agent(
 # This agent's only job is to provide feedback or the approval signal. It has no tools.
 critic_agent = Agent(
     name="CriticAgent",
-    model=Gemini(
-        model="gemini-2.5-flash-lite",
-        retry_options=retry_config
-    ),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite")),
     instruction="""You are a constructive story critic. Review the story provided below.
     Story: {current_story}
     
@@ -38,12 +30,16 @@ critic_agent = Agent(
     - If the story is well-written and complete, you MUST respond with the exact phrase: "APPROVED"
     - Otherwise, provide 2-3 specific, actionable suggestions for improvement.""",
     output_key="critique",  # Stores the feedback in the state.
+    after_model_callback=record_model_usage,  # Counts calls and tokens per loop iteration.
 )
 
 
 # This is the function that the RefinerAgent will call to exit the loop.
-def exit_loop():
+# The ApprovalCheck below normally exits first, so this is only a fallback.
+def exit_loop(tool_context: ToolContext):
     """Call this function ONLY when the critique is 'APPROVED', indicating the story is finished and no more changes are needed."""
+    tool_context.actions.escalate = True  # Tells the LoopAgent to stop.
+    tool_context.actions.skip_summarization = True  # No extra model turn after the call.
     return {"status": "approved", "message": "Story approved. Exiting refinement loop."}
 
 
@@ -51,10 +47,7 @@ def exit_loop():
 # This agent refines the story based on critique OR calls the exit_loop function.
 refiner_agent = Agent(
     name="RefinerAgent",
-    model=Gemini(
-        model="gemini-2.5-flash-lite",
-        retry_options=retry_config
-    ),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite")),
     instruction="""You are a story refiner. You have a story draft and critique.
     
     Story Draft: {current_story}
@@ -67,13 +60,47 @@ refiner_agent = Agent(
     tools=[
         FunctionTool(exit_loop)
     ],  # The tool is now correctly initialized with the function reference.
+    after_model_callback=record_model_usage,
+)
+
+
+# Every iteration appends a critique and a full rewrite to the session, and both agents re-send
+# the whole history. Between turns, the compactor keeps each request (instruction + history) under ~1,000 tokens:
+# superseded drafts and critiques are summarized, the oldest into the system instruction, while {current_story} and {critique}
+# still reach the model through the instructions.
+context_compactor = ContextCompactor(
+    token_budget=1_000,
+    protected_keys=instruction_keys(critic_agent, refiner_agent),
+)
+critic_agent.before_model_callback = context_compactor.before_model_callback
+refiner_agent.before_model_callback = context_compactor.before_model_callback
+
+
+# Deterministic checks (no model calls) that end the loop early.
+# Runs first in each iteration: stops when the refined story barely changed since the last iteration.
+convergence_check = LoopController(
+    name="ConvergenceCheck",
+    text_key="current_story",
+    similarity_threshold=0.95,
+    marks_iteration=True,
+)
+
+# Runs right after the critic: stops on "APPROVED" without calling the RefinerAgent.
+approval_check = LoopController(
+    name="ApprovalCheck",
+    approval_key="critique",
+    approval_token="APPROVED",
 )
 
-# The LoopAgent contains the agents that will run repeatedly: Critic -> Refiner.
+# The LoopAgent contains the agents that will run repeatedly: Critic -> Refiner,
+# with the deterministic checks around the critic.
+# Per-iteration timing, model calls and tokens are kept in the `loop_metrics` state key.
 story_refinement_loop = LoopAgent(
     name="StoryRefinementLoop",
-    sub_agents=[critic_agent, refiner_agent],
+    sub_agents=[convergence_check, critic_agent, approval_check, refiner_agent],
     max_iterations=2,  # Prevents infinite loops
+    before_agent_callback=reset_loop_metrics,
+    after_agent_callback=finish_loop_metrics,
 )
 
 # The root agent is a SequentialAgent that defines the overall workflow: Initial Write -> Refinement Loop.
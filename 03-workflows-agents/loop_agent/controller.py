@@ -0,0 +1,133 @@
+import difflib
+import re
+import time
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models.llm_response import LlmResponse
+
+# Session state key holding one metrics record per loop iteration.
+METRICS_KEY = "loop_metrics"
+
+
+def is_approved(critique: str, token: str = "APPROVED") -> bool:
+    """True when the critique is just the approval token ("APPROVED", "**Approved.**", ...)."""
+    return re.sub(r"[^A-Z]", "", (critique or "").upper()) == token
+
+
+def similarity(previous: str, current: str) -> float:
+    """0..1 similarity of two drafts (difflib ratio, 1.0 = identical)."""
+    return difflib.SequenceMatcher(None, previous or "", current or "", autojunk=False).ratio()
+
+
+class LoopController(BaseAgent):
+    """
+    A deterministic (no LLM) step inside a LoopAgent that ends the loop early.
+
+    - With `approval_key` it stops the loop when that state value is the
+      approval token, so the refiner is never called just to exit.
+    - With `text_key` it stops the loop when the draft stored there is at
+      least `similarity_threshold` similar to the draft seen on the previous
+      iteration, i.e. the refinement has converged.
+    - With `marks_iteration` it opens a new record in `loop_metrics`; place
+      that controller first in the loop.
+    """
+
+    approval_key: Optional[str] = None
+    approval_token: str = "APPROVED"
+    text_key: Optional[str] = None
+    similarity_threshold: float = 0.95
+    marks_iteration: bool = False
+
+    @property
+    def previous_key(self) -> Optional[str]:
+        """State key holding the draft seen on the previous iteration (None without `text_key`)."""
+        return f"previous_{self.text_key}" if self.text_key else None
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        delta = {}
+        metrics = [dict(m) for m in state.get(METRICS_KEY, [])]
+
+        if self.marks_iteration:
+            now = time.time()
+            if metrics:
+                _close_record(metrics[-1], now)
+            metrics.append({
+                "iteration": len(metrics) + 1,
+                "started_at": now,
+                "model_calls": 0,
+                "prompt_tokens": 0,
+                "output_tokens": 0,
+            })
+
+        exit_reason = None
+        if self.approval_key and is_approved(state.get(self.approval_key, ""), self.approval_token):
+            exit_reason = "approved"
+
+        if self.text_key:
+            previous_key = self.previous_key
+            current = state.get(self.text_key, "")
+            previous = state.get(previous_key)
+            if previous is not None and similarity(previous, current) >= self.similarity_threshold:
+                exit_reason = exit_reason or "converged"
+            delta[previous_key] = current
+
+        if metrics:
+            if exit_reason:
+                metrics[-1]["exit_reason"] = exit_reason
+            delta[METRICS_KEY] = metrics
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=delta, escalate=bool(exit_reason)),
+        )
+
+
+def _close_record(record: dict, now: float):
+    if "seconds" not in record:
+        record["seconds"] = round(now - record["started_at"], 4)
+
+
+# --- Callbacks that fill in `loop_metrics` ---
+
+def reset_loop_metrics(callback_context: CallbackContext):
+    """before_agent_callback for the LoopAgent: every run starts with fresh metrics and no previous drafts."""
+    callback_context.state[METRICS_KEY] = []
+    loop = callback_context.get_invocation_context().agent
+    # Only the keys this loop's controllers write; other `previous_*` state belongs to someone else.
+    for agent in loop.sub_agents:
+        if isinstance(agent, LoopController) and agent.previous_key:
+            callback_context.state[agent.previous_key] = None
+    return None
+
+
+def record_model_usage(callback_context: CallbackContext, llm_response: LlmResponse):
+    """after_model_callback for the LLM agents in the loop: adds calls and tokens to the current iteration."""
+    metrics = callback_context.state.get(METRICS_KEY) or []
+    if llm_response.partial or not metrics:
+        return None
+    metrics = [dict(m) for m in metrics]
+    current = metrics[-1]
+    current["model_calls"] += 1
+    usage = llm_response.usage_metadata
+    if usage:
+        current["prompt_tokens"] += usage.prompt_token_count or 0
+        current["output_tokens"] += usage.candidates_token_count or 0
+    callback_context.state[METRICS_KEY] = metrics
+    return None
+
+
+def finish_loop_metrics(callback_context: CallbackContext):
+    """after_agent_callback for the LoopAgent: closes the last iteration's record."""
+    metrics = [dict(m) for m in callback_context.state.get(METRICS_KEY) or []]
+    if metrics:
+        _close_record(metrics[-1], time.time())
+        metrics[-1].setdefault("exit_reason", "no_early_exit")
+        callback_context.state[METRICS_KEY] = metrics
+    return None
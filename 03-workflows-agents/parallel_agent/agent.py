@@ -1,23 +1,36 @@
-from google.adk.agents import Agent, SequentialAgent, ParallelAgent
+from google.adk.agents import Agent, ParallelAgent
+from google.adk.apps import App
 from google.adk.models.google_llm import Gemini
 from google.adk.runners import InMemoryRunner
 from google.adk.tools import google_search
-from google.genai import types
 
+from adk_common.rate_limit import ModelQuota, RateLimitedLlm, default_scheduler
+from adk_common.response_cache import CachedLlm, ResponseCache, hashed_ngram_embedder
+from adk_common.retry import RetryingLlm
+from adk_common.telemetry import TelemetryPlugin, setup_from_env
 
-retry_config=types.HttpRetryOptions(
-    attempts=5,  # Maximum retry attempts
-    exp_base=7,  # Delay multiplier
-    initial_delay=1, # Initial delay before first retry (in seconds)
-    http_status_codes=[429, 500, 503, 504] # Retry on these HTTP errors
+from .aggregation import IncrementalFanInAgent
+
+
+# All models below share one token bucket per model name, so the fan-out waits for quota
+# on the client instead of collecting 429s. These are the free-tier limits; raise them to match your project.
+# RetryingLlm wraps the rate limiter, so a retried call waits for quota too.
+# `max_in_flight` caps how many calls run at once when more researchers are added.
+default_scheduler.set_quota(
+    "gemini-2.5-flash-lite",
+    ModelQuota(requests_per_minute=15, tokens_per_minute=250_000, max_in_flight=3),
 )
+
+# The aggregator's summary only depends on its request (the reports are in its instruction), so a
+# repeated request is answered from the cache for 15 minutes, without a call or quota.
+# The researchers are not cached: `google_search` runs on Google's side, so the same prompt can be
+# grounded in different results, and a cached report would hide that.
+summary_cache = ResponseCache(ttl_seconds=15 * 60, max_entries=500, embedder=hashed_ngram_embedder)
+
 # Tech Researcher: Focuses on AI and ML trends.
 tech_researcher = Agent(
     name="TechResearcher",
-    model=Gemini(
-        model="gemini-2.5-flash-lite",
-        retry_options=retry_config
-    ),
+    model=RetryingLlm(llm=RateLimitedLlm(llm=Gemini(model="gemini-2.5-flash-lite"))),
     instruction="""Research the latest AI/ML trends. Include 3 key developments,
 the main companies involved, and the potential impact. Keep the report very concise (100 words).""",
     tools=[google_search],
@@ -28,10 +41,7 @@ the main companies involved, and the potential impact. Keep the report very conc
 # Health Researcher: Focuses on medical breakthroughs.
 health_researcher = Agent(
     name="HealthResearcher",
-    model=Gemini(
-        model="gemini-2.5-flash-lite",
-        retry_options=retry_config
-    ),
+    model=RetryingLlm(llm=RateLimitedLlm(llm=Gemini(model="gemini-2.5-flash-lite"))),
     instruction="""Research recent medical breakthroughs. Include 3 significant advances,
 their practical applications, and estimated timelines. Keep the report concise (100 words).""",
     tools=[google_search],
@@ -43,10 +53,7 @@ their practical applications, and estimated timelines. Keep the report concise (
 # Finance Researcher: Focuses on fintech trends.
 finance_researcher = Agent(
     name="FinanceResearcher",
-    model=Gemini(
-        model="gemini-2.5-flash-lite",
-        retry_options=retry_config
-    ),
+    model=RetryingLlm(llm=RateLimitedLlm(llm=Gemini(model="gemini-2.5-flash-lite"))),
     instruction="""Research current fintech trends. Include 3 key trends,
 their market implications, and the future outlook. Keep the report concise (100 words).""",
     tools=[google_search],
@@ -54,26 +61,50 @@ their market implications, and the future outlook. Keep the report concise (100
 )
 
 
-# The AggregatorAgent runs *after* the parallel step to synthesize the results.
-aggregator_agent = Agent(
-    name="AggregatorAgent",
-    model=Gemini(
-        model="gemini-2.5-flash-lite",
-        retry_options=retry_config
-    ),
-    # It uses placeholders to inject the outputs from the parallel agents, which are now in the session state.
-    instruction="""Combine these three research findings into a single executive summary:
+# The AggregatorAgent synthesizes the results. It starts as soon as the first researcher is done
+# (see IncrementalFanInAgent below), so some reports may be missing from a round: state["aggregation"]
+# lists them under "pending", as still in progress in a provisional round and as timed out in the final one.
+AGGREGATOR_INSTRUCTION = """Combine these three research findings into a single executive summary:
 
     **Technology Trends:**
     {tech_research}
-    
+
     **Health Breakthroughs:**
     {health_research}
-    
+
     **Finance Innovations:**
     {finance_research}
-    
-    Your summary should highlight common themes, surprising connections, and the most important key takeaways from all three reports. The final summary should be around 200 words.""",
+
+    Your summary should highlight common themes, surprising connections, and the most important key takeaways from all three reports. The final summary should be around 200 words.
+    {missing}"""
+
+
+def aggregator_instruction(context) -> str:
+    """The instruction with the reports written so far and a note on the ones that are missing."""
+    state = context.state
+    progress = state.get("aggregation") or {}
+    pending = progress.get("pending") or []
+    if not pending:
+        missing = ""
+    elif progress.get("final"):
+        missing = (f"These reports timed out and will not arrive: {', '.join(pending)}. Their sections are empty: "
+                   "summarize the reports you have, say which ones timed out and do not make them up.")
+    else:
+        missing = (f"These reports are still in progress: {', '.join(pending)}. Their sections are empty: "
+                   "summarize the reports you have and do not make up the missing ones.")
+    return AGGREGATOR_INSTRUCTION.format(
+        tech_research=state.get("tech_research", ""),
+        health_research=state.get("health_research", ""),
+        finance_research=state.get("finance_research", ""),
+        missing=missing,
+    )
+
+
+aggregator_agent = Agent(
+    name="AggregatorAgent",
+    model=CachedLlm(llm=RetryingLlm(llm=RateLimitedLlm(llm=Gemini(model="gemini-2.5-flash-lite"))), cache=summary_cache),
+    # The findings come from the session state, where each researcher's output_key put them.
+    instruction=aggregator_instruction,
     output_key="executive_summary",  # This will be the final output of the entire system.
 )
 
@@ -84,11 +115,22 @@ parallel_research_team = ParallelAgent(
     sub_agents=[tech_researcher, health_researcher, finance_researcher],
 )
 
-# This SequentialAgent defines the high-level workflow: run the parallel team first, then run the aggregator.
-root_agent = SequentialAgent(
+# This defines the high-level workflow: run the parallel team, and aggregate as the reports come in.
+# Each finished researcher triggers a provisional executive summary (state["aggregation"] says which
+# reports it covers); the round that covers all three is the final one. Reports that land within a
+# second of each other share a round. After 60 seconds the slow researchers are cancelled and the
+# summary is finalized with the reports that are done.
+root_agent = IncrementalFanInAgent(
     name="ResearchSystem",
     sub_agents=[parallel_research_team, aggregator_agent],
+    settle_seconds=1.0,
+    deadline_seconds=60,
 )
 
 
-runner = InMemoryRunner(agent=root_agent)
\ No newline at end of file
+# Spans and metrics for every agent, model call and tool call (see adk_common/telemetry.py).
+# Set ADK_METRICS_PORT and/or OTEL_EXPORTER_OTLP_ENDPOINT to export them.
+setup_from_env()
+# Registered on the App, so `adk web` (which loads `app`) records telemetry too.
+app = App(name="parallel_agent", root_agent=root_agent, plugins=[TelemetryPlugin()])
+runner = InMemoryRunner(app=app)
@@ -0,0 +1,211 @@
+import asyncio
+import time
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.sequential_agent import SequentialAgentState
+from google.adk.events import Event, EventActions
+
+_DONE = object()
+
+
+class IncrementalFanInAgent(SequentialAgent):
+    """
+    Fan-out, then fan-in, with the fan-in starting before the fan-out is done.
+
+    `sub_agents` is `[fan_out, aggregator]`, the same pair a SequentialAgent
+    would run one after the other. Here the aggregator starts as soon as the
+    first branch of `fan_out` commits its `output_key`, producing a
+    provisional summary from the branches that are done, and runs again
+    whenever more branches have landed since its last run. Branches that
+    land while it runs are picked up together by the next run. The round that
+    covers every branch is the final one.
+
+    Branches that are still running have not written their key yet, so the
+    aggregator needs an instruction that copes with missing reports. Give it
+    a callable instruction (an `InstructionProvider`) that reads each branch's
+    key with `state.get(key, "")` and reads `state[progress_key]`, described
+    below, to say which reports are missing and whether this round is the
+    final one (see `aggregator_instruction` in agent.py). A plain string
+    instruction would need a `{key}` placeholder per branch, and ADK raises
+    an error on one that is not set yet.
+
+    A provisional round waits until no branch has committed for
+    `settle_seconds`, so branches that finish together are summarised
+    together instead of costing a round each.
+
+    With `deadline_seconds` set, the branches still running at the deadline
+    are cancelled and a final round summarises whatever is done, even if a
+    provisional round already covered it, so the summary can say which
+    reports timed out. With
+    `provisional=False` the aggregator only runs once, after all branches
+    (or the deadline).
+
+    Before each round, `state[progress_key]` is set to
+    {"round", "branches", "pending", "final"}, so a client can tell a
+    provisional summary from the final one, and the aggregator's instruction
+    can name the missing reports: in a provisional round `pending` is still
+    running, in the final round it timed out. Timings (seconds since the
+    agent started) go to `state[timings_key]`:
+    {"branches": {name: committed}, "rounds": [...], "first_summary", "final_summary", "timed_out": [...]}
+
+    Like a SequentialAgent, it records which sub-agent it is on when the
+    invocation is resumable (the fan-out while provisional rounds run, the
+    aggregator once the final round starts), so a resumed invocation
+    continues there, and it stops starting rounds once an event pauses the
+    invocation (e.g. a long-running tool).
+    """
+
+    deadline_seconds: Optional[float] = None
+    provisional: bool = True
+    settle_seconds: float = 0.0
+    progress_key: str = "aggregation"
+    timings_key: str = "aggregation_timings"
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        fan_out, aggregator = self.sub_agents
+        names = {branch.output_key: branch.name for branch in fan_out.sub_agents if getattr(branch, "output_key", None)}
+
+        agent_state = self._load_agent_state(ctx, SequentialAgentState)
+        if agent_state is not None and not agent_state.current_sub_agent:
+            return  # Finished before the invocation was resumed.
+        # Resumed in the final round: the branches are done, only the aggregator runs again.
+        resuming_final = agent_state is not None and agent_state.current_sub_agent == aggregator.name
+        if agent_state is None and ctx.is_resumable:
+            ctx.set_agent_state(self.name, agent_state=SequentialAgentState(current_sub_agent=fan_out.name))
+            yield self._create_agent_state_event(ctx)
+
+        t0 = time.perf_counter()
+        queue = asyncio.Queue()
+        timings = {"branches": {}, "rounds": []}
+        done_keys = [key for key in names if key in ctx.session.state] if resuming_final else []
+        summarised = None  # The keys the latest round was started with.
+        branches_running = not resuming_final
+        timed_out = False
+        paused = False
+        aggregating = None
+        last_commit = t0
+        deadline = t0 + self.deadline_seconds if self.deadline_seconds else None
+
+        def elapsed():
+            return round(time.perf_counter() - t0, 4)
+
+        async def drive(source, agent):
+            error = None
+            try:
+                async for event in agent.run_async(ctx):
+                    resume = asyncio.Event()
+                    await queue.put((source, event, resume))
+                    # Produce the next event only after the previous one was committed.
+                    await resume.wait()
+            except Exception as e:
+                error = e
+            finally:
+                queue.put_nowait((source, _DONE, error))
+
+        def progress_event(final: bool) -> Event:
+            progress = {
+                "round": len(timings["rounds"]),
+                "branches": [names[key] for key in done_keys],
+                "pending": [name for key, name in names.items() if key not in done_keys],
+                "final": final,
+            }
+            return Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                actions=EventActions(state_delta={self.progress_key: progress}),
+            )
+
+        branches = asyncio.create_task(drive("branches", fan_out)) if branches_running else None
+        try:
+            while True:
+                settling = None
+                if aggregating is None:
+                    # After a timeout the final round runs even without new reports, to say which ones timed out.
+                    new_branches = (tuple(done_keys) != summarised
+                                    or (timed_out and len(done_keys) < len(names))) and not paused
+                    if new_branches and branches_running and self.provisional and done_keys:
+                        settling = last_commit + self.settle_seconds
+                    if new_branches and (not branches_running or (settling and settling <= time.perf_counter())):
+                        final = not branches_running
+                        timings["rounds"].append(
+                            {"branches": len(done_keys), "started": elapsed(), "final": final})
+                        if final and ctx.is_resumable and not resuming_final:
+                            ctx.set_agent_state(self.name,
+                                                agent_state=SequentialAgentState(current_sub_agent=aggregator.name))
+                            yield self._create_agent_state_event(ctx)
+                        yield progress_event(final)
+                        summarised = tuple(done_keys)
+                        aggregating = asyncio.create_task(drive("aggregator", aggregator))
+                    elif not branches_running:
+                        # The last provisional round already covered every branch that finished.
+                        if not paused and timings["rounds"] and not timings["rounds"][-1]["final"]:
+                            timings["rounds"][-1]["final"] = True
+                            timings["final_summary"] = timings["rounds"][-1]["finished"]
+                            yield progress_event(True)
+                        break
+
+                wake_ups = [t for t in (deadline if branches_running else None, settling) if t]
+                timeout = max(0.0, min(wake_ups) - time.perf_counter()) if wake_ups else None
+                try:
+                    source, event, payload = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    if not deadline or time.perf_counter() < deadline:
+                        continue  # Settled: start the provisional round.
+                    branches.cancel()
+                    branches_running, timed_out = False, True
+                    timings["timed_out"] = [name for key, name in names.items() if key not in done_keys]
+                    continue
+
+                if source == "branches":
+                    if timed_out:
+                        continue  # Cancelled at the deadline; nothing more from the branches is committed.
+                    if event is _DONE:
+                        branches_running = False
+                        if payload is not None:
+                            raise payload
+                        continue
+                    yield event
+                    paused = paused or ctx.should_pause_invocation(event)
+                    committed = [key for key in (event.actions.state_delta or {}) if key in names]
+                    if committed and not event.partial:
+                        for key in committed:
+                            if key not in done_keys:
+                                done_keys.append(key)
+                                timings["branches"][names[key]] = elapsed()
+                                last_commit = time.perf_counter()
+                    payload.set()
+                    continue
+
+                if event is _DONE:
+                    if payload is not None:
+                        raise payload
+                    current = timings["rounds"][-1]
+                    current["finished"] = elapsed()
+                    timings.setdefault("first_summary", current["finished"])
+                    aggregating = None
+                    if current["final"]:
+                        timings["final_summary"] = current["finished"]
+                        break
+                    continue
+                yield event
+                paused = paused or ctx.should_pause_invocation(event)
+                payload.set()
+        finally:
+            for task in (branches, aggregating):
+                if task is not None:
+                    task.cancel()
+
+        if paused:
+            return  # The rest runs when the invocation is resumed.
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={self.timings_key: timings}),
+        )
+        if ctx.is_resumable:
+            ctx.set_agent_state(self.name, end_of_agent=True)
+            yield self._create_agent_state_event(ctx)
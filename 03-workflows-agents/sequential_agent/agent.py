@@ -1,25 +1,17 @@
 from google.adk.agents import Agent, SequentialAgent
+from google.adk.apps import App
 from google.adk.models.google_llm import Gemini
 from google.adk.runners import InMemoryRunner
-from google.genai import types
 
+from adk_common.payload_store import PayloadPlugin, default_store
+from adk_common.retry import RetryingLlm
+from adk_common.telemetry import TelemetryPlugin, setup_from_env
 
 
-
-retry_config=types.HttpRetryOptions(
-    attempts=5,  # Maximum retry attempts
-    exp_base=7,  # Delay multiplier
-    initial_delay=1, # Initial delay before first retry (in seconds)
-    http_status_codes=[429, 500, 503, 504] # Retry on these HTTP errors
-)
-
 # Outline Agent: Creates the initial blog post outline.
 outline_agent = Agent(
     name="OutlineAgent",
-    model=Gemini(
-        model="gemini-2.5-flash-lite",
-        retry_options=retry_config
-    ),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite")),
     instruction="""Create a blog outline for the given topic with:
     1. A catchy headline
     2. An introduction hook
@@ -32,10 +24,7 @@ outline_agent = Agent(
 # Writer Agent: Writes the full blog post based on the outline from the previous agent.
 writer_agent = Agent(
     name="WriterAgent",
-    model=Gemini(
-        model="gemini-2.5-flash-lite",
-        retry_options=retry_config
-    ),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite")),
     # The `{blog_outline}` placeholder automatically injects the state value from the previous agent's output.
     instruction="""Following this outline strictly: {blog_outline}
     Write a brief, 200 to 300-word blog post with an engaging and informative tone.""",
@@ -46,10 +35,7 @@ writer_agent = Agent(
 # Editor Agent: Edits and polishes the draft from the writer agent.
 editor_agent = Agent(
     name="EditorAgent",
-    model=Gemini(
-        model="gemini-2.5-flash-lite",
-        retry_options=retry_config
-    ),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite")),
     # This agent receives the `{blog_draft}` from the writer agent's output.
     instruction="""Edit this draft: {blog_draft}
     Your task is to polish the text by fixing any grammatical errors, improving the flow and sentence structure, and enhancing overall clarity.""",
@@ -57,10 +43,23 @@ editor_agent = Agent(
 )
 
 
+# The SequentialAgent runs the sub-agents in order. To show the final post while it is
+# being written, run it with SSE streaming (see streaming.py).
 root_agent = SequentialAgent(
     name="BlogPipeline",
     sub_agents=[outline_agent, writer_agent, editor_agent],
 )
 
 
-runner = InMemoryRunner(agent=root_agent)
\ No newline at end of file
+# Spans and metrics for every agent, model call and tool call (see adk_common/telemetry.py).
+# Set ADK_METRICS_PORT and/or OTEL_EXPORTER_OTLP_ENDPOINT to export them.
+setup_from_env()
+# state["blog_draft"] holds a handle to the draft stored on disk, while the WriterAgent's reply keeps
+# its text for the user; the editor's `{blog_draft}` still gets the full text (see adk_common/payload_store.py).
+# The plugins are registered on the App, so `adk web` (which loads `app`) runs them too.
+app = App(
+    name="sequential_agent",
+    root_agent=root_agent,
+    plugins=[PayloadPlugin(default_store, state_keys={"blog_draft"}, min_chars=1_000), TelemetryPlugin()],
+)
+runner = InMemoryRunner(app=app)
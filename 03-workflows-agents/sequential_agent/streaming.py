@@ -0,0 +1,45 @@
+"""
+Client-side helper for streaming the blog pipeline's answer.
+
+Not used by the agent itself (or by `adk web`, which has its own streaming
+toggle): call it from your own client code to show the post as it is written.
+`benchmarks.blog_pipeline_streaming` uses it for its SSE mode and prints the
+per-stage timings it records.
+"""
+import time
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import RunConfig
+from google.adk.agents.run_config import StreamingMode
+from google.genai import types
+
+
+async def stream_agent_text(
+    runner, *, user_id: str, session_id: str, message: str, author: Optional[str] = None,
+    timings: Optional[dict] = None,
+) -> AsyncGenerator[str, None]:
+    """
+    Runs `message` with SSE streaming and yields text deltas as they arrive.
+
+    With `author` set only that agent's text is yielded, e.g. the EditorAgent's
+    final blog post while the earlier stages are still invisible to the client.
+    With `timings`, records {agent: {"first_text_s", "done_s"}} for every stage,
+    in seconds since the run started, so you can see where the wait goes.
+    """
+    content = types.Content(role="user", parts=[types.Part(text=message)])
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+    start = time.perf_counter()
+    async for event in runner.run_async(
+        user_id=user_id, session_id=session_id, new_message=content, run_config=run_config
+    ):
+        texts = [part.text for part in (event.content.parts if event.content else None) or [] if part.text]
+        if timings is not None and texts:
+            stage = timings.setdefault(event.author, {})
+            stage.setdefault("first_text_s", time.perf_counter() - start)
+            if not event.partial:
+                stage["done_s"] = time.perf_counter() - start
+        # Partial events carry the deltas; the final event repeats the whole text.
+        if not event.partial or (author and event.author != author):
+            continue
+        for text in texts:
+            yield text
@@ -1,40 +1,55 @@
-import numpy as np
-from sklearn.linear_model import LinearRegression
+import functools
+import os
+
 from google.adk.agents import Agent
 from google.adk.models.google_llm import Gemini
 from google.adk.runners import InMemoryRunner
-from google.genai import types
+
+from adk_common.retry import RetryingLlm, RetryPolicy
 
 # --- 1. THE ML MODEL ENGINE ---
 class PricePredictor:
     def __init__(self):
+        # online_training brings numpy; importing it here keeps both out of agent discovery.
+        from .online_training import FEATURES, OnlineLinearModel
+
         print("⏳ Training ML Price Model (Simulation)...")
         # Synthetic Training Data
         # Features: [SqFt, Bedrooms, Location_Score(1-10)]
-        X_train = np.array([
+        X_train = [
             [800, 1, 3],   # Small, bad location
             [1200, 2, 5],  # Average
             [1500, 3, 6],  # Family home
             [2500, 4, 8],  # Luxury
             [3500, 5, 10], # Mansion, prime location
-        ])
+        ]
         # Target: Price in $
-        y_train = np.array([150_000, 280_000, 350_000, 650_000, 1_200_000])
+        y_train = [150_000, 280_000, 350_000, 650_000, 1_200_000]
 
-        # Train a Linear Regression model
-        self.model = LinearRegression()
-        self.model.fit(X_train, y_train)
+        # Train a Linear Regression model that keeps learning as new listings arrive
+        # (same coefficients as a full refit on every row seen; see online_training.py)
+        self.model = OnlineLinearModel(n_features=len(FEATURES))
+        self.model.partial_fit(X_train, y_train)
         print("✅ ML Model Trained and Ready.")
 
     def predict(self, sqft: int, beds: int, location_score: int) -> float:
         # Prepare input vector
-        features = np.array([[sqft, beds, location_score]])
+        features = [sqft, beds, location_score]
         # Run inference
-        predicted_price = self.model.predict(features)[0]
-        return round(predicted_price, 2)
+        predicted_price = self.model.predict(features)
+        return round(float(predicted_price), 2)
+
+# Initialize the model instance on the first estimate, not when the agent is imported
+@functools.lru_cache(maxsize=1)
+def load_engine() -> PricePredictor:
+    return PricePredictor()
+
+# Stream new listings into the model, e.g. HOUSE_PRICE_FEED=listings.jsonl (or .csv with a
+# sqft,bedrooms,location_score,price header). The file is polled every 5 seconds for appended rows.
+if os.environ.get("HOUSE_PRICE_FEED"):
+    from .online_training import ListingFeed, follow
 
-# Initialize the model instance
-ml_engine = PricePredictor()
+    follow(load_engine().model, ListingFeed(os.environ["HOUSE_PRICE_FEED"]))
 
 
 # --- 2. THE TOOL ---
@@ -48,18 +63,20 @@ def estimate_house_value(sq_ft: int, bedrooms: int, location_rating: int) -> str
         location_rating: A score from 1 (Rural/Bad) to 10 (Prime City Center).
     """
     try:
-        price = ml_engine.predict(sq_ft, bedrooms, location_rating)
+        price = load_engine().predict(sq_ft, bedrooms, location_rating)
         return f"ML Model Output: ${price:,.2f}"
     except Exception as e:
         return f"Prediction Error: {str(e)}"
 
 
 # --- 3. THE AGENT ---
-retry_config = types.HttpRetryOptions(attempts=3, exp_base=2, initial_delay=1, http_status_codes=[429, 500])
+# Jittered retries with a shared retry budget and a circuit breaker (adk_common/retry.py).
+# Same statuses as the retry options this agent had before: 429 and 500 only.
+retry_policy = RetryPolicy(attempts=3, retry_statuses=(429, 500))
 
 root_agent = Agent(
     name="RealEstateAnalyst",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite"), policy=retry_policy),
     description="Analyzes property descriptions and predicts value.",
     instruction="""
     You are a Real Estate Valuation Expert.
@@ -0,0 +1,180 @@
+import csv
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+
+FEATURES = ("sqft", "bedrooms", "location_score")
+TARGET = "price"
+
+
+class RunningLeastSquares:
+    """
+    Sufficient statistics of a least-squares fit with intercept, updated batch by batch.
+
+    Keeps the row count, the feature and target means, and XᵀX / Xᵀy of the
+    *centered* data. Adding a batch costs O(batch · features²) to summarise
+    the batch plus O(features²) to merge it (Chan et al.), however many rows
+    came before. Centering keeps the statistics as accurate as a full refit;
+    raw XᵀX of unscaled features (square feet next to bedroom counts) loses
+    digits to cancellation.
+    """
+
+    def __init__(self, n_features: int):
+        self.n = 0
+        self.mean_x = np.zeros(n_features)
+        self.mean_y = 0.0
+        self.xtx = np.zeros((n_features, n_features))
+        self.xty = np.zeros(n_features)
+
+    def update(self, X, y):
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+        m = len(y)
+        if not m:
+            return
+        batch_mean_x, batch_mean_y = X.mean(axis=0), y.mean()
+        Xc, yc = X - batch_mean_x, y - batch_mean_y
+
+        n = self.n + m
+        dx, dy = batch_mean_x - self.mean_x, batch_mean_y - self.mean_y
+        weight = self.n * m / n
+        self.xtx += Xc.T @ Xc + weight * np.outer(dx, dx)
+        self.xty += Xc.T @ yc + weight * dx * dy
+        self.mean_x += dx * (m / n)
+        self.mean_y += dy * (m / n)
+        self.n = n
+
+    def solve(self) -> tuple:
+        """(coef, intercept) of the least-squares fit of every row seen so far."""
+        # Scale to unit diagonal first, so the solve does not suffer from the features' different units.
+        scale = np.sqrt(np.diag(self.xtx))
+        scale[scale == 0] = 1.0
+        z = np.linalg.lstsq(self.xtx / np.outer(scale, scale), self.xty / scale, rcond=None)[0]
+        coef = z / scale
+        return coef, float(self.mean_y - self.mean_x @ coef)
+
+
+@dataclass(frozen=True)
+class Coefficients:
+    coef: np.ndarray
+    intercept: float
+    rows: int
+    """Rows the coefficients were fitted on."""
+
+
+class OnlineLinearModel:
+    """
+    A linear regression that learns from batches while it serves predictions.
+
+    `partial_fit` merges a batch into the statistics and publishes new
+    coefficients with a single attribute assignment, so a concurrent
+    `predict` uses either the old or the new model, never a mix of both.
+    """
+
+    def __init__(self, n_features: int):
+        self._stats = RunningLeastSquares(n_features)
+        self._lock = threading.Lock()  # One writer at a time; readers never wait.
+        self.coefficients: Optional[Coefficients] = None
+
+    def partial_fit(self, X, y) -> Coefficients:
+        with self._lock:
+            self._stats.update(X, y)
+            coef, intercept = self._stats.solve()
+            coef.flags.writeable = False
+            self.coefficients = Coefficients(coef, intercept, self._stats.n)
+            return self.coefficients
+
+    def predict(self, X) -> np.ndarray:
+        current = self.coefficients
+        if current is None:
+            raise RuntimeError("the model has not seen any rows yet")
+        return np.asarray(X, dtype=float) @ current.coef + current.intercept
+
+
+class ListingFeed:
+    """
+    The listings appended to a CSV or JSONL file, read in chunks.
+
+    Each `chunks()` call continues where the previous one stopped and only
+    reads complete lines, so a file that another process is still writing
+    can be polled. CSV files need a header row; JSONL lines are objects. Both
+    need the `columns` and `target` fields, and rows without them (or with
+    non-numeric values) are skipped and counted.
+    """
+
+    def __init__(self, path: str, columns: Sequence[str] = FEATURES, target: str = TARGET,
+                 chunk_rows: int = 10_000):
+        self.path = path
+        self.columns = tuple(columns)
+        self.target = target
+        self.chunk_rows = chunk_rows
+        self.offset = 0
+        self.header = None
+        self.rows = 0
+        self.skipped = 0
+
+    def _parse(self, line: str) -> Optional[list]:
+        if self.path.endswith(".csv"):
+            values = next(csv.reader([line]))
+            if self.header is None:
+                self.header = values
+                return None
+            record = dict(zip(self.header, values))
+        else:
+            record = json.loads(line)
+        return [float(record[name]) for name in (*self.columns, self.target)]
+
+    def chunks(self) -> Iterator[tuple]:
+        """Yields (X, y) arrays of up to `chunk_rows` new rows."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            rows, position = [], self.offset
+            while True:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break  # End of file, or a line that is still being written.
+                position += len(line)
+                text = line.decode("utf-8").strip()
+                if text:
+                    try:
+                        row = self._parse(text)
+                    except (ValueError, KeyError, TypeError):
+                        self.skipped += 1
+                        row = None
+                    if row is not None:
+                        rows.append(row)
+                if len(rows) == self.chunk_rows:
+                    yield self._arrays(rows)
+                    self.offset, rows = position, []
+            if rows:
+                yield self._arrays(rows)
+            self.offset = position
+
+    def _arrays(self, rows: list) -> tuple:
+        self.rows += len(rows)
+        data = np.array(rows)
+        return data[:, :-1], data[:, -1]
+
+
+def follow(model: OnlineLinearModel, feed: ListingFeed, interval: float = 5.0) -> threading.Thread:
+    """Trains `model` on `feed` in a daemon thread, polling the file every `interval` seconds."""
+
+    def loop():
+        while True:
+            for X, y in feed.chunks():
+                start = time.perf_counter()
+                coefficients = model.partial_fit(X, y)
+                print(f"📈 Price model updated with {len(y)} listings "
+                      f"({coefficients.rows} total) in {(time.perf_counter() - start) * 1000:.2f} ms")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name="listing-feed", daemon=True)
+    thread.start()
+    return thread
@@ -1,13 +1,25 @@
-import torch
-from transformers import pipeline
+import functools
+import os
+
 from google.adk.agents import Agent
 from google.adk.models.google_llm import Gemini
 from google.adk.runners import InMemoryRunner
-from google.genai import types
+
+from adk_common.cpu_pool import cpu_bound, default_pool
+from adk_common.finance_lexicon import FINANCE_EXAMPLES, FINANCE_TERMS, OFF_TOPIC_EXAMPLES
+from adk_common.retry import RetryingLlm, RetryPolicy
+from adk_common.tool_budget import ToolOutputBudget
+from adk_common.topic_gate import NaiveBayes, PhraseMatcher, TopicGate
 
 # --- 1. THE ENSEMBLE ENGINE ---
 class SentimentEnsemble:
     def __init__(self):
+        # transformers (and torch under it) take seconds to import, so only the
+        # processes that load the models import them, not the agent module.
+        from transformers import pipeline
+
+        # The CPU pool's workers are forked after loading: keep the tokenizers' threads off until then.
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
         print("⏳ Loading Ensemble Models (this loads 3 different neural nets)...")
         
         # Model 1: Specialized for Finance (The "Professional")
@@ -30,6 +42,12 @@ class SentimentEnsemble:
             model="distilbert-base-uncased-finetuned-sst-2-english",
             return_all_scores=True
         )
+
+        # Inference only (no dropout, no gradients): nothing writes to the weights, so the
+        # workers forked from this process keep sharing their memory pages.
+        for nlp in (self.finbert, self.roberta, self.generic):
+            nlp.model.eval()
+            nlp.model.requires_grad_(False)
         print("✅ Ensemble Engine Ready.")
 
     def _get_top_score(self, raw_output, model_type):
@@ -57,48 +75,70 @@ class SentimentEnsemble:
             "model_3_distilbert_generic": self._get_top_score(res_gen, 'generic')
         }
 
-# Initialize once
-ensemble = SentimentEnsemble()
+# Initialize once per process. The three models run in the CPU pool's workers
+# (see analyze_market_sentiment). On Linux, `default_pool.start()` at startup
+# loads them once, in the server process, and forks the workers, so every
+# worker shares the same copy of the weights instead of loading its own.
+@functools.lru_cache(maxsize=1)
+def load_ensemble() -> SentimentEnsemble:
+    return SentimentEnsemble()
 
 
 # --- 2. THE TOOLS ---
 
+# Three transformer passes hold the GIL for a while: run them in a worker process
+# so the other sessions on the event loop keep streaming (adk_common/cpu_pool.py).
+@cpu_bound(warm_up=load_ensemble, preload=True)
 def analyze_market_sentiment(headline: str) -> str:
     """
     Runs a multi-model sentiment analysis on a financial headline.
     Returns a dictionary comparison of how different AI models view the text.
     """
     try:
-        results = ensemble.analyze(headline)
+        results = load_ensemble().analyze(headline)
         return str(results)
     except Exception as e:
         return f"Ensemble Error: {e}"
 
+# The finance gate runs before the agent: an off-topic opening prompt gets the
+# refusal without a Gemini call or an ensemble run. Once a session is on topic,
+# follow-ups pass through and the agent checks drift with `validate_topic`. Lexicon terms are matched as whole
+# words in one pass; prompts with no term go to a tiny local classifier.
+topic_gate = TopicGate(
+    PhraseMatcher(FINANCE_TERMS),
+    classifier=NaiveBayes(FINANCE_EXAMPLES, OFF_TOPIC_EXAMPLES).probability,
+    threshold=0.8,
+    refusal="I'm a financial analyst desk, so I can only comment on markets, companies and the economy. "
+            "Send me a finance headline or question and I'll run the sentiment models on it.",
+)
+
 def validate_topic(topic: str) -> str:
     """
     Strictly checks if a topic is related to finance, stocks, crypto, or economics.
     Returns 'APPROVED' or 'REJECTED'.
     """
-    # Simple keyword filter for demo speed (In prod, use an LLM classifier)
-    keywords = ['stock', 'market', 'price', 'usd', 'bitcoin', 'revenue', 'profit', 'loss', 'inflation', 'fed', 'trade', 'buy', 'sell']
-    if any(k in topic.lower() for k in keywords):
-        return "APPROVED"
-    return "REJECTED"
+    return "APPROVED" if topic_gate.check(topic).allowed else "REJECTED"
 
 
 # --- 3. THE AGENT ---
-retry_config = types.HttpRetryOptions(attempts=3, exp_base=2, initial_delay=1)
+# Jittered retries with a shared retry budget and a circuit breaker (adk_common/retry.py).
+# The retry options this agent had before left the statuses at the google-genai
+# default, which also retries 408 and 502.
+retry_policy = RetryPolicy(attempts=3, retry_statuses=(408, 429, 500, 502, 503, 504))
+# `analyze_market_sentiment` returns str(dict); hand it to the model as structured
+# data and count the tokens each tool adds (state["tool_tokens"]).
+tool_budget = ToolOutputBudget(turn_budget=1_000, tool_budget=500)
 
 root_agent = Agent(
     name="HedgeFundAnalyst",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite"), policy=retry_policy),
     description="A multi-model financial analyst.",
     instruction="""
     You are a Senior Quantitative Analyst.
     
     YOUR WORKFLOW:
-    1.  **Filter**: Check the user's input using the `validate_topic` logic (conceptually). 
-        - If the user asks about non-finance topics (e.g., "Best pizza recipe"), politely REFUSE to answer.
+    1.  **Filter**: An off-topic first request is refused before it reaches you. If a follow-up drifts
+        away from finance, check it with `validate_topic` and politely REFUSE if it is 'REJECTED'.
     
     2.  **Analyze**: If finance-related, call `analyze_market_sentiment` with the text.
     
@@ -114,7 +154,10 @@ root_agent = Agent(
     - **Model Breakdown**: [List the 3 scores]
     - **Analyst Commentary**: [Your synthesis of the discrepancy]
     """,
-    tools=[analyze_market_sentiment, validate_topic]
+    tools=[analyze_market_sentiment, validate_topic],
+    before_agent_callback=topic_gate.before_agent_callback,
+    after_tool_callback=tool_budget.after_tool_callback,
+    before_model_callback=tool_budget.before_model_callback,
 )
 
 # --- 4. RUNNER ---
@@ -122,6 +165,8 @@ runner = InMemoryRunner(agent=root_agent)
 
 if __name__ == "__main__":
     print("\n📈 Hedge Fund Desk Active...\n")
+    # Load the ensemble and fork the CPU workers before the runner starts its threads.
+    default_pool.start()
     
     # TEST CASE 1: A tricky headline (Good revenue but missed expectations)
     # This often confuses generic models but FinBERT catches the nuance.
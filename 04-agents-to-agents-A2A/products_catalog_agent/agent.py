@@ -7,20 +7,14 @@ from google.adk.agents.remote_a2a_agent import (
 from google.adk.models.google_llm import Gemini
 from google.genai import types
 
+from adk_common.retry import RetryingLlm
+
 # Hide additional warnings in the notebook
 import warnings
 
 warnings.filterwarnings("ignore")
 
 
-retry_config = types.HttpRetryOptions(
-    attempts=5,  # Maximum retry attempts
-    exp_base=7,  # Delay multiplier
-    initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],  # Retry on these HTTP errors
-)
-
-
 # Create a RemoteA2aAgent that connects to our Product Catalog Agent
 # This acts as a client-side proxy - the Customer Support Agent can use it like a local agent
 remote_product_catalog_agent = RemoteA2aAgent(
@@ -28,6 +22,9 @@ remote_product_catalog_agent = RemoteA2aAgent(
     description="Remote product catalog agent from external vendor that provides product information.",
     # Point to the agent card URL - this is where the A2A protocol metadata lives
     agent_card=f"http://localhost:8001{AGENT_CARD_WELL_KNOWN_PATH}",
+    # Ask for ADK's newer A2A event format, in which the server's partial answers arrive as
+    # partial events (shown as they come, not stored in the session). See adk_common/a2a_streaming.py.
+    use_legacy=False,
 )
 
 print("✅ Remote Product Catalog Agent proxy created!")
@@ -39,7 +36,7 @@ print("   The Customer Support Agent can now use this like a local sub-agent!")
 
 # Now create the Customer Support Agent that uses the remote Product Catalog Agent
 root_agent = LlmAgent(
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite")),
     name="customer_support_agent",
     description="A customer support assistant that helps customers with product inquiries and information.",
     instruction="""
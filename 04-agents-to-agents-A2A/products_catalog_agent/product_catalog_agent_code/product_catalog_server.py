@@ -1,17 +1,16 @@
 from google.adk.agents import LlmAgent
-from google.adk.a2a.utils.agent_to_a2a import to_a2a
 from google.adk.models.google_llm import Gemini
-from google.genai import types
+
+from adk_common.a2a_streaming import to_streaming_a2a
+from adk_common.admission import AdmissionMiddleware
+from adk_common.retry import RetryingLlm
+from adk_common.tool_dispatch import default_dispatcher
 
 
 
 # uvicorn product_catalog_server:app --host localhost --port 8001 
-retry_config = types.HttpRetryOptions(
-    attempts=5,  # Maximum retry attempts
-    exp_base=7,  # Delay multiplier
-    initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],  # Retry on these HTTP errors
-)
+# (run from this folder with the repository root on PYTHONPATH, for `adk_common`)
+
 
 def get_product_info(product_name: str) -> str:
     """Get product information for a given product."""
@@ -34,7 +33,7 @@ def get_product_info(product_name: str) -> str:
         return f"Sorry, I don't have information for {product_name}. Available products: {available}"
 
 root_agent = LlmAgent(
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
+    model=RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite")),
     name="product_catalog_agent",
     description="External vendor's product catalog agent that provides product information and availability.",
     instruction="""
@@ -44,8 +43,12 @@ root_agent = LlmAgent(
     If asked about multiple products, look up each one.
     Be professional and helpful.
     """,
-    tools=[get_product_info]
+    # "Look up each one": the lookups of one turn run at the same time (see adk_common/tool_dispatch.py).
+    tools=default_dispatcher.tools([get_product_info])
 )
 
 # Create the A2A app
-app = to_a2a(root_agent, port=8001)
\ No newline at end of file
+# Streams the answer to the caller chunk by chunk as the model writes it (see adk_common/a2a_streaming.py).
+app = to_streaming_a2a(root_agent, port=8001)
+# Runs at most 4 questions at once and queues 32 more; beyond that callers get a 503 (see adk_common/admission.py).
+app.add_middleware(AdmissionMiddleware, agent_name=root_agent.name, paths=("/",))
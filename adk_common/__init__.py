@@ -0,0 +1 @@
+"""Shared building blocks for the example agents (model wrappers, schedulers, fakes)."""
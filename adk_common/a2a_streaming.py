@@ -0,0 +1,53 @@
+"""
+Streams an A2A server's answer to the calling agent as it is generated.
+
+`to_a2a` runs the agent without streaming, so its model produces the whole
+answer before the first byte goes out, and the caller's time to first token
+includes the full remote generation. `to_streaming_a2a` builds the same
+Starlette app, but:
+
+- runs the agent with `StreamingMode.SSE`, so every model chunk becomes a
+  partial ADK event;
+- uses ADK's artifact-based A2A event format for every request. Partial
+  events go out over the `message/stream` SSE response as appended artifact
+  chunks, and the final event replaces them with the whole answer.
+
+A `RemoteA2aAgent` on the other side yields those chunks as `partial=True`
+events (the runner shows them but does not store them) followed by one final
+event, whichever `use_legacy` it was created with: it picks the format from
+the response metadata.
+
+    app = to_streaming_a2a(root_agent, port=8001)
+    # uvicorn product_catalog_server:app --host localhost --port 8001
+"""
+from a2a.server.agent_execution import RequestContext
+from google.adk.a2a.converters.part_converter import convert_a2a_part_to_genai_part
+from google.adk.a2a.converters.request_converter import AgentRunRequest, convert_a2a_request_to_agent_run_request
+from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor
+from google.adk.a2a.executor.config import A2aAgentExecutorConfig
+from google.adk.a2a.utils.agent_to_a2a import to_a2a
+from google.adk.agents.run_config import StreamingMode
+from google.adk.runners import Runner
+
+
+def streaming_run_request(request: RequestContext, part_converter=convert_a2a_part_to_genai_part) -> AgentRunRequest:
+    """The default A2A request conversion, with SSE streaming turned on for the run."""
+    run_request = convert_a2a_request_to_agent_run_request(request, part_converter)
+    run_request.run_config.streaming_mode = StreamingMode.SSE
+    return run_request
+
+
+def streaming_executor(runner: Runner) -> A2aAgentExecutor:
+    """An `agent_executor_factory` for `to_a2a` that streams partial events as artifact chunks."""
+    # The caller's "new integration" extension header does not reach the server with a2a-sdk 1.x,
+    # so the chunked format is used for every request; clients detect it from the response metadata.
+    return A2aAgentExecutor(
+        runner=runner,
+        config=A2aAgentExecutorConfig(request_converter=streaming_run_request),
+        force_new_version=True,
+    )
+
+
+def to_streaming_a2a(agent, **kwargs):
+    """`to_a2a(agent, **kwargs)` with streaming responses."""
+    return to_a2a(agent, agent_executor_factory=streaming_executor, **kwargs)
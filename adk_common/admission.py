@@ -0,0 +1,359 @@
+"""
+Admission control for the agent server: bounded per-agent queues, priority classes and fast 503s.
+
+Without it, every request to the API server (`adk api_server`, `adk web`) or
+to an A2A app starts its run immediately. Under a burst, all of them compete
+for the same model quota, CPU pool and A2A connections, and every request
+slows down. `AdmissionMiddleware` sits in front of the runner:
+
+    from adk_common.admission import AdmissionController, AdmissionMiddleware, AgentLimits
+
+    controller = AdmissionController({"product_catalog_agent": AgentLimits(concurrency=4, max_queue=16)})
+    app.add_middleware(AdmissionMiddleware, controller=controller, agent_name="product_catalog_agent", paths=("/",))
+
+or, for a whole folder of agents behind the ADK API server:
+
+    PYTHONPATH=$PWD python -m adk_common.admission 03-workflows-agents --port 8000 --concurrency 4 --max-queue 32
+
+- Each agent runs at most `concurrency` requests at once. The rest wait in
+  its queue, interactive requests ahead of batch ones (`X-Priority: batch`),
+  first come first served within a class.
+- The queue holds at most `max_queue` requests. When it is full, a batch
+  request gets a 503 right away; an interactive one takes the place of the
+  newest batch request (which gets the 503), or gets it itself.
+- Requests have a deadline: `X-Request-Timeout` (seconds), else the class
+  default of the agent's `AgentLimits`. A request that can no longer finish
+  in time, given the agent's recent run time and the queue ahead of it, is
+  turned away when it arrives or dropped from the queue when it gets too
+  late, instead of running for a client that has given up.
+- Rejections are `503 Service Unavailable` with a `Retry-After` header and a
+  JSON body `{"error": "overloaded", "reason": "queue_full" | "shed" | "deadline", ...}`.
+
+Metrics go to `telemetry.default_metrics` (Prometheus with `serve_metrics` or
+`ADK_METRICS_PORT`): `adk_admission_queue_depth` and `adk_admission_in_flight`
+gauges, the `adk_admission_wait_seconds` histogram and the admitted/rejected
+counters.
+
+The controller is not thread-safe: use it from the server's event loop.
+"""
+import argparse
+import asyncio
+import collections
+import contextlib
+import json
+import math
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from .telemetry import Metrics, default_metrics
+
+PRIORITIES = ("interactive", "batch")  # Highest first
+# A2A JSON-RPC methods that start a run (v1 names and their v0.3 spelling); task polls go straight through.
+A2A_RUN_METHODS = {"SendMessage", "SendStreamingMessage", "message/send", "message/stream"}
+
+
+@dataclass
+class AgentLimits:
+    """How much one agent may run and queue. Timeouts are the default deadlines, `None` for none."""
+
+    concurrency: int = 4
+    max_queue: int = 32
+    interactive_timeout: Optional[float] = 30.0
+    batch_timeout: Optional[float] = None
+
+
+class Overloaded(Exception):
+    """The request was not admitted: `reason` is "queue_full", "shed" or "deadline"."""
+
+    def __init__(self, agent: str, reason: str, retry_after: float):
+        super().__init__(f"{agent} is overloaded ({reason}), retry in {retry_after:.0f}s")
+        self.agent = agent
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("future", "priority", "deadline", "enqueued", "timer")
+
+    def __init__(self, future, priority, deadline, enqueued):
+        self.future = future
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued = enqueued
+        self.timer = None
+
+
+class _AgentQueue:
+    def __init__(self, limits: AgentLimits):
+        self.limits = limits
+        self.running = 0
+        self.waiting = {priority: collections.deque() for priority in PRIORITIES}
+        self.run_seconds = None  # Moving average of recent run times, once there is one
+
+    def depth(self) -> int:
+        return sum(len(queue) for queue in self.waiting.values())
+
+
+# --- 1. The controller ---
+
+class AdmissionController:
+    """Per-agent run slots with bounded priority queues and deadline-aware dropping."""
+
+    def __init__(
+        self,
+        limits: Optional[dict] = None,
+        default: AgentLimits = AgentLimits(),
+        metrics: Metrics = default_metrics,
+        clock=time.monotonic,
+    ):
+        self.limits = dict(limits or {})
+        self.default = default
+        self.metrics = metrics
+        self._clock = clock
+        self._queues = {}
+
+    def _queue(self, agent: str) -> _AgentQueue:
+        if agent not in self._queues:
+            self._queues[agent] = _AgentQueue(self.limits.get(agent, self.default))
+        return self._queues[agent]
+
+    def _publish(self, agent: str, queue: _AgentQueue):
+        for priority, waiting in queue.waiting.items():
+            self.metrics.set("adk_admission_queue_depth", len(waiting), "Requests waiting for a run slot",
+                             agent=agent, priority=priority)
+        self.metrics.set("adk_admission_in_flight", queue.running, "Requests running", agent=agent)
+
+    def _retry_after(self, queue: _AgentQueue) -> float:
+        """Seconds until the agent has worked through what it holds now."""
+        backlog = queue.running + queue.depth()
+        return max(1.0, math.ceil(backlog / queue.limits.concurrency * (queue.run_seconds or 1.0)))
+
+    def _reject(self, agent: str, queue: _AgentQueue, priority: str, reason: str) -> Overloaded:
+        self.metrics.inc("adk_admission_rejected_total", help="Requests turned away or dropped",
+                         agent=agent, priority=priority, reason=reason)
+        return Overloaded(agent, reason, self._retry_after(queue))
+
+    def _too_late(self, queue: _AgentQueue, deadline: Optional[float], now: float, ahead: int = 0) -> bool:
+        """Whether a request with `ahead` requests before it would finish after `deadline`."""
+        if deadline is None or queue.run_seconds is None:
+            return False
+        start = (ahead + 1) / queue.limits.concurrency * queue.run_seconds if ahead or queue.running else 0.0
+        return now + start + queue.run_seconds > deadline
+
+    def _admit(self, agent: str, queue: _AgentQueue, priority: str, waited: float):
+        queue.running += 1
+        self.metrics.inc("adk_admission_admitted_total", help="Requests given a run slot", agent=agent, priority=priority)
+        self.metrics.observe("adk_admission_wait_seconds", waited, "Time spent in the queue",
+                             agent=agent, priority=priority)
+
+    async def acquire(self, agent: str, priority: str = "interactive", timeout: Optional[float] = None) -> float:
+        """
+        Waits for a run slot of `agent` and returns the seconds waited; raises `Overloaded` if turned away.
+
+        `timeout` is the request's deadline in seconds from now (default: the agent's limit for `priority`).
+        Every successful `acquire` must be followed by a `release`.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {PRIORITIES}, not {priority!r}")
+        queue = self._queue(agent)
+        if timeout is None:
+            timeout = getattr(queue.limits, f"{priority}_timeout")
+        now = self._clock()
+        deadline = now + timeout if timeout is not None else None
+
+        if queue.running < queue.limits.concurrency and not queue.depth():
+            self._admit(agent, queue, priority, 0.0)
+            self._publish(agent, queue)
+            return 0.0
+
+        rank = PRIORITIES.index(priority)
+        ahead = sum(len(queue.waiting[p]) for p in PRIORITIES[:rank + 1])
+        if self._too_late(queue, deadline, now, ahead):
+            raise self._reject(agent, queue, priority, "deadline")
+        if queue.depth() >= queue.limits.max_queue:
+            # Make room by shedding the newest request of a lower class, if there is one.
+            lower = next((queue.waiting[p] for p in reversed(PRIORITIES[rank + 1:]) if queue.waiting[p]), None)
+            if lower is None:
+                raise self._reject(agent, queue, priority, "queue_full")
+            self._drop(agent, queue, lower.pop(), "shed")
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(loop.create_future(), priority, deadline, now)
+        queue.waiting[priority].append(waiter)
+        if deadline is not None:
+            # Dropped once it could no longer finish in time (or at the deadline, before any run time is known).
+            latest = deadline - (queue.run_seconds or 0.0)
+            waiter.timer = loop.call_later(max(0.0, latest - now), self._expire, agent, queue, waiter)
+        self._publish(agent, queue)
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            # The client went away: give the slot back if it was granted meanwhile, else leave the queue.
+            if waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+                self.release(agent)
+            elif waiter in queue.waiting[priority]:
+                queue.waiting[priority].remove(waiter)
+                self._publish(agent, queue)
+            raise
+
+    def _drop(self, agent: str, queue: _AgentQueue, waiter: _Waiter, reason: str):
+        if waiter.timer:
+            waiter.timer.cancel()
+        if not waiter.future.done():
+            waiter.future.set_exception(self._reject(agent, queue, waiter.priority, reason))
+
+    def _expire(self, agent: str, queue: _AgentQueue, waiter: _Waiter):
+        if waiter in queue.waiting[waiter.priority]:
+            queue.waiting[waiter.priority].remove(waiter)
+            self._drop(agent, queue, waiter, "deadline")
+            self._publish(agent, queue)
+
+    def release(self, agent: str, run_seconds: Optional[float] = None):
+        """Frees the slot taken by `acquire` and hands it to the next request that can still finish in time."""
+        queue = self._queue(agent)
+        queue.running -= 1
+        if run_seconds is not None:
+            queue.run_seconds = run_seconds if queue.run_seconds is None else 0.8 * queue.run_seconds + 0.2 * run_seconds
+        now = self._clock()
+        while queue.running < queue.limits.concurrency and queue.depth():
+            waiter = next(q for q in queue.waiting.values() if q).popleft()
+            # It starts now, so only its own run has to fit before the deadline.
+            if waiter.deadline is not None and queue.run_seconds is not None \
+                    and now + queue.run_seconds > waiter.deadline:
+                self._drop(agent, queue, waiter, "deadline")
+                continue
+            if waiter.timer:
+                waiter.timer.cancel()
+            if waiter.future.done():  # Cancelled by its client
+                continue
+            self._admit(agent, queue, waiter.priority, now - waiter.enqueued)
+            waiter.future.set_result(now - waiter.enqueued)
+        self._publish(agent, queue)
+
+    @contextlib.asynccontextmanager
+    async def admit(self, agent: str, priority: str = "interactive", timeout: Optional[float] = None):
+        """`async with controller.admit(agent):` runs the block in a slot of `agent` (for in-process callers)."""
+        waited = await self.acquire(agent, priority, timeout)
+        start = self._clock()
+        try:
+            yield waited
+        finally:
+            self.release(agent, self._clock() - start)
+
+    def depth(self, agent: str) -> int:
+        return self._queue(agent).depth()
+
+
+default_controller = AdmissionController()
+
+
+# --- 2. The ASGI middleware ---
+
+class AdmissionMiddleware:
+    """
+    Admits the run requests of an ASGI app through `controller`, answering 503 to those it turns away.
+
+    Gates POST requests to `paths`: "/run" and "/run_sse" of the ADK API server (the agent is the body's
+    `appName`), or "/" of an A2A app (pass its `agent_name`; only the send-message methods are gated).
+    """
+
+    def __init__(self, app, controller: AdmissionController = default_controller,
+                 agent_name: Optional[str] = None, paths=("/run", "/run_sse")):
+        self.app = app
+        self.controller = controller
+        self.agent_name = agent_name
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        body, more = b"", True
+        while more:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            more = message.get("more_body", False)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()  # Disconnects, which the server watches for
+
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            payload = {}
+        if not isinstance(payload, dict) or ("method" in payload and payload["method"] not in A2A_RUN_METHODS):
+            await self.app(scope, replay, send)
+            return
+
+        headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope["headers"]}
+        agent = self.agent_name or payload.get("appName") or payload.get("app_name") or "default"
+        priority = headers.get("x-priority", "interactive").lower()
+        if priority not in PRIORITIES:
+            priority = "interactive"
+        try:
+            timeout = float(headers["x-request-timeout"]) if "x-request-timeout" in headers else None
+        except ValueError:
+            timeout = None
+
+        try:
+            await self.controller.acquire(agent, priority, timeout)
+        except Overloaded as e:
+            await _send_overloaded(send, e)
+            return
+        start = time.monotonic()
+        try:
+            await self.app(scope, replay, send)
+        finally:
+            self.controller.release(agent, time.monotonic() - start)
+
+
+async def _send_overloaded(send, error: Overloaded):
+    body = json.dumps({"error": "overloaded", "reason": error.reason, "agent": error.agent,
+                       "retry_after": error.retry_after}).encode()
+    await send({"type": "http.response.start", "status": 503, "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"retry-after", str(int(error.retry_after)).encode()),
+    ]})
+    await send({"type": "http.response.body", "body": body})
+
+
+# --- 3. Serving a folder of agents ---
+
+def main():
+    parser = argparse.ArgumentParser(description="The ADK API server with admission control in front of every agent.")
+    parser.add_argument("agents_dir", help="folder of agent folders, as for `adk api_server`")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--web", action="store_true", help="also serve the dev UI")
+    parser.add_argument("--concurrency", type=int, default=AgentLimits.concurrency, help="runs at once, per agent")
+    parser.add_argument("--max-queue", type=int, default=AgentLimits.max_queue, help="waiting requests, per agent")
+    parser.add_argument("--timeout", type=float, default=AgentLimits.interactive_timeout,
+                        help="default deadline of interactive requests (seconds)")
+    args = parser.parse_args()
+
+    import uvicorn
+    from google.adk.cli.fast_api import get_fast_api_app
+
+    from .telemetry import setup_from_env
+
+    setup_from_env()  # ADK_METRICS_PORT serves the queue metrics
+    controller = AdmissionController(default=AgentLimits(concurrency=args.concurrency, max_queue=args.max_queue,
+                                                         interactive_timeout=args.timeout))
+    app = get_fast_api_app(agents_dir=args.agents_dir, web=args.web, host=args.host, port=args.port)
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+    print(f"🚦 {args.concurrency} runs and {args.max_queue} queued requests per agent, then 503")
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
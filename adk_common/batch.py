@@ -0,0 +1,303 @@
+"""
+Runs an agent over a JSONL file of prompts.
+
+    PYTHONPATH=$PWD python -m adk_common.batch 03-workflows-agents/sequential_agent prompts.jsonl \\
+        --out results.jsonl --concurrency 8 --rpm 15 --state-key final_blog
+
+Each input line is a prompt, either a JSON string or an object:
+
+    {"id": "post-17", "prompt": "A blog post about tidal energy", "state": {"audience": "students"}}
+
+(`id` defaults to the line number, `state` is the session's initial state).
+Every prompt runs in a new session, at most `--concurrency` at a time, and
+its result is appended to `--out` as soon as it is done:
+
+    {"id": "post-17", "prompt": "...", "response": "...", "state": {...}, "seconds": 4.2}
+
+A failed prompt is written with an `"error"` instead of a `"response"`.
+
+The output file is also the checkpoint: each line is flushed when it is
+written, and a rerun with the same `--out` skips every id that already has a
+response, so a crashed or interrupted job resumes where it stopped (failed
+ids are tried again; the last line for an id is its result). A half-written
+last line from a crash is cut off before the run continues.
+
+Progress and an ETA are printed to stderr every `--progress-every` seconds.
+Throughput grows with `--concurrency` until the model quota is reached;
+with `--rpm` / `--tpm` every model of the agent is routed through
+`RateLimitedLlm`, so the job queues at the quota instead of collecting 429s.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from .llm_wrapper import WrappedLlm
+from .loader import iter_agents, load_agent_module
+from .rate_limit import ModelQuota, RateLimitedLlm, RateScheduler, default_scheduler
+
+
+# --- 1. Input and checkpoint ---
+
+@dataclass
+class BatchItem:
+    id: str
+    prompt: str
+    state: dict = field(default_factory=dict)
+
+
+def read_items(path: str) -> Iterator[BatchItem]:
+    """The prompts of a JSONL file, one `BatchItem` per non-empty line."""
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                yield BatchItem(id=str(number), prompt=record)
+            else:
+                yield BatchItem(id=str(record.get("id", number)), prompt=record["prompt"], state=record.get("state") or {})
+
+
+def completed_ids(out_path: str) -> set:
+    """
+    Ids that already have a response in `out_path`.
+
+    A last line without its newline (the process died while writing it) is
+    removed from the file.
+    """
+    if not os.path.exists(out_path):
+        return set()
+    with open(out_path, "rb") as f:
+        data = f.read()
+    if data and not data.endswith(b"\n"):
+        with open(out_path, "r+b") as f:
+            f.truncate(data.rfind(b"\n") + 1)
+        data = data[:data.rfind(b"\n") + 1]
+
+    done = set()
+    for line in data.decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if "error" in record:
+            done.discard(record["id"])
+        else:
+            done.add(record["id"])
+    return done
+
+
+# --- 2. Quota ---
+
+def rate_limit(root: BaseAgent, quota: ModelQuota, scheduler: RateScheduler = default_scheduler) -> int:
+    """
+    Sets `quota` for every model under `root` and routes the models that are
+    not rate-limited yet through `RateLimitedLlm` (innermost, so retries and
+    caches stay outside). Returns the number of models wrapped.
+    """
+    wrapped = 0
+    for agent in iter_agents(root):
+        if not isinstance(agent, LlmAgent) or not agent.model or isinstance(agent.model, str):
+            continue
+        outer, model = None, agent.model
+        while isinstance(model, WrappedLlm) and not isinstance(model, RateLimitedLlm):
+            outer, model = model, model.llm
+        if isinstance(model, RateLimitedLlm):
+            model.scheduler.set_quota(model.model, quota)
+            continue
+        scheduler.set_quota(model.model, quota)
+        if outer is None:
+            agent.model = RateLimitedLlm(llm=model, scheduler=scheduler)
+        else:
+            outer.llm = RateLimitedLlm(llm=model, scheduler=scheduler)
+        wrapped += 1
+    return wrapped
+
+
+# --- 3. Running the batch ---
+
+@dataclass
+class BatchStats:
+    total: int = 0
+    skipped: int = 0
+    done: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return (self.done + self.failed) / self.seconds if self.seconds else 0.0
+
+
+def _final_text(events) -> str:
+    text = ""
+    for event in events:
+        if event.is_final_response() and event.content:
+            parts = [part.text for part in event.content.parts or [] if part.text and not part.thought]
+            if parts:
+                text = "".join(parts)
+    return text
+
+
+def _format_eta(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
+
+
+async def run_batch(
+    root: BaseAgent,
+    items: Iterable[BatchItem],
+    out_path: str,
+    concurrency: int = 8,
+    state_keys: Iterable[str] = (),
+    total: Optional[int] = None,
+    progress_every: float = 5.0,
+    plugins: Optional[list] = None,
+    session_service=None,
+) -> BatchStats:
+    """
+    Runs `root` once per item (skipping the ones `out_path` already has) and
+    appends the results to `out_path`.
+    """
+    state_keys = list(state_keys)
+    runner = Runner(agent=root, app_name="batch", session_service=session_service or InMemorySessionService(),
+                    plugins=plugins or [])
+    done_before = completed_ids(out_path)
+    stats = BatchStats(total=total or 0)
+    queue = asyncio.Queue(maxsize=concurrency * 2)  # Read the input lazily: it may not fit in memory.
+    start = time.perf_counter()
+
+    out = open(out_path, "a", encoding="utf-8")
+
+    def write(record: dict):
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()  # One line per item, on disk before the next one starts: this is the checkpoint.
+
+    async def run_one(item: BatchItem):
+        user_id = f"batch-{item.id}"
+        message = types.Content(role="user", parts=[types.Part(text=item.prompt)])
+        began = time.perf_counter()
+        record, session = {"id": item.id, "prompt": item.prompt}, None
+        try:
+            session = await runner.session_service.create_session(app_name=runner.app_name, user_id=user_id,
+                                                                  state=dict(item.state))
+            events = [event async for event in runner.run_async(user_id=user_id, session_id=session.id,
+                                                                new_message=message)]
+            record["response"] = _final_text(events)
+            if state_keys:
+                session = await runner.session_service.get_session(app_name=runner.app_name, user_id=user_id,
+                                                                   session_id=session.id)
+                record["state"] = {key: session.state.get(key) for key in state_keys}
+            stats.done += 1
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            stats.failed += 1
+        record["seconds"] = round(time.perf_counter() - began, 3)
+        write(record)
+        if session is not None:  # Keep memory flat over thousands of items.
+            await runner.session_service.delete_session(app_name=runner.app_name, user_id=user_id,
+                                                        session_id=session.id)
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            try:
+                if item is None:
+                    return
+                await run_one(item)
+            finally:
+                queue.task_done()
+
+    def report(final: bool = False):
+        elapsed = time.perf_counter() - start
+        finished = stats.done + stats.failed
+        rate = finished / elapsed if elapsed else 0.0
+        remaining = stats.total - stats.skipped - finished if stats.total else 0
+        eta = f" · ETA {_format_eta(remaining / rate)}" if rate and remaining > 0 and not final else ""
+        of_total = f"/{stats.total - stats.skipped}" if stats.total else ""
+        print(f"{'✅' if final else '📦'} {finished}{of_total} done · {rate:.2f} items/s{eta} · "
+              f"{stats.failed} failed · {stats.skipped} skipped (checkpoint)", file=sys.stderr, flush=True)
+
+    async def reporter():
+        while True:
+            await asyncio.sleep(progress_every)
+            os.fsync(out.fileno())
+            report()
+
+    async def put(item: Optional[BatchItem]):
+        # A worker only exits on its None, so one that is done before has failed outside `run_one` (e.g. the
+        # output disk is full): raise its error instead of waiting forever for room in the queue.
+        while True:
+            for task in workers:
+                if task.done():
+                    task.result()
+                    raise RuntimeError("a batch worker exited before the end of the input")
+            if not queue.full():
+                queue.put_nowait(item)
+                return
+            waiter = asyncio.ensure_future(queue.put(item))
+            await asyncio.wait([waiter, *workers], return_when=asyncio.FIRST_COMPLETED)
+            if waiter.done():
+                return
+            waiter.cancel()
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    progress = asyncio.create_task(reporter()) if progress_every else None
+    try:
+        for item in items:
+            if item.id in done_before:
+                stats.skipped += 1
+                continue
+            await put(item)
+        for _ in workers:
+            await put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers + ([progress] if progress else []):
+            task.cancel()
+        out.close()
+        stats.seconds = time.perf_counter() - start
+    if progress_every:
+        report(final=True)
+    return stats
+
+
+# --- 4. Command line ---
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("agent_dir", help="agent folder, e.g. 03-workflows-agents/sequential_agent")
+    parser.add_argument("prompts", help="input JSONL")
+    parser.add_argument("--out", required=True, help="output JSONL (also the checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--state-key", action="append", default=[], help="session state key(s) to write out")
+    parser.add_argument("--rpm", type=float, help="model quota, requests per minute")
+    parser.add_argument("--tpm", type=float, help="model quota, tokens per minute")
+    parser.add_argument("--progress-every", type=float, default=5.0, help="seconds between progress lines")
+    args = parser.parse_args()
+
+    root = load_agent_module(args.agent_dir).root_agent
+    if args.rpm or args.tpm:
+        rate_limit(root, ModelQuota(requests_per_minute=args.rpm, tokens_per_minute=args.tpm))
+    with open(args.prompts, encoding="utf-8") as f:
+        total = sum(1 for line in f if line.strip())
+
+    stats = asyncio.run(run_batch(root, read_items(args.prompts), args.out, concurrency=args.concurrency,
+                                  state_keys=args.state_key, total=total, progress_every=args.progress_every))
+    print(f"🏁 {stats.done} done, {stats.failed} failed, {stats.skipped} skipped in {stats.seconds:.1f}s "
+          f"({stats.throughput:.2f} items/s) → {args.out}")
+    sys.exit(1 if stats.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Keeps each request sent to the model under a token budget.
+
+Every turn of a loop or chat is appended to the session, and an `LlmAgent`
+re-sends all of it, so older drafts and critiques that later turns have
+superseded make every prompt longer. `ContextCompactor` runs as a
+`before_model_callback`, i.e. between turns, and shrinks `llm_request.contents`
+when the request is over budget. The budget covers the whole prompt: the
+system instruction (with the state values it interpolates), the digest of
+dropped messages and the contents:
+
+    compactor = ContextCompactor(token_budget=1_500, protected_keys=instruction_keys(critic_agent, refiner_agent))
+    critic_agent.before_model_callback = compactor.before_model_callback
+
+The first message (the user's request) and the last `keep_recent` messages
+are always kept. Older messages are compacted in three steps, stopping as
+soon as the request fits:
+
+1. text that repeats the current value of a protected state key (a key an
+   instruction interpolates, e.g. `{current_story}`) is replaced by a pointer
+   to that key: the model already gets the value through the instruction;
+2. the remaining older text is summarized to about `summary_chars`
+   characters: whole sentences from its start and its end (`summarize`);
+3. the oldest messages are dropped, a function call always together with its
+   response. A digest of them (their author and first sentence) is appended
+   to the system instruction, not to the conversation, so the model does not
+   read it as something the user said.
+
+Only the request is changed: the session keeps every event and every state
+key, so instructions interpolate exactly as before.
+"""
+import re
+from typing import Iterable, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from .rate_limit import estimate_request_tokens
+
+_PLACEHOLDER = re.compile(r"{+([^{}]*)}+")
+_SENTENCE_END = re.compile(r"(?<=[^\d\s][.!?])\s+")  # Not after list numbers ("1. ")
+_SUMMARY_TAG = re.compile(r"^\[summary of \d+ words\] ")
+
+
+def instruction_keys(*agents: BaseAgent) -> set:
+    """State keys interpolated by the (string) instructions of `agents`, e.g. {"current_story", "critique"}."""
+    keys = set()
+    for agent in agents:
+        instruction = getattr(agent, "instruction", None)
+        if isinstance(agent, LlmAgent) and isinstance(instruction, str):
+            for name in _PLACEHOLDER.findall(instruction):
+                name = name.strip().rstrip("?")
+                if name.isidentifier() or name.startswith(("app:", "user:", "temp:")):
+                    keys.add(name)
+    return keys
+
+
+def _contents_tokens(contents) -> int:
+    return estimate_request_tokens(LlmRequest(contents=list(contents)))
+
+
+def _has_function_part(content: types.Content) -> bool:
+    return any(part.function_call or part.function_response for part in content.parts or [])
+
+
+def _shorten(text: str, limit: int) -> str:
+    """`text` cut at a word boundary to at most `limit` characters."""
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0].rstrip(" ,;:") + " …"
+
+
+def summarize(text: str, limit: int) -> str:
+    """
+    An extractive summary of `text` in about `limit` characters.
+
+    Keeps whole sentences, alternating from the start and the end (a draft's
+    opening and ending, a critique's first point and verdict), in their
+    original order with " … " where sentences were left out.
+    """
+    if len(text) <= limit:
+        return text
+    sentences = [s for s in _SENTENCE_END.split(text.strip()) if s]
+    order = []
+    for front, back in zip(range(len(sentences)), reversed(range(len(sentences)))):
+        if front > back:
+            break
+        order += [front] if front == back else [front, back]
+    chosen, used = set(), 0
+    for index in order:
+        if used + len(sentences[index]) > limit:
+            break
+        chosen.add(index)
+        used += len(sentences[index]) + 3
+    if not chosen:
+        return f"[summary of {len(text.split())} words] " + _shorten(sentences[0], limit)
+    pieces, previous = [], -1
+    for index in sorted(chosen):
+        if index != previous + 1:
+            pieces.append("…")
+        pieces.append(sentences[index])
+        previous = index
+    if previous != len(sentences) - 1:
+        pieces.append("…")
+    return f"[summary of {len(text.split())} words] " + " ".join(pieces)
+
+
+def _digest_line(content: types.Content, limit: int = 80) -> str:
+    what = []
+    for part in content.parts or []:
+        if part.function_call:
+            what.append(f"called {part.function_call.name}")
+        elif part.function_response:
+            what.append(f"got the result of {part.function_response.name}")
+        elif part.text and not part.thought:
+            text = _SUMMARY_TAG.sub("", part.text.strip())
+            what.append(_shorten(_SENTENCE_END.split(text, 1)[0], limit))
+    return f"- {content.role or 'user'}: {'; '.join(what) or '(no text)'}"
+
+
+class ContextCompactor:
+    """A `before_model_callback` that compacts old conversation turns once a request exceeds `token_budget`."""
+
+    def __init__(
+        self,
+        token_budget: int = 2_000,
+        protected_keys: Iterable[str] = (),
+        keep_recent: int = 2,
+        summary_chars: int = 200,
+        digest_chars: int = 400,
+    ):
+        self.token_budget = token_budget
+        self.protected_keys = set(protected_keys)
+        self.keep_recent = keep_recent
+        self.summary_chars = summary_chars
+        self.digest_chars = digest_chars
+
+    def before_model_callback(self, callback_context: CallbackContext, llm_request: LlmRequest):
+        state = callback_context.state
+        protected = {key: str(state.get(key)) for key in self.protected_keys if state.get(key)}
+        # The instruction (with the interpolated state) goes out with every call: it counts against the budget.
+        instruction_tokens = estimate_request_tokens(LlmRequest(config=llm_request.config))
+        llm_request.contents, digest = self.compact(llm_request.contents, protected, instruction_tokens)
+        if digest:
+            llm_request.append_instructions([digest])
+        return None  # Continue with the (compacted) request.
+
+    def compact(self, contents: list, protected: Optional[dict] = None, instruction_tokens: int = 0) -> tuple:
+        """
+        Returns `contents` shrunk to the budget (as far as the kept messages
+        allow), and a digest of the messages dropped for the system instruction
+        ("" when none were dropped).
+
+        `instruction_tokens` is the size of the system instruction the contents
+        are sent with; it and the digest count against `token_budget` too.
+        """
+        budget = self.token_budget - instruction_tokens
+        if _contents_tokens(contents) <= budget or len(contents) <= self.keep_recent + 1:
+            return contents, ""
+
+        head, middle, tail = contents[:1], list(contents[1:-self.keep_recent]), contents[-self.keep_recent:]
+        # A function response in the tail needs its call: move the call into the tail too.
+        while middle and tail and _has_function_part(tail[0]) and _has_function_part(middle[-1]):
+            tail.insert(0, middle.pop())
+
+        def fits(digest: str = ""):
+            return _contents_tokens(head + middle + tail) + len(digest) // 4 <= budget
+
+        # 1. Text that the instructions already carry through a protected state key.
+        for value_key, value in (protected or {}).items():
+            middle = [self._replace_text(c, lambda text: f"[{value_key}: see instructions]"
+                                         if value.strip() and value.strip() in text else text)
+                      for c in middle]
+        if fits():
+            return head + middle + tail, ""
+
+        # 2. Summarize the older text.
+        middle = [self._replace_text(c, lambda text: summarize(text, self.summary_chars)) for c in middle]
+        if fits():
+            return head + middle + tail, ""
+
+        # 3. Drop the oldest messages, keeping function call/response pairs together, into the digest.
+        dropped, digest = [], ""
+        while middle and not fits(digest):
+            unit = 2 if len(middle) > 1 and _has_function_part(middle[0]) and _has_function_part(middle[1]) else 1
+            dropped += middle[:unit]
+            del middle[:unit]
+            digest = self._digest(dropped)
+        return head + middle + tail, digest
+
+    def _digest(self, dropped: list) -> str:
+        """The dropped messages, one line each, the most recent ones first to go into `digest_chars`."""
+        lines = []
+        for content in reversed(dropped):
+            line = _digest_line(content)
+            if sum(len(l) + 1 for l in lines) + len(line) > self.digest_chars:
+                break
+            lines.insert(0, line)
+        older = len(dropped) - len(lines)
+        header = (f"Earlier in this conversation ({len(dropped)} messages left out of the history"
+                  + (f", the {older} oldest not listed" if older else "") + "):")
+        return "\n".join([header] + lines)
+
+    @staticmethod
+    def _replace_text(content: types.Content, rewrite) -> types.Content:
+        parts = []
+        changed = False
+        for part in content.parts or []:
+            if part.text and not part.thought:
+                text = rewrite(part.text)
+                if text != part.text:
+                    part = types.Part(text=text)
+                    changed = True
+            parts.append(part)
+        return types.Content(role=content.role, parts=parts) if changed else content
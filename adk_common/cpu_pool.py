@@ -0,0 +1,261 @@
+"""
+Runs CPU-heavy tools in a pool of worker processes.
+
+ADK calls a plain (sync) function tool on the event loop thread, so a tool
+that runs a neural net, a scikit-learn model or a large BeautifulSoup parse
+holds the GIL and stalls every other session on the same loop: model
+responses stop streaming until it is done. `cpu_bound` turns such a tool
+into an async tool whose body runs in a worker process:
+
+    from adk_common.cpu_pool import cpu_bound
+
+    @functools.lru_cache(maxsize=1)
+    def load_ensemble():
+        return SentimentEnsemble()
+
+    @cpu_bound(warm_up=load_ensemble)
+    def analyze_market_sentiment(headline: str) -> str:
+        return str(load_ensemble().analyze(headline))
+
+- The pool starts on the first call, with `ADK_CPU_WORKERS` workers
+  (default: the number of CPUs, at most 4). `ADK_CPU_WORKERS=0` runs the
+  tools in a thread instead, e.g. for debugging.
+- Every `warm_up` function runs once in each worker when it starts, so the
+  models are loaded once per worker and never in the server process.
+- With `preload=True`, the warm-up runs once in the server process instead,
+  before the workers are forked (pre-fork). The workers inherit the loaded
+  models and share their memory copy-on-write, so N workers hold one copy of
+  the weights instead of N. Objects loaded by then are frozen out of the
+  garbage collector (`gc.freeze()`), whose bookkeeping would otherwise write
+  to, and so copy, their pages in each worker. The weights themselves must
+  not be written to: load inference-only models.
+- Forking is only safe before the process starts other threads (a lock held
+  by one of them stays locked in the child), so the pre-fork happens in
+  `CpuPool.start()`, which the server calls at startup:
+
+      default_pool.start()   # loads the preloads and forks the workers
+      runner.run(...)
+
+  A pool started by its first call instead, or on a platform other than
+  Linux (macOS, where fork is unsafe, and Windows, where it is missing),
+  starts its workers with forkserver (spawn where that is missing) and runs
+  the preload warm-ups in each worker like the others.
+- Only a reference to the function (module and name) and its arguments are
+  sent to the worker, pickled; keep both small (e.g. send page bytes and
+  return the extracted text, not the parsed tree).
+- The tool keeps its name, signature and docstring, so ADK builds the same
+  function declaration for the model.
+
+Workers find the function by importing its module. Modules loaded by path
+(`adk_common.loader`, used by the benchmarks) are found in the workers'
+copy of `sys.modules` when they are forked by `start()`, or loaded the same
+way otherwise.
+"""
+import asyncio
+import atexit
+import concurrent.futures
+import functools
+import gc
+import importlib
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+# --- 1. Inside the worker ---
+
+def _reference(fn: Callable) -> tuple:
+    return fn.__module__, fn.__qualname__, getattr(sys.modules.get(fn.__module__), "__file__", None)
+
+
+def _resolve(reference: tuple) -> Callable:
+    module_name, qualname, path = reference
+    module = sys.modules.get(module_name)
+    if module is None:
+        try:
+            module = importlib.import_module(module_name)
+        except ModuleNotFoundError:
+            if not (path and module_name.startswith("_agents_")):
+                raise
+            # An agent folder loaded by path: load its package the same way, then the module.
+            from .loader import load_agent_module
+            package_dir = path
+            for _ in range(module_name.count(".")):
+                package_dir = os.path.dirname(package_dir)
+            load_agent_module(package_dir)
+            module = importlib.import_module(module_name)
+    target = module
+    for name in qualname.split("."):
+        target = getattr(target, name)
+    return getattr(target, "cpu_bound_function", target)  # The original function behind `cpu_bound`.
+
+
+def _start_worker(warm_ups: list):
+    for reference in warm_ups:
+        _resolve(reference)()
+
+
+def _run(reference: tuple, args: tuple, kwargs: dict):
+    start = time.perf_counter()
+    result = _resolve(reference)(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+# --- 2. The pool ---
+
+def _can_prefork() -> bool:
+    return sys.platform.startswith("linux") and "fork" in multiprocessing.get_all_start_methods()
+
+
+def _safe_context():
+    """A start method that does not fork this (possibly multi-threaded) process."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _noop():
+    return None
+
+
+def _default_workers() -> int:
+    return int(os.environ.get("ADK_CPU_WORKERS", min(4, os.cpu_count() or 1)))
+
+
+class CpuPool:
+    """A lazily started process pool for `cpu_bound` tools, with per-tool stats."""
+
+    def __init__(self, max_workers: Optional[int] = None, mp_context=None):
+        self.max_workers = _default_workers() if max_workers is None else max_workers
+        self.mp_context = mp_context
+        self.warm_ups = []
+        self.preloads = []  # Warm-ups run here before forking the workers, by `start()`
+        self._preloaded = set()
+        self._executor = None
+        self._lock = threading.Lock()
+        # tool name -> {"calls", "cpu_seconds", "wall_seconds"}
+        self.stats = {}
+
+    def add_warm_up(self, fn: Callable, preload: bool = False):
+        """
+        Runs `fn()` in every worker the pool starts from now on.
+
+        With `preload`, runs it once in this process before the workers are forked, so they share what it loads.
+        """
+        reference = _reference(fn)
+        if preload and _can_prefork():
+            if reference not in self.preloads:
+                self.preloads.append(reference)
+        elif reference not in self.warm_ups:
+            self.warm_ups.append(reference)
+
+    def start(self):
+        """
+        Runs the preload warm-ups, then forks the workers. Blocks while loading.
+
+        Call it at server startup, before any other thread starts (the event
+        loop's executor, the runner's thread, the web server's workers).
+        """
+        if self.max_workers == 0:
+            return
+        self.preload()
+        executor = self._get_executor(prefork=True)
+        # The first task makes the pool fork all its workers now, while the preloads are fresh and no thread runs.
+        executor.submit(_noop).result()
+
+    def preload(self):
+        """Runs the preload warm-ups that have not run yet, then freezes what they loaded. Blocks while loading."""
+        with self._lock:
+            pending = [reference for reference in self.preloads if reference not in self._preloaded]
+            for reference in pending:
+                _resolve(reference)()
+                self._preloaded.add(reference)
+            if pending:
+                gc.freeze()  # Keeps the workers' collections off these objects' pages.
+
+    def _get_executor(self, prefork: bool = False):
+        with self._lock:
+            if self._executor is None:
+                mp_context = self.mp_context
+                warm_ups = list(self.warm_ups)
+                if prefork and self.preloads:
+                    mp_context = mp_context or multiprocessing.get_context("fork")  # The workers inherit the preloads.
+                else:
+                    # Started by a call (or restarted after a crash), when threads may be running: forking
+                    # could copy a lock another thread holds, so start the workers from a clean process
+                    # and load in each one.
+                    mp_context = mp_context or _safe_context()
+                    warm_ups += self.preloads
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=mp_context,
+                    initializer=_start_worker, initargs=(warm_ups,),
+                )
+            return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Runs `fn(*args, **kwargs)` in a worker (or a thread with 0 workers) and returns its result."""
+        start = time.perf_counter()
+        if self.max_workers == 0:
+            result, cpu_seconds = await asyncio.to_thread(_run_inline, fn, args, kwargs)
+        else:
+            executor = self._get_executor()
+            try:
+                result, cpu_seconds = await asyncio.get_running_loop().run_in_executor(
+                    executor, _run, _reference(fn), args, kwargs)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory): start a fresh pool on the next call.
+                with self._lock:
+                    if self._executor is executor:
+                        self._executor = None
+                executor.shutdown(wait=False)
+                raise
+        stats = self.stats.setdefault(fn.__name__, {"calls": 0, "cpu_seconds": 0.0, "wall_seconds": 0.0})
+        stats["calls"] += 1
+        stats["cpu_seconds"] += cpu_seconds
+        stats["wall_seconds"] += time.perf_counter() - start
+        return result
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _run_inline(fn: Callable, args: tuple, kwargs: dict):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+# One pool per process, shared by every agent module.
+default_pool = CpuPool()
+atexit.register(default_pool.shutdown, wait=False)
+
+
+# --- 3. The decorator ---
+
+def cpu_bound(fn: Optional[Callable] = None, *, warm_up: Optional[Callable] = None, preload: bool = False,
+              pool: Optional[CpuPool] = None):
+    """
+    Makes `fn` an async function that runs in `pool` (default: `default_pool`).
+
+    `fn` and `warm_up` must be module-level functions, so workers can import
+    them. With `preload`, `warm_up` runs in this process before the workers
+    are forked, and they share what it loads copy-on-write.
+    """
+    def decorate(fn: Callable):
+        target = pool or default_pool
+        if warm_up is not None:
+            target.add_warm_up(warm_up, preload=preload)
+
+        @functools.wraps(fn)
+        async def run_in_pool(*args, **kwargs):
+            return await target.run(fn, *args, **kwargs)
+
+        run_in_pool.cpu_bound_function = fn
+        return run_in_pool
+
+    return decorate(fn) if fn is not None else decorate
@@ -0,0 +1,119 @@
+"""
+A scripted, in-process stand-in for Gemini / Ollama.
+
+Lets the example agents run offline and deterministically, e.g. for
+benchmarks:
+
+    fake = FakeLlm(responder=lambda request: "APPROVED", latency=0.2)
+    agent = Agent(name="CriticAgent", model=fake, instruction="...")
+
+With a `quota` the fake also behaves like a rate-limited endpoint and
+answers calls over the limit with the same `ClientError(429)` the Gemini
+client raises.
+"""
+import asyncio
+import collections
+import time
+from typing import AsyncGenerator, Callable, Optional, Union
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import errors, types
+from pydantic import PrivateAttr
+
+from .rate_limit import ModelQuota, estimate_request_tokens
+
+Reply = Union[str, types.Content, LlmResponse]
+
+
+def _echo(llm_request: LlmRequest) -> str:
+    return f"Fake answer for {len(llm_request.contents)} message(s)."
+
+
+class FakeLlm(BaseLlm):
+    """A model that answers from `responder` after a simulated delay."""
+
+    model: str = "fake-llm"
+
+    responder: Callable[[LlmRequest], Reply] = _echo
+    """Builds the reply for a request: plain text, a `Content` or a full `LlmResponse`."""
+
+    latency: float = 0.0
+    """Seconds the whole response takes to generate."""
+
+    chunks: int = 4
+    """How many partial responses a streaming call yields before the final one."""
+
+    quota: Optional[ModelQuota] = None
+    """When set, calls beyond this quota (sliding window) fail with HTTP 429."""
+
+    calls: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+
+    _window: collections.deque = PrivateAttr(default_factory=collections.deque)
+
+    def _enforce_quota(self, tokens: int):
+        now = time.monotonic()
+        while self._window and now - self._window[0][0] >= self.quota.window_seconds:
+            self._window.popleft()
+        used_requests = len(self._window)
+        used_tokens = sum(t for _, t in self._window)
+        quota = self.quota
+        if (quota.requests_per_minute and used_requests + 1 > quota.requests_per_minute) or (
+            quota.tokens_per_minute and used_tokens + tokens > quota.tokens_per_minute
+        ):
+            self.rejected += 1
+            raise errors.ClientError(429, {"error": {
+                "code": 429, "status": "RESOURCE_EXHAUSTED",
+                "message": f"Quota exceeded for {self.model}",
+            }})
+        self._window.append((now, tokens))
+
+    def _to_response(self, reply: Reply, prompt_tokens: int) -> LlmResponse:
+        if isinstance(reply, LlmResponse):
+            return reply
+        if isinstance(reply, str):
+            reply = types.Content(role="model", parts=[types.Part(text=reply)])
+        output_tokens = max(1, sum(len(p.text or "") for p in reply.parts or []) // 4)
+        return LlmResponse(
+            content=reply,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            ),
+        )
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        prompt_tokens = estimate_request_tokens(llm_request)
+        if self.quota:
+            self._enforce_quota(prompt_tokens)
+
+        response = self._to_response(self.responder(llm_request), prompt_tokens)
+        text = "".join(p.text or "" for p in (response.content.parts if response.content else []))
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if not stream or not text or self.chunks <= 1:
+                await asyncio.sleep(self.latency)
+                yield response
+                return
+
+            # Stream the text in `chunks` pieces spread over `latency`.
+            step = -(-len(text) // self.chunks)
+            for start in range(0, len(text), step):
+                await asyncio.sleep(self.latency / self.chunks)
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=text[start:start + step])]),
+                    partial=True,
+                )
+            yield response
+        finally:
+            self.in_flight -= 1
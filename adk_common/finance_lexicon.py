@@ -0,0 +1,107 @@
+"""
+Finance terms and example sentences for `adk_common.topic_gate`.
+
+Single words are matched as whole words with their common inflections
+("stock" also matches "stocks"; see `topic_gate.inflections`), phrases as
+consecutive words. Ambiguous everyday words ("buy", "sell", "trade", "loss")
+only count in a finance phrase ("buy rating", "trade deficit"), and so do
+words with a common non-finance sense ("interest rate", "market crash",
+"earnings guidance").
+"""
+
+FINANCE_TERMS = (
+    # Markets and instruments
+    "stock", "share price", "equity", "equities", "bond", "treasury", "treasuries", "gilt", "yield",
+    "yield curve", "coupon rate", "dividend", "etf", "index fund", "mutual fund", "hedge fund",
+    "options chain", "stock options", "call option", "put option", "futures", "derivative",
+    "interest rate swap", "credit default swap",
+    "commodity", "commodities", "forex", "fx", "currency pair", "exchange rate", "stock market", "stock exchange",
+    "bull market", "bear market", "market cap", "market capitalization", "market share", "market sentiment",
+    "nasdaq", "nyse", "dow jones", "s p 500", "ftse", "dax", "nikkei", "hang seng", "russell 2000", "vix",
+    "ipo", "spac", "short selling", "short squeeze", "margin call", "leverage", "liquidity", "volatility",
+    "portfolio", "asset", "asset allocation", "asset management", "securities", "broker", "brokerage",
+    "trader", "trading volume", "day trading", "algorithmic trading", "buyback", "stock split", "blue chip",
+    "penny stock", "large cap", "small cap", "mid cap", "growth stock", "value stock", "benchmark index",
+    "all time high", "sell off", "selloff", "market rally", "market correction", "market crash", "order book",
+    "bid ask spread", "price target", "buy rating", "sell rating", "upgrade to buy", "downgrade to sell",
+    "overweight rating", "underweight rating", "analyst consensus", "premarket", "after hours trading",
+    # Corporate finance and earnings
+    "earnings", "earnings call", "earnings per share", "eps", "revenue", "net income", "operating income",
+    "gross margin", "operating margin", "profit margin", "profit warning", "ebitda", "ebit", "earnings guidance",
+    "earnings forecast", "raised guidance", "cut guidance", "quarterly results", "fiscal year", "fiscal quarter",
+    "balance sheet", "cash flow",
+    "free cash flow", "income statement", "write down", "impairment", "net loss", "operating loss",
+    "quarterly loss", "annual loss", "merger", "acquisition", "takeover", "buyout", "leveraged buyout",
+    "million deal", "billion deal", "all stock deal", "cash and stock deal",
+    "private equity", "venture capital", "valuation", "funding round", "series a", "series b", "unicorn",
+    "bankruptcy", "chapter 11", "insolvency", "sovereign default", "debt", "credit rating",
+    "layoffs", "restructuring", "spin off", "shareholder", "stakeholder", "board of directors", "ceo",
+    "cfo", "investor", "investment", "invest", "capital expenditure", "capex", "dividend yield", "payout ratio",
+    "price to earnings", "p e ratio", "book value", "return on equity", "roe", "roi", "beat estimates",
+    "miss estimates", "missed expectations", "beats expectations", "consensus estimate", "sales growth",
+    "same store sales", "supply chain", "order intake",
+    # Macro and policy
+    "inflation", "deflation", "stagflation", "disinflation", "cpi", "ppi", "pce", "gdp", "recession",
+    "economic growth", "economy", "economic", "unemployment rate", "jobless claims", "nonfarm payrolls",
+    "payrolls", "interest rate", "interest rates", "rate hike", "rate cut", "basis points", "bps",
+    "monetary policy", "fiscal policy", "quantitative easing", "quantitative tightening", "central bank",
+    "federal reserve", "the fed", "fed chair", "fomc", "ecb", "bank of england", "bank of japan", "pboc",
+    "imf", "world bank", "treasury yield", "10 year yield", "bond yields", "budget deficit", "trade deficit",
+    "trade surplus", "trade war", "tariff", "sanctions", "sovereign debt", "debt ceiling", "stimulus",
+    "bailout", "austerity", "consumer confidence", "retail sales", "housing market", "mortgage",
+    "mortgage rates", "home prices", "housing starts", "labor market", "wage growth", "productivity",
+    "oil price", "oil prices", "crude oil", "brent", "wti", "opec", "natural gas price", "gold price",
+    "commodity prices", "price index", "cost of living", "purchasing managers index", "pmi",
+    # Banking, credit and personal finance
+    "bank", "banking", "lender", "lending", "loan", "credit card", "apr", "savings",
+    "savings account", "pension", "retirement fund", "401k", "ira", "annuity", "insurance premium",
+    "wealth management", "financial advisor", "financial planning", "net worth", "budget", "tax", "taxes",
+    "capital gains", "capital gains tax", "estate tax", "income tax", "fintech", "payments", "remittance",
+    "money", "cash", "usd", "eur", "gbp", "jpy", "cny", "dollar", "euro", "yen", "pound sterling", "yuan",
+    "exchange traded fund", "hedge against", "hedging strategy", "arbitrage", "underwriting", "audit",
+    "accounting",
+    "financial statements", "sec filing", "10 k", "10 q", "annual report", "finance", "financial", "fiscal",
+    # Crypto
+    "crypto", "cryptocurrency", "bitcoin", "btc", "ethereum", "eth", "stablecoin", "blockchain", "defi",
+    "altcoin", "token sale", "crypto exchange", "mining difficulty", "bitcoin halving", "coinbase", "binance",
+    "market", "markets", "price", "prices", "profit", "profits", "stocks", "shares", "nasdaq composite",
+    # Company and ticker questions
+    "overvalued", "undervalued", "overpriced", "underpriced", "outlook for", "price action", "analyst",
+    "analysts", "ticker", "nvidia", "microsoft", "tesla", "berkshire hathaway", "jpmorgan", "goldman sachs",
+    "morgan stanley", "blackrock", "aapl", "msft", "nvda", "tsla", "amzn", "googl", "goog", "brk b", "jpm",
+)
+
+# A few labelled sentences for the optional `NaiveBayes` fallback, which only
+# sees texts where no lexicon term matched.
+FINANCE_EXAMPLES = (
+    "Should I move my savings into something safer before the downturn?",
+    "How much did Apple make last quarter compared to analysts' numbers?",
+    "Is it a good time to refinance given where borrowing costs are heading?",
+    "What happens to my portfolio if the dollar weakens against the euro?",
+    "Analysts slashed their outlook for the chipmaker after weak demand.",
+    "The company raised its full-year outlook on strong subscription demand.",
+    "Shares of the automaker slid after it cut its delivery target.",
+    "Investors are rotating out of tech into utilities and healthcare.",
+    "Lenders are tightening standards for small business borrowers.",
+    "How do rising borrowing costs affect growth companies?",
+    "The retailer posted weaker holiday sales and cut its outlook.",
+    "Is gold still a good hedge against a weakening currency?",
+    "Is Apple worth more than Amazon right now?",
+    "What do you think of Netflix after the subscriber numbers?",
+    "Should I buy Intel or AMD for the next five years?",
+    "Is Meta expensive compared to Alphabet?",
+)
+OFF_TOPIC_EXAMPLES = (
+    "What's the best pizza recipe for a wood fired oven?",
+    "Can you recommend a good science fiction novel?",
+    "How do I train my puppy to stop chewing furniture?",
+    "Write me a poem about the ocean at night.",
+    "What is the capital of Australia?",
+    "Help me plan a three day hiking trip in the Alps.",
+    "Why is the sky blue?",
+    "How do I fix a flat bicycle tire?",
+    "Who won the football match last night?",
+    "Give me tips for learning to play the guitar.",
+    "What are the symptoms of the common cold?",
+    "Translate good morning into Italian.",
+)
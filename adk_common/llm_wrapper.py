@@ -0,0 +1,84 @@
+import threading
+from typing import AsyncGenerator, Callable, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import PrivateAttr, model_validator
+
+
+class WrappedLlm(BaseLlm):
+    """
+    Base class for models that add behaviour around another model.
+
+    The wrapper reports the inner model's name, so ADK features keyed on the
+    model name (e.g. the `google_search` built-in tool) keep working:
+
+        model = SomeWrapper(llm=Gemini(model="gemini-2.5-flash-lite"))
+    """
+
+    llm: BaseLlm
+    """The model that actually serves the requests."""
+
+    model: str = ""
+    """Copied from `llm.model`; do not set it."""
+
+    @model_validator(mode="after")
+    def _inherit_model_name(self):
+        self.model = self.llm.model
+        return self
+
+    @property
+    def capabilities(self):
+        return self.llm.capabilities
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        async for response in self.llm.generate_content_async(llm_request, stream=stream):
+            yield response
+
+    def connect(self, llm_request: LlmRequest):
+        return self.llm.connect(llm_request)
+
+
+class LazyLlm(BaseLlm):
+    """
+    A model that is built on its first call instead of when the agent is defined.
+
+    For model classes that are slow to import or set up, so importing the
+    agent (e.g. agent discovery in `adk web`) does not pay for them:
+
+        def build():
+            from google.adk.models.lite_llm import LiteLlm
+            return LiteLlm(model="ollama_chat/llama3.1:8b")
+
+        model = LazyLlm(model="ollama_chat/llama3.1:8b", factory=build)
+    """
+
+    factory: Callable[[], BaseLlm]
+    """Builds the real model; called once."""
+
+    _llm: Optional[BaseLlm] = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def llm(self) -> BaseLlm:
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    self._llm = self.factory()
+        return self._llm
+
+    @property
+    def capabilities(self):
+        return self.llm.capabilities
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        async for response in self.llm.generate_content_async(llm_request, stream=stream):
+            yield response
+
+    def connect(self, llm_request: LlmRequest):
+        return self.llm.connect(llm_request)
@@ -0,0 +1,75 @@
+"""
+Helpers to import the example agents by path and rewire their models.
+
+The agent folders (`03-workflows-agents/loop_agent`, ...) are not importable
+with a dotted name, so benchmarks load them from disk:
+
+    module = load_agent_module("03-workflows-agents/loop_agent")
+    swap_models(module.root_agent, lambda agent: FakeLlm(responder=...))
+"""
+import importlib
+import importlib.util
+import os
+import re
+import sys
+from typing import Callable, Iterator
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.tools.agent_tool import AgentTool
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_agent_module(agent_dir: str):
+    """Imports the agent package at `agent_dir` (absolute or repo-relative) and returns its `agent` module."""
+    if not os.path.isabs(agent_dir):
+        agent_dir = os.path.join(REPO_ROOT, agent_dir)
+    agent_dir = os.path.normpath(agent_dir)
+    # A unique, importable name derived from the path, e.g. "_agents_03_workflows_agents_loop_agent"
+    relative = os.path.relpath(agent_dir, REPO_ROOT)
+    package_name = "_agents_" + re.sub(r"\W", "_", relative)
+
+    if package_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            package_name,
+            os.path.join(agent_dir, "__init__.py"),
+            submodule_search_locations=[agent_dir],
+        )
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[package_name] = package
+        try:
+            spec.loader.exec_module(package)
+        except BaseException:
+            del sys.modules[package_name]
+            raise
+    return importlib.import_module(f"{package_name}.agent")
+
+
+def iter_agents(root: BaseAgent) -> Iterator[BaseAgent]:
+    """Yields `root` and every agent below it, including agents wrapped in `AgentTool`."""
+    seen = set()
+    pending = [root]
+    while pending:
+        agent = pending.pop()
+        if id(agent) in seen:
+            continue
+        seen.add(id(agent))
+        yield agent
+        pending.extend(agent.sub_agents)
+        if isinstance(agent, LlmAgent):
+            pending.extend(tool.agent for tool in agent.tools if isinstance(tool, AgentTool))
+
+
+def swap_models(root: BaseAgent, factory: Callable[[LlmAgent], BaseLlm]) -> dict:
+    """
+    Replaces the model of every LLM agent under `root` with `factory(agent)`.
+
+    Returns {agent name: previous model} so the caller can put them back.
+    """
+    previous = {}
+    for agent in iter_agents(root):
+        if isinstance(agent, LlmAgent):
+            previous[agent.name] = agent.model
+            agent.model = factory(agent)
+    return previous
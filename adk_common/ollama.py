@@ -0,0 +1,175 @@
+"""
+Ollama settings that decide latency: keep-alive, context size, parallel slots and warm-up.
+
+By default Ollama unloads a model 5 minutes after its last request, so the
+first question after a break pays the full model load (seconds for an 8B
+model). It also runs only `OLLAMA_NUM_PARALLEL` requests at once and queues
+the rest on the server, where they count against the client's timeout.
+`ollama_llm` builds a `LiteLlm` with the settings below and wraps it in
+`OllamaLlm`, which:
+
+- sends `keep_alive` and `num_ctx` with every request;
+- queues calls on the client so at most `num_parallel` are in flight per
+  server and model (the time spent queueing is reported in the final
+  response's `custom_metadata["queue_wait_s"]`);
+- can load the model ahead of the first question with `warm_up()` (from a
+  server's startup hook), or, with `warm_up_on_first_call=True`, start
+  loading it in the background as the first call comes in, while `LiteLlm`
+  is still being imported. Importing the agent makes no network call.
+
+    from adk_common.ollama import OllamaSettings, ollama_llm
+
+    model = ollama_llm("ollama_chat/llama3.1:8b", settings=OllamaSettings(keep_alive="30m", num_parallel=4),
+                       warm_up_on_first_call=True)
+
+Start the server with the same number of slots: `OLLAMA_NUM_PARALLEL=4 ollama serve`.
+"""
+import asyncio
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import AsyncGenerator, Optional
+
+import httpx
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import Field, PrivateAttr
+
+from .llm_wrapper import LazyLlm, WrappedLlm
+
+DEFAULT_API_BASE = "http://localhost:11434"
+
+
+@dataclass
+class OllamaSettings:
+    """Per-model Ollama settings."""
+
+    keep_alive: str = "30m"
+    """How long the server keeps the model in memory after the last request ("-1" = forever)."""
+    num_ctx: int = 8192
+    """Context window in tokens. Larger windows use more memory per parallel slot."""
+    num_parallel: int = 1
+    """Requests the server runs at once for this model; match `OLLAMA_NUM_PARALLEL`."""
+
+
+class SlotQueue:
+    """
+    Client-side slots per (server, model), shared by every `OllamaLlm` in the process.
+
+    The semaphores are created per event loop, so the queue also works when
+    agents run on several loops (each loop gets its own slots).
+    """
+
+    def __init__(self):
+        # loop -> {(api_base, model): semaphore}; a loop's slots go away with the loop.
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        # (api_base, model) -> {"requests", "waited", "wait_seconds"}
+        self.stats = {}
+
+    def _semaphore(self, key, slots: int) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphores = self._semaphores.setdefault(loop, {})
+            if key not in semaphores:
+                semaphores[key] = asyncio.Semaphore(slots)
+                self.stats.setdefault(key, {"requests": 0, "waited": 0, "wait_seconds": 0.0})
+            return semaphores[key]
+
+    def slot(self, api_base: str, model: str, slots: int):
+        return self._semaphore((api_base, model), slots)
+
+    def record(self, api_base: str, model: str, waited: float):
+        stats = self.stats[(api_base, model)]
+        stats["requests"] += 1
+        if waited > 0.001:
+            stats["waited"] += 1
+            stats["wait_seconds"] += waited
+
+
+default_slots = SlotQueue()
+
+
+def ollama_model_name(model: str) -> str:
+    """The name Ollama knows: "ollama_chat/llama3.1:8b" -> "llama3.1:8b"."""
+    return model.split("/", 1)[1] if model.startswith(("ollama/", "ollama_chat/")) else model
+
+
+class OllamaLlm(WrappedLlm):
+    """A `LiteLlm` Ollama model behind a client-side slot queue, with warm-up."""
+
+    settings: OllamaSettings = Field(default_factory=OllamaSettings, exclude=True)
+    api_base: str = DEFAULT_API_BASE
+    slots: SlotQueue = Field(default_factory=lambda: default_slots, exclude=True)
+    warm_up_on_first_call: bool = False
+    """Start loading the model in the background when the first call comes in."""
+
+    _warm_up_started: bool = PrivateAttr(default=False)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.warm_up_on_first_call and not self._warm_up_started:
+            # The server loads the model while the first call imports LiteLlm and waits for a slot.
+            self._warm_up_started = True
+            self.warm_up_in_background()
+        slot = self.slots.slot(self.api_base, self.model, self.settings.num_parallel)
+        start = time.perf_counter()
+        async with slot:
+            waited = time.perf_counter() - start
+            self.slots.record(self.api_base, self.model, waited)
+            async for response in self.llm.generate_content_async(llm_request, stream=stream):
+                if waited > 0.001 and not response.partial:
+                    metadata = {**(response.custom_metadata or {}), "queue_wait_s": round(waited, 4)}
+                    response = response.model_copy(update={"custom_metadata": metadata})
+                yield response
+
+    def _load_request(self) -> dict:
+        # The same num_ctx as the requests: Ollama reloads a model loaded with another context size.
+        return {"model": ollama_model_name(self.model), "keep_alive": self.settings.keep_alive,
+                "options": {"num_ctx": self.settings.num_ctx}}
+
+    async def warm_up(self, timeout: float = 300.0) -> float:
+        """Loads the model on the server (an empty `/api/generate`) and returns the seconds it took."""
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            response = await client.post(f"{self.api_base}/api/generate", json=self._load_request())
+            response.raise_for_status()
+        return time.perf_counter() - start
+
+    def warm_up_in_background(self, timeout: float = 300.0) -> threading.Thread:
+        """Starts loading the model in a daemon thread and returns at once."""
+        def load():
+            start = time.perf_counter()
+            try:
+                response = httpx.post(f"{self.api_base}/api/generate", json=self._load_request(), timeout=timeout)
+                response.raise_for_status()
+                print(f"🔥 {ollama_model_name(self.model)} is loaded ({time.perf_counter() - start:.1f}s warm-up)")
+            except httpx.HTTPError as e:
+                print(f"⚠️ Ollama warm-up failed, the first request will load the model: {e}")
+
+        thread = threading.Thread(target=load, name="ollama-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+
+def ollama_llm(model: str, api_base: str = DEFAULT_API_BASE, settings: Optional[OllamaSettings] = None,
+               warm_up_on_first_call: bool = False, **litellm_kwargs) -> OllamaLlm:
+    """
+    An `OllamaLlm` for `model` (e.g. "ollama_chat/llama3.1:8b").
+
+    Extra keyword arguments (e.g. `temperature`) go to `LiteLlm`. The
+    `LiteLlm` is only created on the first request: importing it takes longer
+    than loading every other agent of the repository (see
+    `adk_common/startup_profile.py`).
+    """
+    settings = settings or OllamaSettings()
+
+    def build():
+        from google.adk.models.lite_llm import LiteLlm
+        return LiteLlm(model=model, api_base=api_base, keep_alive=settings.keep_alive, num_ctx=settings.num_ctx,
+                       **litellm_kwargs)
+
+    return OllamaLlm(llm=LazyLlm(model=model, factory=build), settings=settings, api_base=api_base,
+                     warm_up_on_first_call=warm_up_on_first_call)
@@ -0,0 +1,312 @@
+"""
+Keeps large tool outputs and drafts out of the session: stored once on disk, referenced by handle.
+
+A page returned by `read_website`, or a long draft in `state["blog_draft"]`,
+is stored inline in its session event. It is carried again by every
+`get_session` copy, every JSON serialization (SQLite sessions, the web UI)
+and every state snapshot. `PayloadPlugin` moves such values into a
+`PayloadStore` and leaves a short handle in their place:
+
+    from adk_common.payload_store import PayloadPlugin, default_store
+
+    runner = InMemoryRunner(agent=root_agent, plugins=[PayloadPlugin(default_store, state_keys={"blog_draft"})])
+
+- Before an event is stored (`on_event_callback`), every string of at least
+  `min_chars` characters in a function response, and the `state_keys`
+  values in its state delta, are written to the store and replaced by
+  "payload://sha256/<digest>". The text of the event, when the value is
+  the agent's own reply (its `output_key`), is left as it is: the runner
+  yields the event it stores, so that text is what the user sees.
+- Before each model call (`before_model_callback`), the handles in the
+  request (function responses, text parts and the system instruction,
+  where `{blog_draft}` was interpolated) are replaced by the stored text
+  again. The model gets the same prompt as without the plugin.
+  `max_inline_bytes` caps how much of each payload goes back in.
+
+`PayloadStore` is content-addressed. A payload is stored once under its
+SHA-256, however many sessions produce it: the same page read twice is one
+file. Files are written atomically, so several processes can share a
+directory. Reads map the file (mmap) and slice it without copying, and only
+the slice that is needed is decoded.
+
+Code that reads a key from the state itself should use
+`store.resolve(state["blog_draft"])`. A store with `ttl_seconds` or
+`max_bytes` prunes itself as it is written to (at most every
+`prune_interval` seconds); `default_store` keeps payloads for 7 days and
+1 GB (`ADK_PAYLOAD_TTL_HOURS`, `ADK_PAYLOAD_MAX_MB`). A handle whose file is
+gone expands to a short note.
+
+Plugins given to a module-level runner are not seen by `adk web`, which
+builds its own runner: register them on an `App` instead,
+
+    app = App(name="sequential_agent", root_agent=root_agent, plugins=[PayloadPlugin(default_store)])
+"""
+import collections
+import hashlib
+import math
+import mmap
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Iterable, Optional, Union
+
+from google.adk.plugins.base_plugin import BasePlugin
+from google.genai import types
+
+HANDLE = re.compile(r"payload://sha256/([0-9a-f]{64})")
+
+
+# --- 1. The store ---
+
+class PayloadStore:
+    """Content-addressed payload files under `root`, read through memory maps."""
+
+    def __init__(self, root: str, max_open: int = 64, ttl_seconds: Optional[float] = None,
+                 max_bytes: Optional[int] = None, prune_interval: float = 600.0):
+        self.root = root
+        self.max_open = max_open
+        self.ttl_seconds = ttl_seconds
+        """Payloads not stored or reused for this long are removed by the automatic prune."""
+        self.max_bytes = max_bytes
+        """The automatic prune removes the least recently used payloads beyond this size."""
+        self.prune_interval = prune_interval
+        self._views = collections.OrderedDict()  # digest -> memoryview of the mapped file, LRU
+        self._lock = threading.Lock()
+        self._pruned_at = 0.0
+        self.stats = {"stored": 0, "deduplicated": 0, "bytes_written": 0, "reads": 0, "missing": 0, "pruned": 0}
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    @staticmethod
+    def _digest(handle: str) -> str:
+        match = HANDLE.fullmatch(handle)
+        if not match:
+            raise ValueError(f"not a payload handle: {handle[:80]!r}")
+        return match.group(1)
+
+    def put(self, data: Union[str, bytes]) -> str:
+        """Stores `data` (UTF-8 for text) unless it is already stored, and returns its handle."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        self.stats["stored"] += 1
+        if os.path.exists(path):
+            self.stats["deduplicated"] += 1
+            os.utime(path)  # Recently used: `prune` keeps it.
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)  # Readers never see a partial file.
+            self.stats["bytes_written"] += len(data)
+        self._maybe_prune()
+        return f"payload://sha256/{digest}"
+
+    def _maybe_prune(self):
+        if self.ttl_seconds is None and self.max_bytes is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._pruned_at < self.prune_interval:
+                return
+            self._pruned_at = now
+        self.stats["pruned"] += self.prune(self.ttl_seconds, self.max_bytes)
+
+    def view(self, handle: str, start: int = 0, end: Optional[int] = None) -> memoryview:
+        """Bytes `start:end` of the payload, as a read-only view of the mapped file (nothing is copied)."""
+        digest = self._digest(handle)
+        with self._lock:
+            whole = self._views.get(digest)
+            if whole is None:
+                with open(self._path(digest), "rb") as f:
+                    size = os.fstat(f.fileno()).st_size
+                    whole = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b"")
+                self._views[digest] = whole
+                if len(self._views) > self.max_open:
+                    # Views handed out keep their map alive; it is unmapped once they are gone.
+                    self._views.popitem(last=False)
+            else:
+                self._views.move_to_end(digest)
+            self.stats["reads"] += 1
+        return whole[start:end]
+
+    def size(self, handle: str) -> int:
+        return len(self.view(handle))
+
+    def read(self, handle: str, start: int = 0, end: Optional[int] = None) -> str:
+        """The payload's text, or bytes `start:end` of it decoded (a character cut at either end is dropped)."""
+        data = self.view(handle, start, end)
+        return str(data, "utf-8", "strict" if (start, end) == (0, None) else "ignore")
+
+    def resolve(self, value):
+        """The stored text if `value` is a handle, else `value` unchanged."""
+        if isinstance(value, str) and HANDLE.fullmatch(value):
+            return self.read(value)
+        return value
+
+    def expand(self, text: str, max_bytes: Optional[int] = None) -> str:
+        """`text` with every handle replaced by its payload (the first `max_bytes` bytes of it, when set)."""
+        def payload(match):
+            handle = match.group(0)
+            try:
+                if max_bytes is None:
+                    return self.read(handle)
+                size = self.size(handle)
+                if size <= max_bytes:
+                    return self.read(handle)
+                return self.read(handle, 0, max_bytes) + f"... [{size - max_bytes} more bytes]"
+            except FileNotFoundError:
+                self.stats["missing"] += 1
+                return f"[payload {match.group(1)[:12]} is no longer stored]"
+
+        return HANDLE.sub(payload, text)
+
+    def prune(self, older_than_seconds: Optional[float] = None, max_bytes: Optional[int] = None) -> int:
+        """
+        Deletes the payloads not stored or reused for `older_than_seconds`, then the least
+        recently used ones until the rest fits in `max_bytes`. Returns how many were deleted.
+        """
+        if not os.path.isdir(self.root):
+            return 0
+        cutoff = time.time() - older_than_seconds if older_than_seconds is not None else -math.inf
+        kept, removed = [], 0
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                    if stat.st_mtime < cutoff:
+                        os.remove(path)
+                        removed += 1
+                    else:
+                        kept.append((stat.st_mtime, stat.st_size, path))
+                except FileNotFoundError:
+                    continue  # Removed by another process.
+        if max_bytes is not None:
+            total = sum(size for _, size, _ in kept)
+            for _, size, path in sorted(kept):
+                if total <= max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                total -= size
+        with self._lock:
+            self._views.clear()
+        return removed
+
+
+# One store per process, shared by the agents. `ADK_PAYLOAD_DIR` moves it, e.g. next to a SQLite session database.
+default_store = PayloadStore(
+    os.environ.get("ADK_PAYLOAD_DIR", os.path.join(tempfile.gettempdir(), "adk_payloads")),
+    ttl_seconds=float(os.environ.get("ADK_PAYLOAD_TTL_HOURS", 7 * 24)) * 3600,
+    max_bytes=int(float(os.environ.get("ADK_PAYLOAD_MAX_MB", 1024)) * 2**20),
+)
+
+
+# --- 2. The plugin ---
+
+class PayloadPlugin(BasePlugin):
+    """Moves large function response strings and `state_keys` values to `store`, and puts them back for the model."""
+
+    def __init__(
+        self,
+        store: PayloadStore = default_store,
+        min_chars: int = 2_000,
+        state_keys: Iterable[str] = (),
+        max_inline_bytes: Optional[int] = None,
+        name: str = "payload_store",
+    ):
+        super().__init__(name=name)
+        self.store = store
+        self.min_chars = min_chars
+        self.state_keys = set(state_keys)
+        self.max_inline_bytes = max_inline_bytes
+        # {"offloaded": payloads replaced by a handle, "offloaded_chars", "expanded": handles put back}
+        self.stats = {"offloaded": 0, "offloaded_chars": 0, "expanded": 0}
+
+    def _offload(self, value):
+        """`value` with every long string replaced by a handle; the same object if nothing changed."""
+        if isinstance(value, str):
+            if len(value) < self.min_chars or HANDLE.fullmatch(value):
+                return value
+            self.stats["offloaded"] += 1
+            self.stats["offloaded_chars"] += len(value)
+            return self.store.put(value)
+        if isinstance(value, dict):
+            items = {key: self._offload(item) for key, item in value.items()}
+            return items if any(items[key] is not value[key] for key in value) else value
+        if isinstance(value, list):
+            items = [self._offload(item) for item in value]
+            return items if any(new is not old for new, old in zip(items, value)) else value
+        return value
+
+    def _expand(self, value):
+        """`value` with every handle replaced by its payload; the same object if it has none."""
+        if isinstance(value, str):
+            if "payload://" not in value:
+                return value
+            self.stats["expanded"] += len(HANDLE.findall(value))
+            return self.store.expand(value, self.max_inline_bytes)
+        if isinstance(value, dict):
+            items = {key: self._expand(item) for key, item in value.items()}
+            return items if any(items[key] is not value[key] for key in value) else value
+        if isinstance(value, list):
+            items = [self._expand(item) for item in value]
+            return items if any(new is not old for new, old in zip(items, value)) else value
+        return value
+
+    async def on_event_callback(self, *, invocation_context, event):
+        if event.partial:
+            return None
+        update = {}
+
+        if event.content and any(part.function_response for part in event.content.parts or []):
+            parts, changed = [], False
+            for part in event.content.parts:
+                response = part.function_response
+                offloaded = self._offload(response.response) if response and response.response else None
+                if offloaded is not None and offloaded is not response.response:
+                    part = part.model_copy(update={"function_response": response.model_copy(
+                        update={"response": offloaded})})
+                    changed = True
+                parts.append(part)
+            if changed:
+                update["content"] = types.Content(role=event.content.role, parts=parts)
+
+        delta = event.actions.state_delta or {}
+        offloaded = {key: self._offload(value) if key in self.state_keys else value for key, value in delta.items()}
+        if any(offloaded[key] is not delta[key] for key in delta):
+            update["actions"] = event.actions.model_copy(update={"state_delta": offloaded})
+
+        # The runner stores and yields this copy instead of the original event.
+        return event.model_copy(update=update) if update else None
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        config = llm_request.config
+        if config is not None and isinstance(config.system_instruction, str):
+            config.system_instruction = self._expand(config.system_instruction)
+        for i, content in enumerate(llm_request.contents):
+            parts, changed = [], False
+            for part in content.parts or []:
+                if part.function_response and part.function_response.response:
+                    expanded = self._expand(part.function_response.response)
+                    if expanded is not part.function_response.response:
+                        part = part.model_copy(update={"function_response": part.function_response.model_copy(
+                            update={"response": expanded})})
+                        changed = True
+                elif part.text and "payload://" in part.text:
+                    part = part.model_copy(update={"text": self._expand(part.text)})
+                    changed = True
+                parts.append(part)
+            if changed:
+                # New contents: the session's events keep their handles.
+                llm_request.contents[i] = types.Content(role=content.role, parts=parts)
+        return None  # Continue with the expanded request.
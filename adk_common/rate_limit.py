@@ -0,0 +1,223 @@
+"""
+Shared rate scheduling for model calls.
+
+Every model wrapped in `RateLimitedLlm` draws from the same per-model token
+buckets (requests/min and tokens/min), so a wide `ParallelAgent` fan-out
+queues on the client instead of collecting 429s and sleeping through the
+retry backoff. A quota's `max_in_flight` also caps how many calls of the
+model run at once, so a stock `ParallelAgent` can fan out to any number of
+branches without putting all of them on the wire at the same time.
+
+    from adk_common.rate_limit import ModelQuota, RateLimitedLlm, default_scheduler
+
+    default_scheduler.set_quota("gemini-2.5-flash-lite",
+                                ModelQuota(requests_per_minute=15, tokens_per_minute=250_000, max_in_flight=3))
+    model = RateLimitedLlm(llm=Gemini(model="gemini-2.5-flash-lite"))
+"""
+import asyncio
+import contextlib
+import json
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import AsyncGenerator, Optional
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import Field
+
+from .llm_wrapper import WrappedLlm
+
+
+@dataclass
+class ModelQuota:
+    """Provider quota for one model. `None` means that dimension is unlimited."""
+
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    window_seconds: float = 60.0
+    """Length of the quota window. Providers use a minute; benchmarks shrink it."""
+    max_in_flight: Optional[int] = None
+    """Calls of the model running at once (per event loop). `None` means no cap."""
+
+
+class TokenBucket:
+    """
+    A reservation-based token bucket.
+
+    `reserve()` takes the tokens immediately (the level may go negative) and
+    returns how long the caller must wait before using them. Waiting happens
+    outside the lock, so one bucket can be shared by several event loops and
+    threads, and callers are served in arrival order.
+
+    The bucket starts with `burst` tokens and refills at
+    `(limit - burst) / window` per second, so no window ever sees more than
+    `limit` tokens: the quota can be saturated without being exceeded.
+    """
+
+    def __init__(self, limit: float, window: float = 60.0, burst: Optional[float] = None, clock=time.monotonic):
+        if burst is None:
+            burst = max(1.0, limit / window)  # About one second's worth
+        burst = min(burst, limit / 2)
+        self.capacity = burst
+        self.rate = (limit - burst) / window
+        self._clock = clock
+        self._level = burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Takes `amount` tokens and returns the seconds to wait before using them."""
+        with self._lock:
+            self._refill(self._clock())
+            self._level -= amount
+            return 0.0 if self._level >= 0 else -self._level / self.rate
+
+    def adjust(self, amount: float):
+        """Takes (positive) or returns (negative) tokens after the fact, e.g. once the real usage is known."""
+        with self._lock:
+            self._refill(self._clock())
+            self._level = min(self.capacity, self._level - amount)
+
+
+def estimate_request_tokens(llm_request: LlmRequest) -> int:
+    """Rough prompt size (~4 characters per token) used until the real usage is reported."""
+    chars = 0
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    if isinstance(instruction, str):
+        chars += len(instruction)
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call:
+                chars += len(json.dumps(part.function_call.args or {}, default=str))
+            elif part.function_response:
+                chars += len(json.dumps(part.function_response.response or {}, default=str))
+    return max(1, chars // 4)
+
+
+class RateScheduler:
+    """Per-model request and token buckets, and in-flight slots, shared by every `RateLimitedLlm`."""
+
+    def __init__(self, quotas: Optional[dict] = None):
+        self._quotas = dict(quotas or {})
+        self._buckets = {}
+        # loop -> {model: semaphore}; semaphores belong to one loop and go away with it.
+        self._slots = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        # model -> {"requests", "waited", "wait_seconds"}
+        self.stats = {}
+
+    def set_quota(self, model: str, quota: ModelQuota):
+        """Configures (or replaces) the quota for `model`."""
+        with self._lock:
+            if self._quotas.get(model) == quota:
+                return  # Keep the current buckets (and their level)
+            self._quotas[model] = quota
+            self._buckets.pop(model, None)
+            for slots in self._slots.values():
+                slots.pop(model, None)
+
+    def _buckets_for(self, model: str):
+        with self._lock:
+            if model not in self._buckets:
+                quota = self._quotas.get(model)
+                requests = tokens = None
+                if quota and quota.requests_per_minute:
+                    requests = TokenBucket(quota.requests_per_minute, quota.window_seconds)
+                if quota and quota.tokens_per_minute:
+                    tokens = TokenBucket(quota.tokens_per_minute, quota.window_seconds)
+                self._buckets[model] = (requests, tokens)
+                self.stats.setdefault(model, {"requests": 0, "waited": 0, "wait_seconds": 0.0})
+            return self._buckets[model]
+
+    def _semaphore(self, model: str) -> Optional[asyncio.Semaphore]:
+        quota = self._quotas.get(model)
+        if not quota or not quota.max_in_flight:
+            return None
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._slots.setdefault(loop, {})
+            if model not in slots:
+                slots[model] = asyncio.Semaphore(quota.max_in_flight)
+            return slots[model]
+
+    @contextlib.asynccontextmanager
+    async def slot(self, model: str):
+        """Holds one of the model's `max_in_flight` slots for the duration of a call. Yields the seconds waited."""
+        semaphore = self._semaphore(model)
+        if semaphore is None:
+            yield 0.0
+            return
+        start = time.perf_counter()
+        async with semaphore:
+            yield time.perf_counter() - start
+
+    async def acquire(self, model: str, tokens: int) -> float:
+        """Waits until one request of about `tokens` tokens fits in the model's quota. Returns the seconds waited."""
+        request_bucket, token_bucket = self._buckets_for(model)
+        wait = 0.0
+        if request_bucket:
+            wait = max(wait, request_bucket.reserve(1))
+        if token_bucket:
+            wait = max(wait, token_bucket.reserve(tokens))
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def record(self, model: str, waited: float):
+        """Counts one call and the seconds it waited for a slot and for quota."""
+        with self._lock:
+            stats = self.stats.setdefault(model, {"requests": 0, "waited": 0, "wait_seconds": 0.0})
+            stats["requests"] += 1
+            if waited > 0.001:
+                stats["waited"] += 1
+                stats["wait_seconds"] += waited
+
+    def settle(self, model: str, estimated: int, actual: int):
+        """Corrects the token bucket once the provider reported the real usage."""
+        _, token_bucket = self._buckets_for(model)
+        if token_bucket and actual != estimated:
+            token_bucket.adjust(actual - estimated)
+
+
+# One scheduler per process, so every agent module shares the same quota.
+default_scheduler = RateScheduler()
+
+
+class RateLimitedLlm(WrappedLlm):
+    """
+    Routes every call of the wrapped model through a `RateScheduler`.
+
+    The time spent waiting for a slot and for quota is reported in the final
+    response's `custom_metadata["queue_wait_s"]`.
+    """
+
+    scheduler: RateScheduler = Field(default_factory=lambda: default_scheduler, exclude=True)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        estimated = estimate_request_tokens(llm_request)
+        # Quota is reserved once a slot is free, so it is not spent while the call still queues.
+        async with self.scheduler.slot(self.model) as slot_wait:
+            waited = slot_wait + await self.scheduler.acquire(self.model, estimated)
+            self.scheduler.record(self.model, waited)
+
+            usage = None
+            async for response in self.llm.generate_content_async(llm_request, stream=stream):
+                if response.usage_metadata and response.usage_metadata.total_token_count:
+                    usage = response.usage_metadata.total_token_count
+                if waited > 0.001 and not response.partial:
+                    metadata = {**(response.custom_metadata or {}), "queue_wait_s": round(waited, 4)}
+                    response = response.model_copy(update={"custom_metadata": metadata})
+                yield response
+
+        if usage is not None:
+            self.scheduler.settle(self.model, estimated, usage)
@@ -0,0 +1,261 @@
+"""
+Response caching for any ADK model (`Gemini`, `LiteLlm`, ...).
+
+`CachedLlm` answers a request from a `ResponseCache` when it has seen the
+same request before, and only calls the wrapped model on a miss:
+
+    from adk_common.response_cache import CachedLlm, ResponseCache
+
+    cache = ResponseCache(ttl_seconds=3600, max_entries=1_000)
+    model = CachedLlm(llm=Gemini(model="gemini-2.5-flash-lite"), cache=cache)
+
+The cache has two layers:
+
+- exact: keyed on the model, system instruction, generation config
+  (temperature, response schema, ...), contents and tool declarations.
+  Function calls and function responses are part of the contents, so a
+  tool-using turn only hits when the tool results match too.
+- semantic (optional, pass an `embedder`): requests that differ only in the
+  wording of their last message are matched by cosine similarity of that
+  message's embedding. Candidates must share the instruction, the tools and
+  the rest of the conversation (including every function call / result)
+  exactly, so a long shared history cannot mask a different question.
+
+Requests with a built-in tool (`google_search`, code execution, ...) are
+never cached: the model runs that tool on the server and its results never
+appear in the request, so the key cannot tell whether they still match.
+Grounded responses are not stored either.
+
+Both layers expire entries after `ttl_seconds` and evict the least recently
+used entry beyond `max_entries`. `cache.stats` counts hits, misses, stores,
+evictions, expirations and bypassed (uncacheable) requests.
+"""
+import collections
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from typing import AsyncGenerator, Callable, List, Optional, Sequence
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import Field
+
+from .llm_wrapper import WrappedLlm
+
+Embedder = Callable[[str], Sequence[float]]
+
+
+def _strip_ids(value):
+    """Drops the per-call `id`s ADK generates for function calls/responses, which differ on every run."""
+    if isinstance(value, dict):
+        return {k: _strip_ids(v) for k, v in value.items() if k != "id"}
+    if isinstance(value, list):
+        return [_strip_ids(v) for v in value]
+    return value
+
+
+def _digest(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _request_parts(llm_request: LlmRequest):
+    """Splits a request into (instruction, tools, generation config, contents) as JSON-able values."""
+    config = llm_request.config
+    instruction = config.system_instruction if config else None
+    if instruction is not None and not isinstance(instruction, str):
+        instruction = instruction.model_dump(mode="json", exclude_none=True)
+    tools = [t.model_dump(mode="json", exclude_none=True) for t in (config.tools or [])] if config else []
+    generation = config.model_dump(mode="json", exclude_none=True,
+                                   exclude={"system_instruction", "tools", "http_options"}) if config else {}
+    contents = [_strip_ids(c.model_dump(mode="json", exclude_none=True)) for c in llm_request.contents]
+    return instruction, tools, generation, contents
+
+
+def exact_key(llm_request: LlmRequest) -> str:
+    """Cache key of a request: model, instruction, generation config, contents and tools."""
+    instruction, tools, generation, contents = _request_parts(llm_request)
+    return _digest([llm_request.model, instruction, tools, generation, contents])
+
+
+def semantic_scope(llm_request: LlmRequest) -> str:
+    """Everything except the text of the last message; semantic matches are only looked up within the same scope."""
+    instruction, tools, generation, contents = _request_parts(llm_request)
+    if contents:
+        last = contents[-1]
+        contents = contents[:-1] + [
+            [last.get("role"), [part for part in last.get("parts", []) if "text" not in part]]
+        ]
+    return _digest([llm_request.model, instruction, tools, generation, contents])
+
+
+def uses_builtin_tools(llm_request: LlmRequest) -> bool:
+    """Whether the request has a tool the model runs itself (search, code execution, ...), not a function."""
+    config = llm_request.config
+    for tool in (config.tools or []) if config else []:
+        if set(tool.model_dump(exclude_none=True)) - {"function_declarations"}:
+            return True
+    return False
+
+
+def request_text(llm_request: LlmRequest) -> str:
+    """The text of the last message, the part the semantic layer compares."""
+    if not llm_request.contents:
+        return ""
+    return "\n".join(part.text for part in llm_request.contents[-1].parts or [] if part.text)
+
+
+def hashed_ngram_embedder(text: str, dimensions: int = 512) -> List[float]:
+    """
+    A dependency-free embedding: hashed word unigrams and bigrams, L2-normalised.
+
+    Good enough to catch rephrasings with the same words ("latest AI trends?"
+    vs "What are the latest AI trends"). Pass a real embedding model's
+    function to `ResponseCache(embedder=...)` for paraphrases.
+    """
+    words = re.findall(r"\w+", text.lower())
+    vector = [0.0] * dimensions
+    for gram in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        vector[int(hashlib.md5(gram.encode()).hexdigest(), 16) % dimensions] += 1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ResponseCache:
+    """A TTL + LRU bounded store of model responses, shared by any number of `CachedLlm`s."""
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = 3600.0,
+        max_entries: int = 1_000,
+        embedder: Optional[Embedder] = None,
+        similarity_threshold: float = 0.95,
+        clock=time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self._clock = clock
+        self._lock = threading.Lock()
+        # exact key -> (expires_at, scope, embedding, [responses]), oldest first
+        self._entries = collections.OrderedDict()
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0,
+                      "bypassed": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.stats["exact_hits"] + self.stats["semantic_hits"]
+        lookups = hits + self.stats["misses"]
+        return hits / lookups if lookups else 0.0
+
+    def _expire(self, now: float):
+        expired = [key for key, (expires_at, *_) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        self.stats["expired"] += len(expired)
+
+    def lookup(self, llm_request: LlmRequest) -> Optional[tuple]:
+        """Returns (layer, responses) for a cached request, or None on a miss."""
+        key = exact_key(llm_request)
+        with self._lock:
+            self._expire(self._clock())
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats["exact_hits"] += 1
+                return "exact", self._entries[key][3]
+            if not self.embedder:
+                self.stats["misses"] += 1
+                return None
+
+        # Embedding can be slow (or remote), so it runs outside the lock.
+        scope = semantic_scope(llm_request)
+        embedding = self.embedder(request_text(llm_request))
+        with self._lock:
+            best_key, best_score = None, self.similarity_threshold
+            for candidate, (_, candidate_scope, candidate_embedding, _) in self._entries.items():
+                if candidate_scope == scope and candidate_embedding is not None:
+                    score = _cosine(embedding, candidate_embedding)
+                    if score >= best_score:
+                        best_key, best_score = candidate, score
+            if best_key is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.stats["semantic_hits"] += 1
+            return "semantic", self._entries[best_key][3]
+
+    def store(self, llm_request: LlmRequest, responses: List[LlmResponse]):
+        """Caches the final (non-partial) responses of a request."""
+        key = exact_key(llm_request)
+        scope = embedding = None
+        if self.embedder:
+            scope = semantic_scope(llm_request)
+            embedding = self.embedder(request_text(llm_request))
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds else math.inf
+        with self._lock:
+            self._entries[key] = (expires_at, scope, embedding, responses)
+            self._entries.move_to_end(key)
+            self.stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _cacheable(response: LlmResponse) -> bool:
+    return (not response.error_code and response.content is not None and bool(response.content.parts)
+            and response.grounding_metadata is None)
+
+
+class CachedLlm(WrappedLlm):
+    """
+    Serves repeated requests from a `ResponseCache` instead of the wrapped model.
+
+    Only complete answers are cached: partial (streamed) chunks are passed
+    through and dropped, and a call that ends with an error or without
+    content is not stored. Requests with built-in tools bypass the cache (see
+    the module docstring). A hit is replayed as the final response(s), marked
+    with `custom_metadata={"cache": "exact" | "semantic"}`.
+    """
+
+    cache: ResponseCache = Field(default_factory=ResponseCache, exclude=True)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if uses_builtin_tools(llm_request):
+            self.cache.stats["bypassed"] += 1
+            async for response in self.llm.generate_content_async(llm_request, stream=stream):
+                yield response
+            return
+
+        hit = self.cache.lookup(llm_request)
+        if hit:
+            layer, responses = hit
+            for response in responses:
+                yield response.model_copy(update={"custom_metadata": {**(response.custom_metadata or {}), "cache": layer}})
+            return
+
+        final = []
+        async for response in self.llm.generate_content_async(llm_request, stream=stream):
+            if not response.partial:
+                final.append(response)
+            yield response
+
+        if final and all(_cacheable(r) for r in final):
+            self.cache.store(llm_request, final)
@@ -0,0 +1,318 @@
+"""
+A shared retry policy for model calls.
+
+Replaces the `HttpRetryOptions(attempts=5, exp_base=7, initial_delay=1)` the
+agents used to copy around. With `exp_base=7` the fourth retry of a call
+waits minutes, and every worker that failed at the same moment retries at
+the same moment. `RetryingLlm` retries instead with:
+
+- **decorrelated jitter**: each delay is drawn from `[base, 3 × previous]`
+  (capped at `max_delay`), so callers that failed together spread out;
+- **Retry-After**: a `Retry-After` header (or Gemini's `RetryInfo`) is
+  honoured as the minimum wait, and a call gives up at once if the server
+  asks for longer than `max_retry_after`;
+- **a retry budget**: retries may be at most `ratio` of the recent calls
+  (plus a small floor) across the whole process, so an outage does not turn
+  into a retry storm;
+- **a circuit breaker per endpoint**: after `failure_threshold` failures in
+  a row the endpoint is skipped for `reset_timeout` seconds (calls fail fast
+  with a 503 `CircuitOpenError`), then a single probe call decides whether
+  it closes again.
+
+    from adk_common.retry import RetryingLlm
+
+    model = RetryingLlm(llm=Gemini(model="gemini-2.5-flash-lite"))
+
+Do not give the inner model `retry_options` as well, or both layers retry.
+Retried calls report the number of retries in the final response's
+`custom_metadata["retries"]`.
+"""
+import asyncio
+import collections
+import email.utils
+import logging
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import AsyncGenerator, Optional
+
+import httpx
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import errors
+from pydantic import Field
+
+from .llm_wrapper import WrappedLlm
+
+logger = logging.getLogger(__name__)
+
+
+# --- 1. The policy ---
+
+@dataclass
+class RetryPolicy:
+    """How often and how long one call is retried."""
+
+    attempts: int = 5
+    """Total attempts, including the first one."""
+    base_delay: float = 1.0
+    max_delay: float = 20.0
+    max_retry_after: float = 60.0
+    """Give up instead of waiting when the server asks for a longer pause than this."""
+    retry_statuses: tuple = (429, 500, 503, 504)
+    """The `http_status_codes` the samples' retry options listed."""
+
+    def next_delay(self, previous: float) -> float:
+        """Decorrelated jitter: a random delay between `base_delay` and three times the previous one."""
+        return min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous * 3)))
+
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of the calls made in the last `window_seconds`.
+
+    A retry is allowed while `retries < ratio × calls + min_retries` over the
+    window. `min_retries` keeps a quiet process able to retry at all.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 3, window_seconds: float = 10.0, clock=time.monotonic):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._calls = collections.deque()
+        self._retries = collections.deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        for window in (self._calls, self._retries):
+            while window and now - window[0] >= self.window_seconds:
+                window.popleft()
+
+    def record_call(self):
+        with self._lock:
+            now = self._clock()
+            self._trim(now)
+            self._calls.append(now)
+
+    def try_spend(self) -> bool:
+        """Takes one retry from the budget if there is room."""
+        with self._lock:
+            now = self._clock()
+            self._trim(now)
+            if len(self._retries) >= self.ratio * len(self._calls) + self.min_retries:
+                return False
+            self._retries.append(now)
+            return True
+
+
+class CircuitBreaker:
+    """
+    Closed → open after `failure_threshold` consecutive failures; open →
+    half-open after `reset_timeout` seconds, where one probe call is let
+    through: its success closes the circuit, its failure opens it again. A
+    probe that never reports back (e.g. a cancelled call) is replaced by a new
+    one after another `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = self._clock()
+            if self.state == "open" and now - self._opened_at >= self.reset_timeout:
+                self.state, self._probe_started = "half_open", None
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and (
+                self._probe_started is None or now - self._probe_started >= self.reset_timeout
+            ):
+                self._probe_started = now
+                return True
+            return False
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 when the circuit is closed or a probe is free)."""
+        with self._lock:
+            now = self._clock()
+            if self.state == "open":
+                return max(0.0, self.reset_timeout - (now - self._opened_at))
+            if self.state == "half_open" and self._probe_started is not None:
+                # A probe is in flight: the next one is allowed once it has had its window.
+                return max(0.0, self.reset_timeout - (now - self._probe_started))
+            return 0.0
+
+    def record_success(self):
+        with self._lock:
+            self.state, self._failures, self._probe_started = "closed", 0, None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self.state, self._opened_at, self._probe_started = "open", self._clock(), None
+
+
+class CircuitOpenError(errors.ServerError):
+    """Raised without calling the endpoint while its circuit is open. Looks like a 503 to callers."""
+
+    def __init__(self, endpoint: str, retry_after: float):
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        super().__init__(503, {"error": {
+            "code": 503, "status": "UNAVAILABLE",
+            "message": f"Circuit open for {endpoint}; retry in {retry_after:.1f}s",
+        }})
+
+
+class RetryCoordinator:
+    """The retry budget and the per-endpoint circuit breakers shared by every `RetryingLlm`."""
+
+    def __init__(self, budget: Optional[RetryBudget] = None, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.budget = budget or RetryBudget()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self.stats = collections.Counter()
+        """calls, retries, retry_after_waits, budget_exhausted, circuit_rejected, gave_up."""
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[endpoint]
+
+
+# One coordinator per process, so every agent module shares the budget and the breakers.
+default_coordinator = RetryCoordinator()
+
+
+# --- 2. Reading the errors ---
+
+_TRANSIENT = (httpx.TransportError, ConnectionError, asyncio.TimeoutError)
+
+
+def error_status(error: Exception) -> Optional[int]:
+    """The HTTP status of a genai (`code`) or LiteLLM (`status_code`) error, if any."""
+    for attribute in ("code", "status_code"):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    The pause the server asked for, in seconds: the `Retry-After` header
+    (seconds or an HTTP date) or Gemini's `RetryInfo.retryDelay` ("23s").
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(error, "headers", None) or getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                parsed = email.utils.parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None  # Malformed ("soon"): retry on our own backoff, not on the header.
+            if parsed is not None:
+                return max(0.0, parsed.timestamp() - time.time())
+
+    details = getattr(error, "details", None)
+    if isinstance(details, dict):
+        for detail in (details.get("error") or {}).get("details") or []:
+            if str(detail.get("@type", "")).endswith("RetryInfo"):
+                match = re.fullmatch(r"([\d.]+)s", str(detail.get("retryDelay", "")))
+                if match:
+                    return float(match.group(1))
+    return None
+
+
+def endpoint_of(llm) -> str:
+    """Where a model's calls go: the base URL (or `api_base`) plus the model name."""
+    while isinstance(llm, WrappedLlm):
+        llm = llm.llm
+    base = getattr(llm, "base_url", None) or (getattr(llm, "_additional_args", None) or {}).get("api_base")
+    return f"{base or 'default'}/{llm.model}"
+
+
+# --- 3. The wrapper ---
+
+class RetryingLlm(WrappedLlm):
+    """
+    Retries failed calls of the wrapped model under a `RetryPolicy`.
+
+    Only failures before the first streamed chunk are retried; once text has
+    reached the caller the error is passed on.
+    """
+
+    policy: RetryPolicy = Field(default_factory=RetryPolicy, exclude=True)
+    coordinator: RetryCoordinator = Field(default_factory=lambda: default_coordinator, exclude=True)
+    endpoint: Optional[str] = None
+    """Circuit breaker key. Defaults to the inner model's base URL and name."""
+
+    def _retryable(self, error: Exception) -> bool:
+        status = error_status(error)
+        return status in self.policy.retry_statuses if status is not None else isinstance(error, _TRANSIENT)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        endpoint = self.endpoint or endpoint_of(self.llm)
+        breaker = self.coordinator.breaker(endpoint)
+        budget, stats = self.coordinator.budget, self.coordinator.stats
+        budget.record_call()
+        stats["calls"] += 1
+
+        delay = self.policy.base_delay
+        for attempt in range(self.policy.attempts):
+            if not breaker.allow():
+                stats["circuit_rejected"] += 1
+                raise CircuitOpenError(endpoint, breaker.retry_in())
+
+            yielded = False
+            try:
+                async for response in self.llm.generate_content_async(llm_request, stream=stream):
+                    if attempt and not response.partial:
+                        metadata = {**(response.custom_metadata or {}), "retries": attempt}
+                        response = response.model_copy(update={"custom_metadata": metadata})
+                    yielded = True
+                    yield response
+                breaker.record_success()
+                return
+            except Exception as error:
+                if not self._retryable(error):
+                    breaker.record_success()  # The endpoint answered; the request itself was bad.
+                    raise
+                breaker.record_failure()
+                wait_for = retry_after(error)
+                if yielded or attempt + 1 == self.policy.attempts or (
+                    wait_for is not None and wait_for > self.policy.max_retry_after
+                ):
+                    stats["gave_up"] += 1
+                    raise
+                if not budget.try_spend():
+                    stats["budget_exhausted"] += 1
+                    raise
+
+                delay = self.policy.next_delay(delay)
+                if wait_for is not None and wait_for > delay:
+                    stats["retry_after_waits"] += 1
+                    delay = wait_for
+                stats["retries"] += 1
+                logger.info("%s: %s (%s), retry %d in %.1fs", endpoint, type(error).__name__,
+                            error_status(error), attempt + 1, delay)
+                await asyncio.sleep(delay)
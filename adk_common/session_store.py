@@ -0,0 +1,361 @@
+"""
+A persistent session service on SQLite, shared by every worker process.
+
+Drop-in replacement for the in-memory sessions of `InMemoryRunner`:
+
+    from google.adk.runners import Runner
+    from adk_common.session_store import EventLogSessionService
+
+    runner = Runner(
+        agent=root_agent,
+        app_name="blog_pipeline",
+        session_service=EventLogSessionService("sessions.db", max_events_per_session=200),
+    )
+
+How it stores things:
+
+- events are only ever INSERTed into an append-only log, indexed by
+  (app, user, session, sequence number);
+- every append also merges the event's state delta into a per-session state
+  snapshot (and the app:/user: scoped snapshots) in the same transaction, so
+  loading a session never replays its events; `get_session` reads the
+  snapshot plus only the events the caller asks for (`GetSessionConfig`);
+- `compact()` (or `max_events_per_session`) deletes old events of a session;
+  the state is unaffected because it lives in the snapshot;
+- the database runs in WAL mode with a busy timeout, so several processes can
+  read and write the same file. A write from a session object that another
+  process has already advanced raises `ValueError` (reload and retry).
+
+Use a file path: every worker thread opens its own connection, which an
+in-memory (":memory:") database would not share.
+"""
+import asyncio
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session, State
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE INDEX IF NOT EXISTS sessions_by_update ON sessions (app_name, user_id, update_time);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    event_data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_session ON events (app_name, user_id, session_id, seq);
+"""
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=str)
+
+
+def _split_state(state: dict) -> dict:
+    """Splits a state (or state delta) into its app, user and session scopes; temp: keys are dropped."""
+    scopes = {"app": {}, "user": {}, "session": {}}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            scopes["app"][key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            scopes["user"][key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            scopes["session"][key] = value
+    return scopes
+
+
+def _merge_state(session_state: dict, app_state: dict, user_state: dict) -> dict:
+    merged = dict(session_state)
+    merged.update({State.APP_PREFIX + k: v for k, v in app_state.items()})
+    merged.update({State.USER_PREFIX + k: v for k, v in user_state.items()})
+    return merged
+
+
+class EventLogSessionService(BaseSessionService):
+    """Sessions in a SQLite file: an append-only event log plus a state snapshot per session."""
+
+    def __init__(self, db_path: str, max_events_per_session: Optional[int] = None, busy_timeout: float = 30.0):
+        self.db_path = db_path
+        self.max_events_per_session = max_events_per_session
+        """When set, every append also deletes the session's events beyond this many (see `compact`)."""
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    # --- Connections ---
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        # IMMEDIATE takes the write lock up front, so concurrent writers queue
+        # on the busy timeout instead of failing half-way through.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # --- BaseSessionService ---
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        return await asyncio.to_thread(self._create_session, app_name, user_id, state, session_id)
+
+    def _create_session(self, app_name, user_id, state, session_id) -> Session:
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        scopes = _split_state(state)
+        now = time.time()
+        with self._transaction() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sessions WHERE app_name=? AND user_id=? AND id=?", (app_name, user_id, session_id)
+            ).fetchone()
+            if exists:
+                raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+            app_state = self._update_scope(conn, "app", (app_name,), scopes["app"])
+            user_state = self._update_scope(conn, "user", (app_name, user_id), scopes["user"])
+            conn.execute(
+                "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time) VALUES (?, ?, ?, ?, ?, ?)",
+                (app_name, user_id, session_id, _dumps(scopes["session"]), now, now),
+            )
+        return Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=_merge_state(scopes["session"], app_state, user_state),
+            last_update_time=now,
+        )
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        return await asyncio.to_thread(self._get_session, app_name, user_id, session_id, config)
+
+    def _get_session(self, app_name, user_id, session_id, config) -> Optional[Session]:
+        conn = self._connection()
+        # One read transaction, so the snapshot and the events are consistent.
+        conn.execute("BEGIN")
+        try:
+            row = conn.execute(
+                "SELECT state, update_time FROM sessions WHERE app_name=? AND user_id=? AND id=?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+            app_state = self._read_scope(conn, "app", (app_name,))
+            user_state = self._read_scope(conn, "user", (app_name, user_id))
+            events = self._read_events(conn, app_name, user_id, session_id, config)
+        finally:
+            conn.execute("COMMIT")
+
+        return Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=_merge_state(json.loads(row[0]), app_state, user_state),
+            events=events,
+            last_update_time=row[1],
+        )
+
+    def _read_events(self, conn, app_name, user_id, session_id, config) -> list:
+        num_recent = config.num_recent_events if config else None
+        after = config.after_timestamp if config else None
+        if num_recent == 0:
+            return []
+        query = "SELECT event_data FROM events WHERE app_name=? AND user_id=? AND session_id=?"
+        params = [app_name, user_id, session_id]
+        if after is not None:
+            query += " AND timestamp >= ?"
+            params.append(after)
+        # Newest first through the index, then put back in order.
+        query += " ORDER BY seq DESC"
+        if num_recent is not None:
+            query += " LIMIT ?"
+            params.append(num_recent)
+        rows = conn.execute(query, params).fetchall()
+        return [Event.model_validate_json(data) for (data,) in reversed(rows)]
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        return await asyncio.to_thread(self._list_sessions, app_name, user_id)
+
+    def _list_sessions(self, app_name, user_id) -> ListSessionsResponse:
+        query = "SELECT user_id, id, update_time FROM sessions WHERE app_name=?"
+        params = [app_name]
+        if user_id is not None:
+            query += " AND user_id=?"
+            params.append(user_id)
+        rows = self._connection().execute(query + " ORDER BY update_time", params).fetchall()
+        return ListSessionsResponse(sessions=[
+            Session(app_name=app_name, user_id=uid, id=sid, last_update_time=updated) for uid, sid, updated in rows
+        ])
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await asyncio.to_thread(self._delete_session, app_name, user_id, session_id)
+
+    def _delete_session(self, app_name, user_id, session_id):
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM events WHERE app_name=? AND user_id=? AND session_id=?", (app_name, user_id, session_id)
+            )
+            conn.execute(
+                "DELETE FROM sessions WHERE app_name=? AND user_id=? AND id=?", (app_name, user_id, session_id)
+            )
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        update_time = await asyncio.to_thread(self._append_event, session, event)
+        # Applies the delta to the in-memory session (and keeps temp: keys there only).
+        event = await super().append_event(session, event)
+        # The caller's session object now matches the stored revision.
+        session.last_update_time = update_time
+        return event
+
+    def _append_event(self, session: Session, event: Event) -> float:
+        delta = event.actions.state_delta if event.actions else {}
+        scopes = _split_state(delta)
+        stored = event.model_copy(deep=True)
+        if stored.actions and stored.actions.state_delta:
+            stored.actions.state_delta = {
+                k: v for k, v in stored.actions.state_delta.items() if not k.startswith(State.TEMP_PREFIX)
+            }
+
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT state, update_time FROM sessions WHERE app_name=? AND user_id=? AND id=?",
+                (session.app_name, session.user_id, session.id),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Session {session.id} not found.")
+            if row[1] > session.last_update_time:
+                raise ValueError(
+                    f"Session {session.id} was updated by another worker after it was loaded "
+                    "(stored update_time is newer than session.last_update_time). Reload the session and retry."
+                )
+
+            conn.execute(
+                "INSERT INTO events (app_name, user_id, session_id, timestamp, event_data) VALUES (?, ?, ?, ?, ?)",
+                (session.app_name, session.user_id, session.id, event.timestamp,
+                 stored.model_dump_json(exclude_none=True)),
+            )
+            state = json.loads(row[0])
+            state.update(scopes["session"])
+            update_time = max(event.timestamp, row[1])
+            conn.execute(
+                "UPDATE sessions SET state=?, update_time=? WHERE app_name=? AND user_id=? AND id=?",
+                (_dumps(state) if scopes["session"] else row[0], update_time,
+                 session.app_name, session.user_id, session.id),
+            )
+            if scopes["app"]:
+                self._update_scope(conn, "app", (session.app_name,), scopes["app"])
+            if scopes["user"]:
+                self._update_scope(conn, "user", (session.app_name, session.user_id), scopes["user"])
+            if self.max_events_per_session:
+                self._compact_session(conn, session.app_name, session.user_id, session.id, self.max_events_per_session)
+        return update_time
+
+    # --- Scoped (app: / user:) state ---
+
+    def _read_scope(self, conn, scope, key) -> dict:
+        if scope == "app":
+            row = conn.execute("SELECT state FROM app_states WHERE app_name=?", key).fetchone()
+        else:
+            row = conn.execute("SELECT state FROM user_states WHERE app_name=? AND user_id=?", key).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _update_scope(self, conn, scope, key, delta) -> dict:
+        state = self._read_scope(conn, scope, key)
+        if delta:
+            state.update(delta)
+            if scope == "app":
+                conn.execute("INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)", (*key, _dumps(state)))
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+                    (*key, _dumps(state)),
+                )
+        return state
+
+    # --- Compaction ---
+
+    def _compact_session(self, conn, app_name, user_id, session_id, keep_recent: int) -> int:
+        cursor = conn.execute(
+            """DELETE FROM events WHERE app_name=? AND user_id=? AND session_id=? AND seq <= (
+                   SELECT seq FROM events WHERE app_name=? AND user_id=? AND session_id=?
+                   ORDER BY seq DESC LIMIT 1 OFFSET ?)""",
+            (app_name, user_id, session_id, app_name, user_id, session_id, keep_recent),
+        )
+        return cursor.rowcount
+
+    async def compact(self, *, app_name: str, keep_recent: int = 100, older_than: Optional[float] = None) -> int:
+        """
+        Deletes old events of every session of `app_name`, keeping the newest `keep_recent` per session.
+
+        With `older_than` (a UNIX timestamp) only sessions idle since before
+        then are compacted. The state snapshots are untouched, so agents keep
+        every `output_key`; they only lose the oldest conversation turns.
+        Returns the number of deleted events.
+        """
+        return await asyncio.to_thread(self._compact, app_name, keep_recent, older_than)
+
+    def _compact(self, app_name, keep_recent, older_than) -> int:
+        query = "SELECT user_id, id FROM sessions WHERE app_name=?"
+        params = [app_name]
+        if older_than is not None:
+            query += " AND update_time < ?"
+            params.append(older_than)
+        deleted = 0
+        for user_id, session_id in self._connection().execute(query, params).fetchall():
+            with self._transaction() as conn:
+                deleted += self._compact_session(conn, app_name, user_id, session_id, keep_recent)
+        return deleted
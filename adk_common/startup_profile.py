@@ -0,0 +1,227 @@
+"""
+Profiles agent discovery: what `adk web` pays to import every agent folder.
+
+The web UI's app list (`/list-apps?detailed=true`) imports each agent
+folder's `agent.py` and reads its `root_agent`. This does the same, one
+folder after the other, in a fresh Python process started with
+`-X importtime`, and reports the cold-start cost:
+
+    PYTHONPATH=$PWD python -m adk_common.startup_profile                  # every agent folder
+    PYTHONPATH=$PWD python -m adk_common.startup_profile 04-agents-to-agents-A2A --top 5
+    PYTHONPATH=$PWD python -m adk_common.startup_profile --budget 0.5     # exit 1 if the agents take longer
+
+First it imports the framework: the `adk web` server (`--framework web`,
+the default) or only the agent classes (`core`). Then, for each agent, it
+prints:
+- the import time;
+- how much the process's resident memory grew;
+- the root agent's name, or the error that would keep the agent out of the UI;
+- the `--top` packages whose modules took the longest to import.
+
+As in `adk web`, a package's cost goes to the first agent that imports it.
+Imports from a background thread an agent starts (e.g. the Ollama warm-up)
+show up under whichever agent is loading at the time. `--json` writes the
+whole report, including every module.
+
+Keep heavy dependencies (torch, transformers, scikit-learn, HTML parsers,
+HTTP clients) and expensive setup (loading models, training, network calls)
+out of module level: import them and build the objects that need them on
+first use, in the tool or a cached loader function.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+# Not imported from `.loader`, which would load google.adk before it is timed.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_MARKER = "startup_profile: "
+# What is imported before any agent: the `adk web` server, or only what every agent needs.
+FRAMEWORKS = {
+    "web": ["google.adk.cli.fast_api"],
+    "core": ["google.adk.agents", "google.adk.runners"],
+}
+_IMPORT_TIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+# --- 1. Finding the agents ---
+
+def find_agent_dirs(paths: Optional[List[str]] = None) -> List[str]:
+    """
+    The agent folders (folders with an `agent.py`) in `paths`, repo-relative.
+
+    A path can be an agent folder or a folder of agents, as passed to `adk web`.
+    The default is every numbered section of the repository (`01-...`, `02-...`).
+    """
+    if not paths:
+        paths = sorted(name for name in os.listdir(REPO_ROOT) if re.match(r"\d\d-", name))
+    found = []
+    for path in paths:
+        path = os.path.normpath(os.path.join(REPO_ROOT, path))
+        if os.path.isfile(os.path.join(path, "agent.py")):
+            candidates = [path]
+        else:
+            candidates = [os.path.join(path, name) for name in sorted(os.listdir(path))
+                          if not name.startswith((".", "__"))]
+        found += [os.path.relpath(c, REPO_ROOT) for c in candidates if os.path.isfile(os.path.join(c, "agent.py"))]
+    return found
+
+
+# --- 2. Inside the profiled process ---
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource  # Not Linux: the peak is the closest we get.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _section(label: str):
+    # `-X importtime` writes to the same stderr, so this splits its lines by section.
+    sys.stderr.write(f"{_MARKER}{label}\n")
+    sys.stderr.flush()
+
+
+def discover(agent_dirs: List[str], framework: str = "web") -> List[dict]:
+    """Imports `FRAMEWORKS[framework]`, then each agent folder and its `root_agent`, timing every step."""
+    results = []
+    label = f"google.adk ({framework})"
+    _section(label)
+    start, rss = time.perf_counter(), _rss_bytes()
+    for module in FRAMEWORKS[framework]:
+        importlib.import_module(module)
+    from .loader import load_agent_module
+    results.append({"name": label, "seconds": time.perf_counter() - start, "rss_bytes": _rss_bytes() - rss})
+
+    for agent_dir in agent_dirs:
+        _section(agent_dir)
+        start, rss = time.perf_counter(), _rss_bytes()
+        result = {"name": agent_dir}
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):  # The agents' startup banners.
+                result["root_agent"] = load_agent_module(agent_dir).root_agent.name
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        result["seconds"] = time.perf_counter() - start
+        result["rss_bytes"] = _rss_bytes() - rss
+        results.append(result)
+    _section("")
+    return results
+
+
+# --- 3. Running and reading the profile ---
+
+def parse_import_times(stderr: str) -> dict:
+    """{section: [{"module", "self_us", "cumulative_us", "depth"}, ...]} from `-X importtime` output."""
+    sections, current = {}, None
+    for line in stderr.splitlines():
+        if line.startswith(_MARKER):
+            current = line[len(_MARKER):] or None
+            if current:
+                sections[current] = []
+            continue
+        match = _IMPORT_TIME.match(line)
+        if match and current:
+            self_us, cumulative_us, indent, module = match.groups()
+            sections[current].append({"module": module, "self_us": int(self_us),
+                                      "cumulative_us": int(cumulative_us), "depth": len(indent) // 2})
+    return sections
+
+
+def top_packages(modules: List[dict], top: int) -> List[tuple]:
+    """The `top` (package, seconds) pairs with the most import time, summed over each package's modules."""
+    per_package = {}
+    for module in modules:
+        parts = module["module"].split(".")
+        if parts[0].startswith("_agents_"):
+            package = "agent code"  # The agent folder itself, as named by `load_agent_module`.
+        elif parts[0] == "google":
+            package = ".".join(parts[:3] if parts[1:2] == ["adk"] else parts[:2])  # e.g. google.genai, google.adk.a2a
+        else:
+            package = parts[0]
+        per_package[package] = per_package.get(package, 0) + module["self_us"]
+    ranked = sorted(per_package.items(), key=lambda item: -item[1])[:top]
+    return [(package, us / 1e6) for package, us in ranked]
+
+
+def profile(agent_dirs: List[str], framework: str = "web") -> dict:
+    """Runs `discover` in a cold `python -X importtime` process and returns the report."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "adk_common.startup_profile", "--discover",
+         "--framework", framework, *agent_dirs],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(f"the profiled process failed:\n{process.stderr[-2000:]}")
+    results = json.loads(process.stdout.strip().splitlines()[-1])
+    modules = parse_import_times(process.stderr)
+    for result in results:
+        result["modules"] = modules.get(result["name"], [])
+    agents = results[1:]
+    return {
+        "process_seconds": wall,
+        "framework": results[0],
+        "agents": agents,
+        "agents_seconds": sum(a["seconds"] for a in agents),
+        "agents_rss_bytes": sum(a["rss_bytes"] for a in agents),
+    }
+
+
+def print_report(report: dict, top: int):
+    print(f"{'':<56}{'import (s)':>11}{'RSS (MB)':>10}  root agent")
+    for result in [report["framework"], *report["agents"]]:
+        outcome = result.get("root_agent") or (f"❌ {result['error']}" if "error" in result else "")
+        print(f"{result['name']:<56}{result['seconds']:>11.3f}{result['rss_bytes'] / 2**20:>10.1f}  {outcome[:70]}")
+        heaviest = [f"{package} {seconds * 1000:.0f} ms" for package, seconds in top_packages(result["modules"], top)
+                    if seconds >= 0.001]
+        if heaviest:
+            print(f"{'':<4}{', '.join(heaviest)}")
+    failed = sum(1 for a in report["agents"] if "error" in a)
+    print(f"\n⏱️  {len(report['agents'])} agents in {report['agents_seconds']:.2f}s "
+          f"(+{report['agents_rss_bytes'] / 2**20:.0f} MB) after {report['framework']['seconds']:.2f}s of {report['framework']['name']}; "
+          f"cold process {report['process_seconds']:.2f}s" + (f"; {failed} failed to load" if failed else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="agent folders or folders of agents (default: the whole repository)")
+    parser.add_argument("--top", type=int, default=3, help="packages to list per agent")
+    parser.add_argument("--json", help="write the full report (every module) to this file")
+    parser.add_argument("--budget", type=float, help="exit 1 if importing the agents takes longer (seconds)")
+    parser.add_argument("--framework", choices=FRAMEWORKS, default="web",
+                        help="import the `adk web` server first (web) or only the agent classes (core)")
+    parser.add_argument("--discover", action="store_true", help=argparse.SUPPRESS)  # The profiled process.
+    args = parser.parse_args()
+
+    if args.discover:
+        results = discover(args.paths, args.framework)
+        print(json.dumps(results))
+        return
+
+    report = profile(find_agent_dirs(args.paths), args.framework)
+    print_report(report, args.top)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.budget is not None and report["agents_seconds"] > args.budget:
+        print(f"❌ over the {args.budget:.2f}s budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
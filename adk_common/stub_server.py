@@ -0,0 +1,425 @@
+"""
+A local HTTP server that speaks the Gemini and Ollama wire formats.
+
+Points the real `Gemini` / `LiteLlm` clients at scripted answers, so a
+benchmark measures the whole client stack (HTTP, JSON, retries) without an
+API key or a GPU:
+
+    with StubModelServer(responder=lambda request: "Hello!", latency=0.05) as stub:
+        model = Gemini(model="gemini-2.5-flash-lite", base_url=stub.url)
+        model = LiteLlm(model="ollama_chat/llama3.1:8b", api_base=stub.url)
+
+Endpoints:
+
+- Gemini: `POST /v1beta/models/{model}:generateContent` and
+  `:streamGenerateContent?alt=sse`
+- Ollama: `POST /api/chat` (`"stream": true` answers in NDJSON chunks) and
+  `POST /api/generate` with no prompt (loads the model, like `ollama run`)
+
+The `responder` is the same callable `FakeLlm` takes: it gets an
+`LlmRequest` (converted from the wire format) and returns text, a `Content`
+or an `LlmResponse`. `stub.requests` counts the calls per endpoint.
+
+`faults` injects errors: it is called with the endpoint name ("gemini" or
+"ollama") before every request and returns a `Fault` to answer with, or
+`None` to answer normally. `storm()` builds one for a burst of 429s:
+
+    with StubModelServer(faults=storm(duration=5, rate=0.9, retry_after=1)) as stub:
+        ...
+
+`ollama` simulates what an Ollama server does around a request: loading the
+model, unloading it after `keep_alive`, and its parallel slots and queue:
+
+    with StubModelServer(ollama=OllamaRuntime(load_time=3.0, parallel=4, max_queue=8)) as stub:
+        ...
+"""
+import collections
+import contextlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, Union
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from .fake_llm import Reply, _echo
+from .rate_limit import estimate_request_tokens
+
+
+def _reply_content(reply: Reply) -> types.Content:
+    if isinstance(reply, LlmResponse):
+        return reply.content or types.Content(role="model", parts=[])
+    if isinstance(reply, str):
+        return types.Content(role="model", parts=[types.Part(text=reply)])
+    return reply
+
+
+def gemini_request(body: dict, model: str) -> LlmRequest:
+    """A `generateContent` JSON body as an `LlmRequest`."""
+    config = types.GenerateContentConfig(
+        system_instruction=types.Content.model_validate(body["systemInstruction"])
+        if body.get("systemInstruction") else None,
+        tools=[types.Tool.model_validate(t) for t in body.get("tools", [])] or None,
+    )
+    return LlmRequest(
+        model=model,
+        contents=[types.Content.model_validate(c) for c in body.get("contents", [])],
+        config=config,
+    )
+
+
+def ollama_request(body: dict) -> LlmRequest:
+    """An Ollama `/api/chat` JSON body as an `LlmRequest`."""
+    system, contents = [], []
+    for message in body.get("messages", []):
+        role, text = message.get("role"), message.get("content") or ""
+        if role == "system":
+            system.append(text)
+        elif role == "tool":
+            contents.append(types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+                name=message.get("tool_name") or message.get("name") or "tool", response={"result": text}))]))
+        else:
+            parts = [types.Part(text=text)] if text else []
+            for call in message.get("tool_calls") or []:
+                arguments = call["function"].get("arguments") or {}
+                if isinstance(arguments, str):
+                    arguments = json.loads(arguments or "{}")
+                parts.append(types.Part(function_call=types.FunctionCall(name=call["function"]["name"], args=arguments)))
+            contents.append(types.Content(role="model" if role == "assistant" else "user", parts=parts))
+    config = types.GenerateContentConfig(system_instruction="\n".join(system) or None)
+    return LlmRequest(model=body.get("model"), contents=contents, config=config)
+
+
+@dataclass
+class Fault:
+    """An error answer: the HTTP status, an optional `Retry-After` and a delay before answering."""
+
+    status: int = 429
+    retry_after: Optional[Union[float, str]] = None
+    """Seconds, or a raw header value (e.g. a malformed "soon")."""
+    delay: float = 0.0
+
+
+_STATUS_NAMES = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE", 504: "DEADLINE_EXCEEDED"}
+
+
+def storm(duration: float, rate: float = 1.0, status: int = 429, retry_after: Optional[Union[float, str]] = None,
+          start: float = 0.0, seed: Optional[int] = None):
+    """
+    A `faults` callable that fails `rate` of the requests with `status`
+    between `start` and `start + duration` seconds after the first request.
+    """
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    first = []
+
+    def faults(endpoint: str) -> Optional[Fault]:
+        with lock:
+            now = time.monotonic()
+            if not first:
+                first.append(now)
+            elapsed = now - first[0]
+            if start <= elapsed < start + duration and rng.random() < rate:
+                return Fault(status=status, retry_after=retry_after)
+        return None
+
+    return faults
+
+
+def parse_keep_alive(value, default: float) -> float:
+    """Ollama's `keep_alive` in seconds: a number of seconds or a duration like "30m" / "1h30m"; negative = forever."""
+    if value is None or value == "":
+        return default
+    if isinstance(value, (int, float)) or re.fullmatch(r"-?[\d.]+", str(value)):
+        seconds = float(value)
+    else:
+        units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+        seconds = sum(float(n) * units[u] for n, u in re.findall(r"([\d.]+)(ms|h|m|s)", str(value)))
+        if str(value).startswith("-"):
+            seconds = -seconds
+    return math.inf if seconds < 0 else seconds
+
+
+class ServerBusy(Exception):
+    """The Ollama queue is full (`OLLAMA_MAX_QUEUE`); answered with 503."""
+
+
+class OllamaRuntime:
+    """
+    The parts of an Ollama server that decide latency, for `StubModelServer`.
+
+    - A model that is not in memory takes `load_time` seconds to load before
+      the request runs (concurrent requests wait for the same load).
+    - A model is unloaded `keep_alive` seconds after its last request
+      finished; the request's own `"keep_alive"` overrides the default
+      (Ollama's default is 5 minutes).
+    - A request whose `options.num_ctx` differs from the loaded model's
+      context size (`num_ctx` when it sets none) reloads the model.
+    - At most `parallel` requests run at once (`OLLAMA_NUM_PARALLEL`); up to
+      `max_queue` more wait for a slot (`OLLAMA_MAX_QUEUE`), the rest get 503.
+    """
+
+    def __init__(self, load_time: float = 0.0, parallel: int = 1, max_queue: Optional[int] = None,
+                 keep_alive: float = 300.0, num_ctx: int = 4096):
+        self.load_time = load_time
+        self.parallel = parallel
+        self.max_queue = max_queue
+        self.keep_alive = keep_alive
+        self.num_ctx = num_ctx
+        self.loads = 0
+        self.rejected = 0
+        self._slots = threading.Semaphore(parallel)
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._waiting = 0
+        self._active = collections.Counter()
+        self._loaded_until = {}
+        self._loaded_ctx = {}
+
+    def is_loaded(self, model: str, num_ctx: Optional[int] = None) -> bool:
+        with self._lock:
+            return (time.monotonic() < self._loaded_until.get(model, -math.inf)
+                    and self._loaded_ctx.get(model) == (num_ctx or self.num_ctx))
+
+    def load(self, model: str, keep_alive=None, num_ctx: Optional[int] = None) -> bool:
+        """Loads `model` unless it is in memory with this context size. Returns True if it had to be loaded."""
+        with self._load_lock:
+            loaded = self.is_loaded(model, num_ctx)
+            if not loaded:
+                time.sleep(self.load_time)
+                self.loads += 1
+                with self._lock:
+                    self._loaded_ctx[model] = num_ctx or self.num_ctx
+            with self._lock:
+                if not self._active[model]:
+                    self._loaded_until[model] = time.monotonic() + parse_keep_alive(keep_alive, self.keep_alive)
+            return not loaded
+
+    @contextlib.contextmanager
+    def serve(self, model: str, keep_alive=None, num_ctx: Optional[int] = None):
+        """Holds a slot (and the loaded model) while one request runs. Raises `ServerBusy` when the queue is full."""
+        with self._lock:
+            if self.max_queue is not None and self._waiting >= self.max_queue:
+                self.rejected += 1
+                raise ServerBusy(model)
+            self._waiting += 1
+        try:
+            self._slots.acquire()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        try:
+            self.load(model, keep_alive, num_ctx)
+            with self._lock:
+                self._active[model] += 1
+                self._loaded_until[model] = math.inf
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._active[model] -= 1
+                    if not self._active[model]:
+                        self._loaded_until[model] = time.monotonic() + parse_keep_alive(keep_alive, self.keep_alive)
+        finally:
+            self._slots.release()
+
+
+class StubModelServer:
+    """Serves scripted answers over HTTP on 127.0.0.1 (a free port unless `port` is given)."""
+
+    def __init__(self, responder: Callable[[LlmRequest], Reply] = _echo, latency: float = 0.0,
+                 chunks: int = 4, port: int = 0, faults: Optional[Callable[[str], Optional[Fault]]] = None,
+                 ollama: Optional[OllamaRuntime] = None):
+        self.responder = responder
+        self.faults = faults
+        self.ollama = ollama
+        self.latency = latency
+        self.chunks = chunks
+        self.requests = collections.Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubModelServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def count(self, endpoint: str):
+        with self._lock:
+            self.requests[endpoint] += 1
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass  # Keep benchmark output clean.
+
+            def _json(self, payload: dict, status: int = 200, headers: Optional[dict] = None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, content_type: str, lines):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for line in lines:
+                    data = line.encode()
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _fault(self, endpoint: str) -> bool:
+                fault = stub.faults(endpoint) if stub.faults else None
+                if fault is None:
+                    return False
+                stub.count(f"{endpoint}_fault")
+                time.sleep(fault.delay)
+                message = f"Injected {fault.status}"
+                payload = {"error": message} if endpoint == "ollama" else {"error": {
+                    "code": fault.status, "status": _STATUS_NAMES.get(fault.status, "UNKNOWN"), "message": message,
+                }}
+                retry_after = fault.retry_after
+                if isinstance(retry_after, (int, float)):
+                    retry_after = f"{retry_after:g}"
+                headers = {"Retry-After": retry_after} if retry_after is not None else None
+                self._json(payload, fault.status, headers)
+                return True
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                path = self.path.split("?")[0]
+                if path == "/api/chat":
+                    stub.count("ollama")
+                    if self._fault("ollama"):
+                        return
+                    if stub.ollama is None:
+                        return self._ollama(body)
+                    try:
+                        with stub.ollama.serve(body.get("model"), body.get("keep_alive"),
+                                               (body.get("options") or {}).get("num_ctx")):
+                            return self._ollama(body)
+                    except ServerBusy:
+                        return self._json({"error": "server busy, please try again. maximum pending requests exceeded"}, 503)
+                if path == "/api/generate" and not body.get("prompt"):
+                    stub.count("ollama_load")
+                    if stub.ollama is not None:
+                        stub.ollama.load(body.get("model"), body.get("keep_alive"),
+                                         (body.get("options") or {}).get("num_ctx"))
+                    return self._json({"model": body.get("model"), "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                                       "response": "", "done": True, "done_reason": "load"})
+                if ":generateContent" in path or ":streamGenerateContent" in path:
+                    stub.count("gemini")
+                    if self._fault("gemini"):
+                        return
+                    model = path.rsplit("/", 1)[-1].split(":")[0]
+                    return self._gemini(body, model, stream=":streamGenerateContent" in path)
+                self._json({"error": {"code": 404, "message": f"No stub for {path}"}}, 404)
+
+            def _gemini(self, body: dict, model: str, stream: bool):
+                request = gemini_request(body, model)
+                content = _reply_content(stub.responder(request))
+                prompt_tokens = estimate_request_tokens(request)
+                text = "".join(p.text or "" for p in content.parts or [])
+                output_tokens = max(1, len(text) // 4)
+
+                def chunk(parts, final):
+                    payload = {"candidates": [{
+                        "content": {"role": "model", "parts": parts},
+                        **({"finishReason": "STOP"} if final else {}),
+                    }]}
+                    if final:
+                        payload["usageMetadata"] = {
+                            "promptTokenCount": prompt_tokens,
+                            "candidatesTokenCount": output_tokens,
+                            "totalTokenCount": prompt_tokens + output_tokens,
+                        }
+                    return payload
+
+                parts = [p.model_dump(mode="json", exclude_none=True, by_alias=True) for p in content.parts or []]
+                if not stream:
+                    time.sleep(stub.latency)
+                    return self._json(chunk(parts, final=True))
+
+                def events():
+                    pieces = _split(text, stub.chunks) if text and len(parts) == 1 else []
+                    for piece in pieces[:-1]:
+                        time.sleep(stub.latency / max(1, len(pieces)))
+                        yield f"data: {json.dumps(chunk([{'text': piece}], final=False))}\r\n\r\n"
+                    time.sleep(stub.latency / max(1, len(pieces)))
+                    last = [{"text": pieces[-1]}] if pieces else parts
+                    yield f"data: {json.dumps(chunk(last, final=True))}\r\n\r\n"
+
+                self._stream("text/event-stream", events())
+
+            def _ollama(self, body: dict):
+                request = ollama_request(body)
+                content = _reply_content(stub.responder(request))
+                text = "".join(p.text or "" for p in content.parts or [])
+                tool_calls = [
+                    {"id": f"call_{uuid.uuid4().hex[:8]}", "function": {"name": p.function_call.name, "arguments": p.function_call.args or {}}}
+                    for p in content.parts or [] if p.function_call
+                ]
+                prompt_tokens = estimate_request_tokens(request)
+                final = {
+                    "model": body.get("model"), "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "message": {"role": "assistant", "content": text, **({"tool_calls": tool_calls} if tool_calls else {})},
+                    "done": True, "done_reason": "stop",
+                    "prompt_eval_count": prompt_tokens, "eval_count": max(1, len(text) // 4),
+                }
+                if not body.get("stream"):
+                    time.sleep(stub.latency)
+                    return self._json(final)
+
+                def lines():
+                    pieces = _split(text, stub.chunks) if text and not tool_calls else []
+                    for piece in pieces:
+                        time.sleep(stub.latency / max(1, len(pieces)))
+                        yield json.dumps({"model": body.get("model"), "message": {"role": "assistant", "content": piece},
+                                          "done": False}) + "\n"
+                    if not pieces:
+                        time.sleep(stub.latency)
+                    yield json.dumps({**final, "message": {**final["message"], "content": ""} if pieces else final["message"]}) + "\n"
+
+                self._stream("application/x-ndjson", lines())
+
+        return Handler
+
+
+def _split(text: str, chunks: int) -> list:
+    step = -(-len(text) // max(1, chunks))
+    return [text[i:i + step] for i in range(0, len(text), step)]
@@ -0,0 +1,407 @@
+"""
+Per-agent, per-model-call and per-tool tracing and metrics as a runner plugin.
+
+    from adk_common.telemetry import TelemetryPlugin, configure_otlp, serve_metrics
+
+    configure_otlp("http://localhost:4318")  # optional: spans to a local OTLP collector
+    serve_metrics(port=9464)                 # optional: Prometheus scrapes http://127.0.0.1:9464/metrics
+    app = App(name="my_agent", root_agent=root_agent, plugins=[TelemetryPlugin()])
+
+Register the plugin on the module's `App` rather than on a module-level
+runner only: `adk web` builds its own runner from `app` (or `root_agent`).
+
+Spans (OpenTelemetry API, so they go wherever the configured tracer provider
+sends them, and cost next to nothing when none is configured):
+
+    invocation <app>
+    └── agent ResearchSystem
+        ├── agent ParallelResearchTeam
+        │   ├── agent TechResearcher
+        │   │   └── model gemini-2.5-flash-lite   tokens, retries, cache, queue wait, payload chars
+        │   └── ...
+        └── agent AggregatorAgent
+            └── tool get_exchange_rate            args/result chars, error
+
+Spans are parented explicitly from the agent tree, so the hierarchy is right
+for parallel branches as well and no context is attached across callbacks.
+Spans still open when an invocation ends (a cancelled branch, an error, a
+run abandoned by its caller) are ended with an error status, so nothing is
+kept per invocation once it is over.
+
+Retries, cache hits and rate-limit waits are read from the model response's
+`custom_metadata` ("retries", "cache", "queue_wait_s"), which the wrappers in
+`adk_common` fill in.
+
+Metrics are kept in-process (`default_metrics`) and rendered in the Prometheus
+text format, with no extra dependency.
+"""
+import bisect
+import http.server
+import os
+import threading
+import time
+import weakref
+from typing import Optional
+
+from google.adk.plugins.base_plugin import BasePlugin
+from opentelemetry import trace
+
+TRACER = trace.get_tracer("adk_common.telemetry")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+# --- 1. Metrics ---
+
+class Metrics:
+    """A minimal thread-safe registry of counters, gauges and histograms with Prometheus text exposition."""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}    # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self._help = {}
+
+    def inc(self, name: str, value: float = 1.0, help: str = "", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, ("counter", help))
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, help: str = "", **labels):
+        """Sets a gauge (a value that goes up and down, e.g. a queue depth)."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, ("gauge", help))
+            self._counters[key] = float(value)
+
+    def observe(self, name: str, value: float, help: str = "", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._help.setdefault(name, ("histogram", help))
+            data = self._histograms.get(key)
+            if data is None:
+                data = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            data[index] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def value(self, name: str, **labels) -> float:
+        """Current value of a counter or gauge (or the observation count of a histogram)."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            return self._histograms[key][-1] if key in self._histograms else 0.0
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        def fmt(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+        lines = []
+        with self._lock:
+            for name, (kind, help) in sorted(self._help.items()):
+                lines.append(f"# HELP {name} {help or name}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind in ("counter", "gauge"):
+                    for (n, labels), value in sorted(self._counters.items()):
+                        if n == name:
+                            lines.append(f"{name}{fmt(labels)} {value:g}")
+                    continue
+                for (n, labels), data in sorted(self._histograms.items()):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + ("+Inf",), data):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {cumulative}")
+                    lines.append(f"{name}_sum{fmt(labels)} {data[-2]:g}")
+                    lines.append(f"{name}_count{fmt(labels)} {data[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+default_metrics = Metrics()
+
+
+def serve_metrics(port: int = 9464, metrics: Metrics = default_metrics, host: str = "127.0.0.1"):
+    """
+    Serves `metrics` at http://<host>:<port>/metrics from a daemon thread. Returns the server.
+
+    Local only by default; pass `host="0.0.0.0"` (or set `ADK_METRICS_HOST`) for a scraper on another machine.
+    """
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📈 Prometheus metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def configure_otlp(endpoint: str = "http://localhost:4318", service_name: str = "adk-agents"):
+    """Sends spans to an OTLP/HTTP collector in batches (needs `opentelemetry-exporter-otlp-proto-http`)."""
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError as e:
+        raise ImportError(
+            "OTLP export needs the exporter package: pip install opentelemetry-exporter-otlp-proto-http"
+        ) from e
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=f"{endpoint.rstrip('/')}/v1/traces")))
+    trace.set_tracer_provider(provider)
+    return provider
+
+
+# --- 2. Payload sizes ---
+
+def _content_chars(contents) -> int:
+    chars = 0
+    for content in contents or []:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call:
+                chars += len(str(part.function_call.args or ""))
+            elif part.function_response:
+                chars += len(str(part.function_response.response or ""))
+    return chars
+
+
+def _end_with_error(span, reason):
+    span.set_status(trace.Status(trace.StatusCode.ERROR, str(reason)))
+    span.end()
+
+
+# --- 3. The plugin ---
+
+class TelemetryPlugin(BasePlugin):
+    """Opens a span and records metrics for every invocation, agent run, model call and tool call."""
+
+    def __init__(self, metrics: Metrics = default_metrics, tracer=None, name: str = "telemetry"):
+        super().__init__(name=name)
+        self.metrics = metrics
+        self.tracer = tracer or TRACER
+        # (invocation_id, agent name) -> (span, start); "" is the invocation itself
+        self._agents = {}
+        # (invocation_id, agent name) -> [(span, start, model)] of running model calls
+        self._models = {}
+        # function_call_id -> (span, start, tool name, invocation_id)
+        self._tools = {}
+
+    def _start(self, name: str, parent, **attributes):
+        context = trace.set_span_in_context(parent) if parent is not None else None
+        return self.tracer.start_span(name, context=context, attributes=attributes), time.perf_counter()
+
+    def _agent_span(self, invocation_id: str, agent_name: Optional[str]):
+        entry = self._agents.get((invocation_id, agent_name)) or self._agents.get((invocation_id, ""))
+        return entry[0] if entry else None
+
+    # Invocation
+
+    async def before_run_callback(self, *, invocation_context):
+        invocation_id = invocation_context.invocation_id
+        self._agents[(invocation_id, "")] = self._start(
+            f"invocation {invocation_context.app_name}", None,
+            **{"adk.app": invocation_context.app_name, "adk.invocation_id": invocation_id},
+        )
+        # A run cancelled outright gets no callback: end its spans once its context is collected.
+        weakref.finalize(invocation_context, self._close_invocation, invocation_id, "abandoned")
+
+    async def after_run_callback(self, *, invocation_context):
+        entry = self._close_invocation(invocation_context.invocation_id, "cancelled")
+        if entry:
+            self.metrics.observe("adk_invocation_duration_seconds", time.perf_counter() - entry[1],
+                                 "Wall time of a runner invocation", app=invocation_context.app_name)
+
+    async def on_run_error_callback(self, *, invocation_context, error):
+        self._close_invocation(invocation_context.invocation_id, error)
+
+    def _close_invocation(self, invocation_id: str, reason):
+        """
+        Ends and forgets every span of the invocation that is still open, with `reason` as
+        the error of all but the invocation's own span. Returns the invocation's (span, start).
+        """
+        for key in [key for key in list(self._models) if key[0] == invocation_id]:
+            for span, _, _ in self._models.pop(key, ()):
+                _end_with_error(span, reason)
+        for call_id in [call_id for call_id, entry in list(self._tools.items()) if entry[3] == invocation_id]:
+            entry = self._tools.pop(call_id, None)
+            if entry:
+                _end_with_error(entry[0], reason)
+        for key in [key for key in list(self._agents) if key[0] == invocation_id and key[1]]:
+            entry = self._agents.pop(key, None)
+            if entry:
+                _end_with_error(entry[0], reason)
+        entry = self._agents.pop((invocation_id, ""), None)
+        if entry:
+            if isinstance(reason, BaseException) or reason == "abandoned":
+                _end_with_error(entry[0], reason)
+            else:
+                entry[0].end()
+        return entry
+
+    # Agents
+
+    async def before_agent_callback(self, *, agent, callback_context):
+        invocation_id = callback_context.invocation_id
+        parent_name = agent.parent_agent.name if agent.parent_agent else None
+        parent = self._agent_span(invocation_id, parent_name)
+        self._agents[(invocation_id, agent.name)] = self._start(
+            f"agent {agent.name}", parent, **{"adk.agent": agent.name, "adk.agent.type": type(agent).__name__}
+        )
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        entry = self._agents.pop((callback_context.invocation_id, agent.name), None)
+        if entry:
+            entry[0].end()
+            self.metrics.observe("adk_agent_duration_seconds", time.perf_counter() - entry[1],
+                                 "Wall time of an agent run, including its sub-agents", agent=agent.name)
+
+    async def on_agent_error_callback(self, *, agent, callback_context, error):
+        for span, _, _ in self._models.pop((callback_context.invocation_id, agent.name), ()):
+            _end_with_error(span, error)
+        entry = self._agents.pop((callback_context.invocation_id, agent.name), None)
+        if entry:
+            _end_with_error(entry[0], error)
+
+    # Model calls
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        agent = callback_context.agent_name
+        span, start = self._start(
+            f"model {llm_request.model}", self._agent_span(callback_context.invocation_id, agent),
+            **{"adk.agent": agent, "gen_ai.request.model": llm_request.model or "",
+               "adk.request.chars": _content_chars(llm_request.contents)},
+        )
+        self._models.setdefault((callback_context.invocation_id, agent), []).append((span, start, llm_request.model or ""))
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        if llm_response.partial:
+            return None
+        self._finish_model(callback_context, llm_response, None)
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        self._finish_model(callback_context, None, error)
+        return None
+
+    def _finish_model(self, callback_context, llm_response, error):
+        running = self._models.get((callback_context.invocation_id, callback_context.agent_name))
+        if not running:
+            return
+        span, start, model = running.pop()
+        if not running:
+            del self._models[(callback_context.invocation_id, callback_context.agent_name)]
+        agent = callback_context.agent_name
+        seconds = time.perf_counter() - start
+        labels = {"agent": agent, "model": model}
+
+        metadata = (llm_response.custom_metadata or {}) if llm_response else {}
+        cache = metadata.get("cache", "miss")
+        retries = int(metadata.get("retries", 0))
+        span.set_attribute("adk.cache", cache)
+        span.set_attribute("adk.retries", retries)
+        if "queue_wait_s" in metadata:
+            span.set_attribute("adk.queue_wait_s", metadata["queue_wait_s"])
+            self.metrics.inc("adk_model_queue_wait_seconds_total", metadata["queue_wait_s"],
+                             "Time model calls waited for rate-limit quota", **labels)
+        if retries:
+            self.metrics.inc("adk_model_retries_total", retries, "Retried model call attempts", **labels)
+
+        if llm_response is not None:
+            usage = llm_response.usage_metadata
+            if usage:
+                for kind, count in (("prompt", usage.prompt_token_count), ("output", usage.candidates_token_count)):
+                    if count:
+                        span.set_attribute(f"gen_ai.usage.{kind}_tokens", count)
+                        self.metrics.inc("adk_model_tokens_total", count, "Model tokens", kind=kind, **labels)
+            chars = _content_chars([llm_response.content] if llm_response.content else [])
+            span.set_attribute("adk.response.chars", chars)
+            if llm_response.error_code:
+                error = llm_response.error_code
+        status = "error" if error else "ok"
+        if error:
+            span.set_status(trace.Status(trace.StatusCode.ERROR, str(error)))
+        span.end()
+        self.metrics.inc("adk_model_calls_total", 1, "Model calls", cache=cache, status=status, **labels)
+        self.metrics.observe("adk_model_duration_seconds", seconds, "Wall time of a model call", **labels)
+
+    # Tool calls
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        parent = self._agent_span(tool_context.invocation_id, tool_context.agent_name)
+        span, start = self._start(
+            f"tool {tool.name}", parent,
+            **{"adk.agent": tool_context.agent_name, "adk.tool": tool.name, "adk.tool.args.chars": len(str(tool_args))},
+        )
+        self._tools[tool_context.function_call_id] = (span, start, tool.name, tool_context.invocation_id)
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        self._finish_tool(tool_context, result, None)
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        self._finish_tool(tool_context, None, error)
+
+    def _finish_tool(self, tool_context, result, error):
+        entry = self._tools.pop(tool_context.function_call_id, None)
+        if not entry:
+            return
+        span, start, name, _ = entry
+        if result is not None:
+            span.set_attribute("adk.tool.result.chars", len(str(result)))
+        if error:
+            span.set_status(trace.Status(trace.StatusCode.ERROR, str(error)))
+        span.end()
+        status = "error" if error else "ok"
+        self.metrics.inc("adk_tool_calls_total", 1, "Tool calls", tool=name, status=status)
+        self.metrics.observe("adk_tool_duration_seconds", time.perf_counter() - start, "Wall time of a tool call", tool=name)
+
+
+# --- 4. Opt-in from the environment ---
+
+_exporters_started = False
+
+
+def setup_from_env():
+    """
+    Starts the exporters named in the environment, once per process:
+
+    - `ADK_METRICS_PORT=9464` serves Prometheus metrics on that port;
+    - `OTEL_EXPORTER_OTLP_ENDPOINT=http://localhost:4318` sends spans to an OTLP collector.
+    """
+    global _exporters_started
+    if _exporters_started:
+        return
+    _exporters_started = True
+    if os.environ.get("ADK_METRICS_PORT"):
+        serve_metrics(int(os.environ["ADK_METRICS_PORT"]), host=os.environ.get("ADK_METRICS_HOST", "127.0.0.1"))
+    if os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        configure_otlp(os.environ["OTEL_EXPORTER_OTLP_ENDPOINT"])
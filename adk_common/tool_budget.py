@@ -0,0 +1,240 @@
+"""
+Token budgets for tool outputs.
+
+Tool results go into the model's context as they are returned, and an
+agent re-sends them on every later turn. Some of them are much bigger than
+they need to be: `search_web` returns its formatted `sources` *and* the raw
+result list they were built from, `read_website` up to 10 KB per page, and
+`analyze_market_sentiment` a stringified dict. On a small local model every
+token of that is prefill time.
+
+`ToolOutputBudget` shapes each result as it comes back from the tool
+(`after_tool_callback`) and caps all the tool output sent in one model call
+(`before_model_callback`):
+
+    tool_budget = ToolOutputBudget(turn_budget=2_400, tool_budgets={"read_website": 1_200})
+    agent = Agent(..., after_tool_callback=tool_budget.after_tool_callback,
+                  before_model_callback=tool_budget.before_model_callback)
+
+1. A string result that is a Python or JSON literal (e.g. `str(dict)`) is
+   parsed back into structured data.
+2. Redundant fields are dropped, e.g. `raw_results` when `sources` is there
+   (`redundant_fields` maps a field to the field that makes it redundant).
+3. The result is cut to the tool's budget (`tool_budgets`, else
+   `tool_budget`): the longest strings are shortened first, then trailing
+   list items are dropped.
+4. Before each model call, the function responses in the request are cut
+   together to `turn_budget`, the largest first. Only the request is
+   changed; the session keeps the results as step 3 left them.
+
+Tokens are counted with a local tokenizer (tiktoken's `cl100k_base`, read
+from the copy LiteLLM ships, so nothing is downloaded; it is within a few
+percent of Llama 3's tokenizer on English text). Without tiktoken the repo's
+~4 characters per token estimate is used. Every call's tokens before and
+after shaping are added up per tool in `state["tool_tokens"]` and in
+`stats`.
+"""
+import ast
+import copy
+import functools
+import importlib.util
+import json
+import os
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+# --- 1. Counting tokens ---
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    litellm = importlib.util.find_spec("litellm")
+    if litellm is not None and litellm.submodule_search_locations and "TIKTOKEN_CACHE_DIR" not in os.environ:
+        bundled = os.path.join(list(litellm.submodule_search_locations)[0], "litellm_core_utils", "tokenizers")
+        if os.path.isdir(bundled):
+            os.environ["TIKTOKEN_CACHE_DIR"] = bundled
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None  # Not cached and no network: fall back to the estimate.
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in `text` with the local tokenizer (or ~4 characters per token without one)."""
+    encoding = _encoding()
+    if encoding is None:
+        return max(1, len(text) // 4) if text else 0
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """The first `max_tokens` tokens of `text`."""
+    encoding = _encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def value_tokens(value) -> int:
+    """Tokens of a tool result as the model sees it (JSON)."""
+    return count_tokens(value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str))
+
+
+# --- 2. Shaping one result ---
+
+DEFAULT_REDUNDANT_FIELDS = {"raw_results": "sources"}
+
+
+def _parse_literal(value):
+    if isinstance(value, str) and value[:1] in "{[":
+        for parse in (json.loads, ast.literal_eval):
+            try:
+                return parse(value)
+            except (ValueError, SyntaxError):
+                continue
+    return value
+
+
+def _strings(value, path=()):
+    """(path, string) for every string leaf."""
+    if isinstance(value, str):
+        yield path, value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from _strings(item, path + (key,))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from _strings(item, path + (index,))
+
+
+def _set(value, path, new):
+    for key in path[:-1]:
+        value = value[key]
+    value[path[-1]] = new
+
+
+def _lists(value, path=()):
+    if isinstance(value, list):
+        yield path, value
+        items = enumerate(value)
+    elif isinstance(value, dict):
+        items = value.items()
+    else:
+        return
+    for key, item in items:
+        yield from _lists(item, path + (key,))
+
+
+def _get(value, path):
+    for key in path:
+        value = value[key]
+    return value
+
+
+def fit(value, budget: int, min_tokens: int = 16):
+    """
+    `value` cut to about `budget` tokens: the longest strings are shortened
+    first (never below `min_tokens`), then trailing list items are dropped.
+    """
+    value = copy.deepcopy(value)
+    if isinstance(value, str):
+        over = value_tokens(value) - budget
+        return value if over <= 0 else truncate_tokens(value, budget) + f"... [{over} tokens truncated]"
+
+    for _ in range(32):  # Each pass shortens one string; a handful of passes is plenty.
+        over = value_tokens(value) - budget
+        if over <= 0:
+            return value
+        leaves = sorted(((count_tokens(text), path, text) for path, text in _strings(value)),
+                        key=lambda leaf: leaf[0], reverse=True)
+        if not leaves or leaves[0][0] <= min_tokens:
+            break
+        tokens, path, text = leaves[0]
+        keep = max(min_tokens, tokens - over - 8)  # 8 tokens for the truncation note
+        _set(value, path, truncate_tokens(text, keep) + f"... [{tokens - keep} tokens truncated]")
+
+    # Still over: drop trailing list items, longest lists first.
+    for path in sorted((path for path, _ in _lists(value)), key=lambda path: len(_get(value, path)), reverse=True):
+        items = _get(value, path)
+        while len(items) > 1 and value_tokens(value) > budget:
+            items.pop()
+    return value
+
+
+# --- 3. The callbacks ---
+
+class ToolOutputBudget:
+    """Shapes tool results and keeps the tool output of each model call under `turn_budget` tokens."""
+
+    def __init__(
+        self,
+        turn_budget: int = 2_000,
+        tool_budget: int = 1_000,
+        tool_budgets: Optional[dict] = None,
+        redundant_fields: Optional[dict] = None,
+        state_key: Optional[str] = "tool_tokens",
+    ):
+        self.turn_budget = turn_budget
+        self.tool_budget = tool_budget
+        self.tool_budgets = dict(tool_budgets or {})
+        self.redundant_fields = DEFAULT_REDUNDANT_FIELDS if redundant_fields is None else dict(redundant_fields)
+        self.state_key = state_key
+        # tool name -> {"calls", "raw_tokens", "kept_tokens"}
+        self.stats = {}
+
+    def shape(self, tool_name: str, result):
+        """Steps 1-3 for one tool result."""
+        if isinstance(result, dict):
+            result = {key: _parse_literal(item) for key, item in result.items()}
+            for field, covered_by in self.redundant_fields.items():
+                if field in result and covered_by in result:
+                    result.pop(field)
+        else:
+            result = _parse_literal(result)
+        return fit(result, self.tool_budgets.get(tool_name, self.tool_budget))
+
+    def record(self, tool_name: str, raw_tokens: int, kept_tokens: int, state=None):
+        stats = self.stats.setdefault(tool_name, {"calls": 0, "raw_tokens": 0, "kept_tokens": 0})
+        stats["calls"] += 1
+        stats["raw_tokens"] += raw_tokens
+        stats["kept_tokens"] += kept_tokens
+        if state is not None and self.state_key:
+            per_tool = dict(state.get(self.state_key) or {})
+            entry = dict(per_tool.get(tool_name) or {"calls": 0, "raw_tokens": 0, "kept_tokens": 0})
+            entry["calls"] += 1
+            entry["raw_tokens"] += raw_tokens
+            entry["kept_tokens"] += kept_tokens
+            per_tool[tool_name] = entry
+            state[self.state_key] = per_tool
+
+    def after_tool_callback(self, tool, args, tool_context, tool_response):
+        raw_tokens = value_tokens(tool_response)
+        shaped = self.shape(tool.name, tool_response)
+        if not isinstance(shaped, dict):
+            shaped = {"result": shaped}
+        self.record(tool.name, raw_tokens, value_tokens(shaped), tool_context.state)
+        return shaped
+
+    def before_model_callback(self, callback_context: CallbackContext, llm_request: LlmRequest):
+        responses = [(i, j, part.function_response) for i, content in enumerate(llm_request.contents)
+                     for j, part in enumerate(content.parts or []) if part.function_response]
+        sizes = [value_tokens(response.response or {}) for _, _, response in responses]
+        over = sum(sizes) - self.turn_budget
+        for k in sorted(range(len(responses)), key=lambda k: sizes[k], reverse=True):
+            if over <= 0:
+                break
+            i, j, response = responses[k]
+            trimmed = fit(response.response or {}, max(64, sizes[k] - over))
+            over -= sizes[k] - value_tokens(trimmed)
+            # New parts and contents: the session's events keep their results.
+            content = llm_request.contents[i]
+            parts = list(content.parts)
+            parts[j] = types.Part(function_response=response.model_copy(update={"response": trimmed}))
+            llm_request.contents[i] = types.Content(role=content.role, parts=parts)
+        return None  # Continue with the (trimmed) request.
@@ -0,0 +1,127 @@
+"""
+Runs the function calls of one model turn concurrently.
+
+When a model answers with several function calls at once (e.g.
+`get_fee_for_payment_method` and `get_exchange_rate`), ADK starts one task
+per call and merges the responses in call order. A plain (sync) function
+tool, however, runs on the event loop thread and never yields, so the calls
+still run one after another, and the whole loop waits for each of them.
+`ToolDispatcher` wraps the tools of an agent so that:
+
+- sync tools run in a thread pool owned by the dispatcher (the event loop's
+  default executor stays free for DNS lookups and the like);
+- each tool runs at most `limits[name]` (default `default_limit`) calls at
+  once, across all sessions on an event loop, e.g. to respect an API's
+  concurrency limit (a runner in another thread, with its own loop, gets
+  its own cap);
+- async tools (including `cpu_bound` ones) are only capped.
+
+    dispatcher = ToolDispatcher(limits={"get_exchange_rate": 4})
+    agent = LlmAgent(..., tools=dispatcher.tools([get_fee_for_payment_method, get_exchange_rate]))
+
+ADK 2.12 can run sync function tools in a thread pool of its own
+(`RunConfig(tool_thread_pool_config=...)`), but only for runs started with
+that config, which `adk web`, `adk api_server` and `to_a2a` give no way to
+pass, and without a cap per tool. The dispatcher is set on the agent, so its
+threads and caps apply however the agent is run; its wrapped tools are async,
+so ADK's pool, when configured, leaves them alone instead of running them twice
+over a thread.
+
+The wrapped tools keep their name, signature and docstring, so the model
+sees the same declarations. Responses still come back in the order of the
+calls, whichever finishes first. Tool objects (`AgentTool`,
+`google_search`, a configured `FunctionTool`, ...) are passed through
+unchanged.
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import inspect
+import threading
+import time
+import weakref
+from typing import Optional
+
+from google.adk.tools.base_tool import BaseTool
+
+
+class ToolDispatcher:
+    """Per-tool concurrency caps and a thread pool for the sync tools of one or more agents."""
+
+    def __init__(self, default_limit: int = 8, limits: Optional[dict] = None, max_threads: int = 16):
+        self.default_limit = default_limit
+        self.limits = dict(limits or {})
+        self.max_threads = max_threads
+        self._executor = None
+        # loop -> {tool name: semaphore}; semaphores belong to one loop and go away with it.
+        self._semaphores = weakref.WeakKeyDictionary()
+        # Guards the semaphores, the stats and the in-flight counts, which every loop's calls update.
+        self._lock = threading.Lock()
+        # tool name -> {"calls", "waited", "wait_seconds", "peak_in_flight"}
+        self.stats = {}
+        self._in_flight = {}
+
+    def _thread_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_threads, thread_name_prefix="tool-dispatch")
+            return self._executor
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore:
+        # One semaphore per tool and event loop (a semaphore belongs to the loop it is used on).
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphores = self._semaphores.setdefault(loop, {})
+            if name not in semaphores:
+                semaphores[name] = asyncio.Semaphore(self.limits.get(name, self.default_limit))
+                self.stats.setdefault(name, {"calls": 0, "waited": 0, "wait_seconds": 0.0, "peak_in_flight": 0})
+            return semaphores[name]
+
+    def _enter(self, name: str, waited: float):
+        with self._lock:
+            stats = self.stats[name]
+            stats["calls"] += 1
+            if waited > 0.001:
+                stats["waited"] += 1
+                stats["wait_seconds"] += waited
+            self._in_flight[name] = self._in_flight.get(name, 0) + 1
+            stats["peak_in_flight"] = max(stats["peak_in_flight"], self._in_flight[name])
+
+    def _exit(self, name: str):
+        with self._lock:
+            self._in_flight[name] -= 1
+
+    def wrap(self, tool):
+        """Returns the function `tool` as an async function that runs under its cap (tool objects unchanged)."""
+        if isinstance(tool, BaseTool) or not callable(tool):
+            return tool
+
+        name = tool.__name__
+        is_async = inspect.iscoroutinefunction(tool)
+
+        @functools.wraps(tool)
+        async def dispatched(*args, **kwargs):
+            start = time.perf_counter()
+            async with self._semaphore(name):
+                self._enter(name, time.perf_counter() - start)
+                try:
+                    if is_async:
+                        return await tool(*args, **kwargs)
+                    # Copy the context so the tool sees the caller's contextvars (e.g. the tracing span).
+                    context = contextvars.copy_context()
+                    return await asyncio.get_running_loop().run_in_executor(
+                        self._thread_pool(), functools.partial(context.run, tool, *args, **kwargs))
+                finally:
+                    self._exit(name)
+
+        return dispatched
+
+    def tools(self, tools: list) -> list:
+        """`wrap` applied to every tool of an agent's tool list."""
+        return [self.wrap(tool) for tool in tools]
+
+
+# One dispatcher per process, so a tool's cap holds across every agent and session.
+default_dispatcher = ToolDispatcher()
@@ -0,0 +1,213 @@
+"""
+A topic gate that answers off-topic requests without calling the model.
+
+An agent that should only handle one domain (e.g. finance) usually checks
+the topic in its instruction, which means every off-topic prompt still
+costs a full model call. `TopicGate` decides before the agent runs:
+
+1. `PhraseMatcher` looks for lexicon terms (single words or phrases such as
+   "interest rate") with an Aho-Corasick automaton over the text's word
+   tokens, so every term is found in one pass and only whole words match
+   ("fed" matches "the Fed", not "fedora" or "confederate").
+2. If no term matched and a classifier is given (e.g. the tiny
+   `NaiveBayes` below), the text passes when the classifier's on-topic
+   probability reaches `threshold`.
+3. Otherwise the agent answers with a canned refusal and makes no model
+   call at all.
+
+    gate = TopicGate(PhraseMatcher(FINANCE_TERMS), refusal="I only cover finance and markets.")
+    agent = Agent(..., before_agent_callback=gate.before_agent_callback)
+
+Each decision is stored in `state["topic_gate"]`. Only the opening of a
+conversation is gated: once a message has been allowed, later turns go to
+the agent unchecked, since follow-ups ("Why do the models disagree?", "And
+what about Apple?") rarely repeat the topic's vocabulary. The agent itself
+decides whether a follow-up drifts off topic.
+"""
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+_WORD = re.compile(r"[a-z0-9]+(?:['’][a-z]+)?|[$€£¥%]")
+
+
+def tokenize(text: str) -> list:
+    """Lower-cased word tokens; currency signs and % are tokens of their own."""
+    return _WORD.findall(text.lower())
+
+
+def inflections(term: str) -> set:
+    """`term` plus the common English endings of its last word (plural, -ing, -ed, -er)."""
+    head, _, last = term.rpartition(" ")
+    prefix = f"{head} " if head else ""
+    forms = {last, last + "s", last + "es", last + "ing", last + "ed", last + "er", last + "ers"}
+    if last.endswith("e"):
+        forms |= {last[:-1] + "ing", last + "d", last + "r", last + "rs"}
+    if last.endswith("y") and len(last) > 2:
+        forms.add(last[:-1] + "ies")
+    return {prefix + form for form in forms}
+
+
+# --- 1. Matching ---
+
+class PhraseMatcher:
+    """
+    Aho-Corasick over word tokens.
+
+    States are nodes of a trie of the terms' token sequences; a failure link
+    points to the longest proper suffix that is also a trie prefix, so the
+    text is scanned once, token by token, whatever the number of terms.
+    """
+
+    def __init__(self, terms: Iterable[str], inflect: bool = True):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for term in terms:
+            for form in (inflections(term) if inflect else {term}):
+                self._add(tuple(tokenize(form)))
+        self._build_links()
+
+    def _add(self, tokens: tuple):
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            following = self._goto[state].get(token)
+            if following is None:
+                following = len(self._goto)
+                self._goto[state][token] = following
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = following
+        self._output[state] = (" ".join(tokens),)
+
+    def _build_links(self):
+        queue = list(self._goto[0].values())
+        for state in queue:  # Breadth first: a state's failure target is always finished before it.
+            for token, following in self._goto[state].items():
+                queue.append(following)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[following] = target if target != following else 0
+                self._output[following] = self._output[following] + self._output[self._fail[following]]
+
+    def find_all(self, text: str) -> list:
+        """Every term occurrence in `text`, in order of where it ends."""
+        goto, fail, output = self._goto, self._fail, self._output
+        state, found = 0, []
+        for token in tokenize(text):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if output[state]:
+                found.extend(output[state])
+        return found
+
+    def first(self, text: str) -> Optional[str]:
+        """The first term found in `text`, or None. Stops at the first match."""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for token in tokenize(text):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if output[state]:
+                return output[state][0]
+        return None
+
+
+class NaiveBayes:
+    """A tiny multinomial naive Bayes over word tokens: `probability(text)` of the positive class."""
+
+    def __init__(self, positive: Iterable[str], negative: Iterable[str], alpha: float = 1.0):
+        counts = [Counter(), Counter()]
+        docs = [0, 0]
+        for label, texts in ((1, positive), (0, negative)):
+            for text in texts:
+                counts[label].update(tokenize(text))
+                docs[label] += 1
+        vocabulary = len(set(counts[0]) | set(counts[1])) + 1
+        totals = [sum(c.values()) for c in counts]
+        self._prior = [math.log(docs[label] / sum(docs)) for label in (0, 1)]
+        self._unknown = [math.log(alpha / (totals[label] + alpha * vocabulary)) for label in (0, 1)]
+        self._log_p = [
+            {token: math.log((n + alpha) / (totals[label] + alpha * vocabulary)) for token, n in counts[label].items()}
+            for label in (0, 1)
+        ]
+
+    def probability(self, text: str) -> float:
+        scores = list(self._prior)
+        for token in tokenize(text):
+            for label in (0, 1):
+                scores[label] += self._log_p[label].get(token, self._unknown[label])
+        difference = max(-50.0, min(50.0, scores[0] - scores[1]))
+        return 1.0 / (1.0 + math.exp(difference))
+
+
+# --- 2. The gate ---
+
+@dataclass
+class GateDecision:
+    allowed: bool
+    reason: str
+    """The matched term, "classifier (p=0.83)" or "no match"."""
+
+
+class TopicGate:
+    """Lexicon first, then the optional classifier; see the module docstring."""
+
+    def __init__(
+        self,
+        matcher: PhraseMatcher,
+        classifier: Optional[Callable[[str], float]] = None,
+        threshold: float = 0.5,
+        refusal: str = "Sorry, I can only help with questions about this topic.",
+        state_key: Optional[str] = "topic_gate",
+        sticky: bool = True,
+    ):
+        self.matcher = matcher
+        self.classifier = classifier
+        self.threshold = threshold
+        self.refusal = refusal
+        self.state_key = state_key
+        self.sticky = sticky
+        """Once a message of the session is allowed, let the following turns through (needs `state_key`)."""
+        self.stats = Counter()
+        """allowed_lexicon, allowed_classifier, allowed_follow_up, refused."""
+
+    def check(self, text: str) -> GateDecision:
+        term = self.matcher.first(text)
+        if term is not None:
+            self.stats["allowed_lexicon"] += 1
+            return GateDecision(True, term)
+        if self.classifier is not None:
+            probability = self.classifier(text)
+            if probability >= self.threshold:
+                self.stats["allowed_classifier"] += 1
+                return GateDecision(True, f"classifier (p={probability:.2f})")
+        self.stats["refused"] += 1
+        return GateDecision(False, "no match")
+
+    def before_agent_callback(self, callback_context: CallbackContext) -> Optional[types.Content]:
+        content = callback_context.user_content
+        text = " ".join(part.text for part in (content.parts if content else None) or [] if part.text)
+        if not text:
+            return None
+        if self.sticky and self.state_key and (callback_context.state.get(self.state_key) or {}).get("allowed"):
+            self.stats["allowed_follow_up"] += 1
+            return None  # The conversation is on topic: follow-ups go to the agent.
+        decision = self.check(text)
+        if self.state_key:
+            callback_context.state[self.state_key] = {"allowed": decision.allowed, "reason": decision.reason}
+        if decision.allowed:
+            return None  # Run the agent as usual.
+        return types.Content(role="model", parts=[types.Part(text=self.refusal)])
@@ -0,0 +1,132 @@
+"""
+Time to first token of the customer support agent when the product catalog answers over A2A.
+
+    python -m benchmarks.a2a_streaming --latency 2.0 --chunks 20 --repeat 3
+
+Serves the product catalog agent of `04-agents-to-agents-A2A/products_catalog_agent`
+with uvicorn on a free local port, with a `FakeLlm` that looks the product up
+with `get_product_info` and then writes its answer, each model call taking
+`--latency` seconds (the answer streams in `--chunks` pieces). The customer
+support agent (also a fake, it transfers to the catalog straight away) talks
+to it through a `RemoteA2aAgent`:
+
+- to_a2a:           the plain A2A app, the answer arrives in one piece when it is done;
+- to_streaming_a2a: the app of `product_catalog_server.py`, the answer arrives chunk by chunk.
+
+"first text" is when the first answer text from the catalog reaches the
+client, "session events" how many events the conversation stored.
+"""
+import argparse
+import asyncio
+import importlib
+import socket
+import statistics
+import threading
+import time
+
+import uvicorn
+from google.adk.a2a.utils.agent_to_a2a import to_a2a
+from google.adk.agents import RunConfig
+from google.adk.agents.remote_a2a_agent import AGENT_CARD_WELL_KNOWN_PATH, RemoteA2aAgent
+from google.adk.agents.run_config import StreamingMode
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_common.a2a_streaming import to_streaming_a2a
+from adk_common.fake_llm import FakeLlm
+from adk_common.loader import load_agent_module
+
+QUESTION = "Can you tell me about the iPhone 15 Pro? Is it in stock?"
+
+
+def catalog_reply(llm_request):
+    results = [p.function_response.response for c in llm_request.contents for p in c.parts or [] if p.function_response]
+    if not results:
+        return types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(
+            name="get_product_info", args={"product_name": "iPhone 15 Pro"}))])
+    info = str(results[-1].get("result", results[-1]))
+    return (f"Here is what our catalog says. {info}. Stock is low, so if you want one I would order soon. "
+            "It has the A17 Pro chip, a titanium frame and a 48MP main camera. Anything else I can check for you?")
+
+
+def support_reply(llm_request):
+    return types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(
+        name="transfer_to_agent", args={"agent_name": "product_catalog_agent"}))])
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def serve(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="localhost", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def ask(support, port: int) -> dict:
+    remote = RemoteA2aAgent(name="product_catalog_agent", description="Remote product catalog agent.",
+                            agent_card=f"http://localhost:{port}{AGENT_CARD_WELL_KNOWN_PATH}", use_legacy=False)
+    root = support.clone(update={"sub_agents": [remote]})
+    runner = InMemoryRunner(agent=root)
+    session = await runner.session_service.create_session(app_name=runner.app_name, user_id="bench")
+    message = types.Content(role="user", parts=[types.Part(text=QUESTION)])
+    start = time.perf_counter()
+    first_text, partials, answer = None, 0, ""
+    async for event in runner.run_async(user_id="bench", session_id=session.id, new_message=message,
+                                        run_config=RunConfig(streaming_mode=StreamingMode.SSE)):
+        if event.author != "product_catalog_agent" or not event.content:
+            continue
+        text = "".join(p.text or "" for p in event.content.parts or [] if not p.thought)
+        if not text:
+            continue
+        if first_text is None:
+            first_text = time.perf_counter() - start
+        if event.partial:
+            partials += 1
+        else:
+            answer = text
+    total = time.perf_counter() - start
+    session = await runner.session_service.get_session(app_name=runner.app_name, user_id="bench", session_id=session.id)
+    await remote.cleanup()
+    return {"first": first_text, "total": total, "partials": partials, "events": len(session.events), "answer": answer}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=2.0,
+                        help="seconds per catalog model call (the lookup, then the answer)")
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    module = load_agent_module("04-agents-to-agents-A2A/products_catalog_agent")
+    server_module = importlib.import_module(module.__package__ + ".product_catalog_agent_code.product_catalog_server")
+    catalog = server_module.root_agent
+    catalog.model = FakeLlm(responder=catalog_reply, latency=args.latency, chunks=args.chunks)
+    support = module.root_agent
+    support.model = FakeLlm(responder=support_reply)
+
+    print(f"catalog answer: {args.latency}s in {args.chunks} chunks; median of {args.repeat} question(s)")
+    print(f"{'server':<18}{'first text (s)':>15}{'total (s)':>11}{'partial events':>16}{'session events':>16}")
+    answers = {}
+    for name, build in (("to_a2a", to_a2a), ("to_streaming_a2a", to_streaming_a2a)):
+        port = free_port()
+        server = serve(build(catalog, port=port), port)
+        try:
+            runs = [asyncio.run(ask(support, port)) for _ in range(args.repeat)]
+        finally:
+            server.should_exit = True
+        answers[name] = runs[-1]["answer"]
+        print(f"{name:<18}{statistics.median(r['first'] for r in runs):>15.2f}"
+              f"{statistics.median(r['total'] for r in runs):>11.2f}"
+              f"{statistics.median(r['partials'] for r in runs):>16.0f}{statistics.median(r['events'] for r in runs):>16.0f}")
+    print(f"\nsame final answer: {len(set(answers.values())) == 1 and all(answers.values())}")
+
+
+if __name__ == "__main__":
+    main()
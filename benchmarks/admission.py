@@ -0,0 +1,210 @@
+"""
+Goodput and latency of the ADK API server under a burst, with and without admission control.
+
+    python -m benchmarks.admission --rate 12 --duration 10 --capacity 4 --latency 0.5
+
+Serves two agents of the repository (`currency_agent` and
+`currency_agent_with_reliability`)
+with the ADK API server (`get_fast_api_app`) on a free local port. Their
+models are `FakeLlm`s backed by one simulated model server that works on
+`--capacity` calls at full speed (`--latency` seconds each) and shares its
+throughput between them beyond that, like a saturated local Ollama or a
+model quota. The load generator posts `/run` requests at `--rate` per
+second (Poisson arrivals) for `--duration` seconds, split over both agents;
+`--batch-share` of them are batch requests (`X-Priority: batch`), the rest
+interactive with an `X-Request-Timeout` of `--timeout` seconds, after which
+the client gives up.
+
+- as-is:     every request starts its run at once;
+- admission: `AdmissionMiddleware` with `--concurrency` runs and `--max-queue`
+             waiting requests per agent; the rest get a 503.
+
+"good" counts the answers that arrived in time (batch requests have no
+deadline), "goodput" is good answers per second of the run.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import socket
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+
+import httpx
+import uvicorn
+from google.adk.cli.fast_api import get_fast_api_app
+from google.adk.cli.utils.base_agent_loader import BaseAgentLoader
+
+from adk_common.admission import AdmissionController, AdmissionMiddleware, AgentLimits
+from adk_common.fake_llm import FakeLlm
+from adk_common.loader import load_agent_module, swap_models
+from adk_common.telemetry import Metrics
+
+AGENTS = {
+    "currency_agent": "02-agents-with-custom-tools/currency_agent",
+    "currency_agent_with_reliability": "02-agents-with-custom-tools/currency_agent_with_reliability",
+}
+TICK = 0.01
+
+
+class ModelServer:
+    """Works on `capacity` calls at full speed; beyond that, every call in progress slows down."""
+
+    def __init__(self, capacity: int, latency: float):
+        self.capacity = capacity
+        self.latency = latency
+        self.in_flight = 0
+        self.peak = 0
+
+    async def serve(self):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        remaining = self.latency
+        try:
+            while remaining > 0:
+                await asyncio.sleep(TICK)
+                remaining -= TICK * min(1.0, self.capacity / self.in_flight)
+        finally:
+            self.in_flight -= 1
+
+
+class ServerBackedLlm(FakeLlm):
+    """A `FakeLlm` whose calls take their time on a shared `ModelServer`."""
+
+    server: object = None
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        await self.server.serve()
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+
+class Agents(BaseAgentLoader):
+    def __init__(self, agents: dict):
+        self.agents = agents
+
+    def load_agent(self, agent_name: str):
+        return self.agents[agent_name]
+
+    def list_agents(self):
+        return sorted(self.agents)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def serve(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="localhost", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def request(client, agent: str, priority: str, timeout: float, results: list):
+    headers = {"X-Priority": priority}
+    if priority == "interactive":
+        headers["X-Request-Timeout"] = str(timeout)
+    body = {"appName": agent, "userId": "load", "sessionId": uuid.uuid4().hex,
+            "newMessage": {"role": "user", "parts": [{"text": "How much is 100 USD in EUR?"}]}}
+    start = time.perf_counter()
+    try:
+        response = await client.post("/run", json=body, headers=headers,
+                                     timeout=timeout if priority == "interactive" else 120)
+        outcome = "ok" if response.status_code == 200 else str(response.status_code)
+    except httpx.TimeoutException:
+        outcome = "timeout"
+    except httpx.TransportError as e:
+        outcome = type(e).__name__
+    results.append({"priority": priority, "outcome": outcome, "seconds": time.perf_counter() - start})
+
+
+async def generate_load(port: int, args, controller=None) -> dict:
+    rng = random.Random(7)
+    results, tasks, depth = [], [], 0
+    async with httpx.AsyncClient(base_url=f"http://localhost:{port}",
+                                 limits=httpx.Limits(max_connections=None, max_keepalive_connections=None)) as client:
+        start = time.perf_counter()
+        next_at = start
+        while next_at - start < args.duration:
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            priority = "batch" if rng.random() < args.batch_share else "interactive"
+            tasks.append(asyncio.create_task(request(client, rng.choice(list(AGENTS)), priority, args.timeout, results)))
+            if controller:
+                depth = max(depth, sum(controller.depth(agent) for agent in AGENTS))
+            next_at += rng.expovariate(args.rate)
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    return {"results": results, "elapsed": elapsed, "max_depth": depth}
+
+
+def report(mode: str, run: dict, timeout: float):
+    for priority in ("interactive", "batch"):
+        rows = [r for r in run["results"] if r["priority"] == priority]
+        good = [r["seconds"] for r in rows if r["outcome"] == "ok" and (priority == "batch" or r["seconds"] <= timeout)]
+        rejected = sum(1 for r in rows if r["outcome"] == "503")
+        late = sum(1 for r in rows if r["outcome"] == "timeout")
+        p50 = statistics.median(good) if good else float("nan")
+        p95 = statistics.quantiles(good, n=20)[18] if len(good) >= 2 else float("nan")
+        print(f"{mode:<11}{priority:<13}{len(rows):>5}{len(good):>6}{rejected:>6}{late:>9}"
+              f"{p50:>9.2f}{p95:>9.2f}{len(good) / run['elapsed']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=12.0, help="requests per second, over both agents")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--capacity", type=int, default=4, help="model calls the model server runs at full speed")
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per model call at full speed")
+    parser.add_argument("--batch-share", type=float, default=0.3)
+    parser.add_argument("--timeout", type=float, default=3.0, help="deadline of interactive requests (seconds)")
+    parser.add_argument("--concurrency", type=int, default=2, help="runs at once per agent, with admission")
+    parser.add_argument("--max-queue", type=int, default=8, help="waiting requests per agent, with admission")
+    args = parser.parse_args()
+    logging.getLogger("google_adk").setLevel(logging.ERROR)  # A warning per client that gave up, storage notices
+
+    model_server = ModelServer(args.capacity, args.latency)
+    agents = {}
+    for name, path in AGENTS.items():
+        agents[name] = load_agent_module(path).root_agent
+        swap_models(agents[name], lambda agent: ServerBackedLlm(server=model_server))
+
+    print(f"{args.rate:g} requests/s for {args.duration:g}s ({args.batch_share:.0%} batch) against a model server "
+          f"running {args.capacity} calls of {args.latency}s at full speed (~{args.capacity / args.latency:g} calls/s)")
+    print(f"{'mode':<11}{'priority':<13}{'sent':>5}{'good':>6}{'503':>6}{'timeout':>9}"
+          f"{'p50 (s)':>9}{'p95 (s)':>9}{'goodput':>10}")
+    metrics = Metrics()
+    controller = AdmissionController(default=AgentLimits(concurrency=args.concurrency, max_queue=args.max_queue,
+                                                         interactive_timeout=args.timeout), metrics=metrics)
+    with tempfile.TemporaryDirectory() as agents_dir:
+        for mode in ("as-is", "admission"):
+            app = get_fast_api_app(agents_dir=agents_dir, agent_loader=Agents(agents), web=False,
+                                   auto_create_session=True, use_local_storage=False)
+            if mode == "admission":
+                app.add_middleware(AdmissionMiddleware, controller=controller)
+            port = free_port()
+            server = serve(app, port)
+            model_server.peak = 0
+            try:
+                run = asyncio.run(generate_load(port, args, controller if mode == "admission" else None))
+            finally:
+                server.should_exit = True
+            report(mode, run, args.timeout)
+            print(f"{'':<11}peak model calls in flight: {model_server.peak}"
+                  + (f", peak queue depth: {run['max_depth']}" if mode == "admission" else ""))
+
+    print("\nadmission metrics:")
+    for line in metrics.render().splitlines():
+        if line.startswith(("adk_admission_rejected_total", "adk_admission_admitted_total",
+                            "adk_admission_wait_seconds_count", "adk_admission_wait_seconds_sum")):
+            print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
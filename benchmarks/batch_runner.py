@@ -0,0 +1,94 @@
+"""
+Throughput of the batch runner vs. concurrency, and resuming an interrupted job.
+
+    PYTHONPATH=$PWD python -m benchmarks.batch_runner --items 200 --latency 0.2 --rpm 6000
+
+Runs the blog pipeline (`03-workflows-agents/sequential_agent`, three model
+calls per item) over `--items` prompts with `adk_common.batch.run_batch`,
+its models replaced by `FakeLlm`s that take `--latency` seconds per call and
+share a quota of `--rpm` requests per minute (`RateLimitedLlm`).
+
+1. Items per second at each concurrency level. One item at a time runs at
+   1 / (3 × latency); throughput grows with the concurrency until the
+   quota (rpm / 60 / 3 items per second) is reached. Below concurrency 8
+   a row runs max(20, 4 × concurrency) items to keep it short; the
+   "items" column says how many.
+2. Crash and resume: the job is cancelled halfway and started again with
+   the same output file; the second run only does the missing items.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from adk_common.batch import BatchItem, rate_limit, run_batch
+from adk_common.fake_llm import FakeLlm
+from adk_common.loader import load_agent_module
+from adk_common.rate_limit import ModelQuota, RateScheduler
+from benchmarks.harness import replace_models
+
+TOPICS = ["tidal energy", "urban beekeeping", "sourdough chemistry", "open-source licensing", "deep-sea mining"]
+
+
+def items(count: int):
+    return [BatchItem(id=f"post-{i}", prompt=f"A blog post about {TOPICS[i % len(TOPICS)]} (#{i})") for i in range(count)]
+
+
+def prepare(root, latency: float, rpm: float):
+    replace_models(root, lambda name, _: FakeLlm(model=name, latency=latency), bare=True)
+    rate_limit(root, ModelQuota(requests_per_minute=rpm), scheduler=RateScheduler())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per fake model call")
+    parser.add_argument("--rpm", type=float, default=6000, help="model quota, requests per minute")
+    args = parser.parse_args()
+
+    root = load_agent_module("03-workflows-agents/sequential_agent").root_agent
+    work = tempfile.mkdtemp(prefix="batch-bench-")
+    quota_items = args.rpm / 60 / 3
+
+    print(f"1. up to {args.items} items, 3 model calls each, {args.latency:.2f}s per call, "
+          f"quota {args.rpm:.0f} rpm (= {quota_items:.1f} items/s)")
+    print(f"   {'concurrency':>11}{'items':>7}{'items/s':>9}{'ideal':>8}{'seconds':>9}{'failed':>8}")
+    for concurrency in [1, 2, 4, 8, 16, 32, 64]:
+        prepare(root, args.latency, args.rpm)
+        count = min(args.items, max(20, concurrency * 4)) if concurrency < 8 else args.items
+        stats = asyncio.run(run_batch(root, items(count), os.path.join(work, f"c{concurrency}.jsonl"),
+                                      concurrency=concurrency, progress_every=0))
+        ideal = min(concurrency / (3 * args.latency), quota_items)
+        print(f"   {concurrency:>11}{count:>7}{stats.throughput:>9.2f}{ideal:>8.2f}{stats.seconds:>9.1f}{stats.failed:>8}")
+
+    print(f"\n2. crash and resume ({args.items} items, concurrency 16)")
+    prepare(root, args.latency, args.rpm)
+    first = asyncio.run(run_batch(root, items(args.items), os.path.join(work, "full.jsonl"), concurrency=16,
+                                  progress_every=0))
+    half = args.items / 2 / min(16 / (3 * args.latency), quota_items)
+
+    out = os.path.join(work, "resume.jsonl")
+    prepare(root, args.latency, args.rpm)
+    start = time.perf_counter()
+    try:
+        asyncio.run(asyncio.wait_for(run_batch(root, items(args.items), out, concurrency=16, progress_every=0),
+                                     timeout=half))
+    except asyncio.TimeoutError:
+        pass
+    with open(out) as f:
+        before = sum(1 for _ in f)
+    prepare(root, args.latency, args.rpm)
+    second = asyncio.run(run_batch(root, items(args.items), out, concurrency=16, progress_every=0))
+    with open(out) as f:
+        ids = [json.loads(line)["id"] for line in f]
+    print(f"   uninterrupted run:      {first.seconds:.1f}s")
+    print(f"   cancelled after {half:.1f}s:  {before} items written")
+    print(f"   resumed run:            {second.done} items in {second.seconds:.1f}s, {second.skipped} skipped "
+          f"(total {time.perf_counter() - start:.1f}s)")
+    print(f"   output: {len(ids)} lines, {len(set(ids))} distinct ids, complete: {len(set(ids)) == args.items}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Time to first token and total latency of the blog pipeline, streamed and not.
+
+    python -m benchmarks.blog_pipeline_streaming --latency 0.6 --chunks 8
+
+Runs `03-workflows-agents/sequential_agent` with `FakeLlm` models (each call
+takes `--latency` seconds, streamed in `--chunks` pieces) in two modes:
+
+- sequential:     no streaming; the client sees the EditorAgent's post only
+                  when the whole pipeline is done;
+- sequential+sse: SSE streaming through the pipeline's client helper
+                  (`sequential_agent/streaming.py`, `stream_agent_text`);
+                  the client sees the post as it is written.
+
+TTFT is measured on the EditorAgent's text, i.e. the text the client shows.
+The per-stage table (from the helper's `timings`) shows when each stage's
+first text arrived and when it was done, for the last streamed run.
+"""
+import argparse
+import asyncio
+import importlib
+import statistics
+import time
+
+from google.adk.agents import RunConfig
+from google.adk.agents.run_config import StreamingMode
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_common.fake_llm import FakeLlm
+from adk_common.loader import load_agent_module, swap_models
+
+REPLIES = {
+    "OutlineAgent": "# Why Green Tea Works\n- Hook: one cup a day\n- Antioxidants\n- Focus without jitters\n- Ritual",
+    "WriterAgent": "Green tea is more than a drink. " * 40,
+    "EditorAgent": "Green tea is more than a comforting drink; it is a daily habit worth keeping. " * 20,
+}
+
+
+async def run_once(root, stream_agent_text, latency: float, chunks: int, timings: dict):
+    """One pipeline run; streamed through `stream_agent_text` unless it is None."""
+    swap_models(root, lambda agent: FakeLlm(responder=lambda _, name=agent.name: REPLIES[name],
+                                            latency=latency, chunks=chunks))
+    runner = InMemoryRunner(agent=root)
+    session = await runner.session_service.create_session(app_name=runner.app_name, user_id="bench")
+    message = types.Content(role="user", parts=[types.Part(text="The benefits of green tea")])
+
+    start = time.perf_counter()
+    ttft = None
+    if stream_agent_text:
+        async for _ in stream_agent_text(runner, user_id="bench", session_id=session.id,
+                                         message=message.parts[0].text, author="EditorAgent", timings=timings):
+            if ttft is None:
+                ttft = time.perf_counter() - start
+    else:
+        async for event in runner.run_async(user_id="bench", session_id=session.id, new_message=message,
+                                            run_config=RunConfig(streaming_mode=StreamingMode.NONE)):
+            has_text = event.content and any(part.text for part in event.content.parts or [])
+            if ttft is None and event.author == "EditorAgent" and has_text:
+                ttft = time.perf_counter() - start
+    total = time.perf_counter() - start
+
+    session = await runner.session_service.get_session(app_name=runner.app_name, user_id="bench", session_id=session.id)
+    assert session.state.get("final_blog") == REPLIES["EditorAgent"], "pipeline did not produce the final blog"
+    return ttft, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.6, help="seconds per model call")
+    parser.add_argument("--chunks", type=int, default=8, help="streamed pieces per model call")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    module = load_agent_module("03-workflows-agents/sequential_agent")
+    streaming = importlib.import_module(f"{module.__package__}.streaming")
+
+    print(f"3 stages x {args.latency}s per model call, {args.chunks} chunks, median of {args.repeat} run(s)")
+    print(f"{'mode':<16}{'editor TTFT (s)':>16}{'total (s)':>12}")
+    timings = {}
+    for name, stream in (("sequential", None), ("sequential+sse", streaming.stream_agent_text)):
+        results = []
+        for _ in range(args.repeat):
+            timings.clear()
+            results.append(asyncio.run(run_once(module.root_agent.clone(), stream, args.latency, args.chunks,
+                                                timings)))
+        ttft = statistics.median(r[0] for r in results)
+        total = statistics.median(r[1] for r in results)
+        print(f"{name:<16}{ttft:>16.3f}{total:>12.3f}")
+
+    print(f"\nper stage, streamed (s since the run started)\n{'stage':<16}{'first text':>12}{'done':>8}")
+    for stage, timing in timings.items():
+        print(f"{stage:<16}{timing['first_text_s']:>12.3f}{timing['done_s']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Event-loop latency while CPU-heavy tools run, inline vs. in the CPU pool.
+
+    python -m benchmarks.cpu_offload --sessions 8 --seconds 5 --workers 4
+
+Runs `--sessions` concurrent agent sessions on one event loop, for
+`--seconds` seconds each. Each session's `FakeLlm` calls a tool that
+extracts the text of a ~`--page-kb` KB HTML page with BeautifulSoup (what
+`read_website` does), then streams its answer, over and over. Meanwhile a
+probe task asks to wake up every 5 ms and records how late it was: that
+delay is what every other session's streaming and I/O waits for too.
+
+- inline:    the tool is a plain function, so ADK runs it on the event loop;
+- offloaded: the same function wrapped in `cpu_bound`, running in a pool
+             of `--workers` processes.
+
+Also reports the round-trip cost of the pool for a tiny call, which is
+why a sub-millisecond tool (e.g. one scikit-learn prediction) is not worth
+offloading.
+"""
+import argparse
+import asyncio
+import time
+
+from bs4 import BeautifulSoup
+from google.adk.agents import Agent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_common.cpu_pool import CpuPool, cpu_bound
+from adk_common.fake_llm import FakeLlm
+from benchmarks.harness import percentile
+
+
+def make_page(kb: int) -> bytes:
+    row = ("<div class='row'><p>Markets moved <b>sharply</b> after the <a href='/x'>announcement</a>; "
+           "analysts expect further volatility.</p><script>track()</script></div>\n")
+    return ("<html><body><nav>menu</nav>" + row * (kb * 1024 // len(row)) + "<footer>f</footer></body></html>").encode()
+
+
+def parse_page(html: bytes) -> str:
+    """Extracts the readable text of an HTML page (the `read_website` parse)."""
+    soup = BeautifulSoup(html, "html.parser")
+    for script in soup(["script", "style", "nav", "footer"]):
+        script.decompose()
+    return soup.get_text(separator=" ", strip=True)[:10000]
+
+
+def ping() -> int:
+    return 1
+
+
+async def probe(stop: asyncio.Event, lags: list, interval: float = 0.005):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(tool, sessions: int, seconds: float) -> tuple:
+    def respond(llm_request):
+        last = llm_request.contents[-1]
+        if any(part.function_response for part in last.parts or []):
+            return "Here is what the page says, summarised for you in a few sentences."
+        return types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(
+            name="read_page", args={}))])
+
+    agent = Agent(name="reader", model=FakeLlm(responder=respond, latency=0.02, chunks=8),
+                  instruction="Read the page.", tools=[tool])
+    runner = InMemoryRunner(agent=agent)
+    stop, lags, turns = asyncio.Event(), [], 0
+
+    async def session(i: int):
+        nonlocal turns
+        s = await runner.session_service.create_session(app_name=runner.app_name, user_id=f"u{i}")
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            message = types.Content(role="user", parts=[types.Part(text="What does the page say?")])
+            async for _ in runner.run_async(user_id=f"u{i}", session_id=s.id, new_message=message):
+                pass
+            turns += 1
+
+    prober = asyncio.create_task(probe(stop, lags))
+    await asyncio.gather(*[session(i) for i in range(sessions)])
+    stop.set()
+    await prober
+    return lags, turns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--page-kb", type=int, default=300)
+    args = parser.parse_args()
+
+    page = make_page(args.page_kb)
+    pool = CpuPool(max_workers=args.workers)
+
+    def read_page() -> str:
+        """Reads the page."""
+        return parse_page(page)
+
+    offloaded_parse = cpu_bound(parse_page, pool=pool)
+
+    async def read_page_offloaded() -> str:
+        """Reads the page."""
+        return await offloaded_parse(page)
+    read_page_offloaded.__name__ = "read_page"
+
+    start = time.perf_counter()
+    parse_page(page)
+    print(f"one parse of a {len(page) // 1024} KB page: {(time.perf_counter() - start) * 1000:.0f} ms (inline)\n")
+
+    print(f"{'tool':<11}{'turns/s':>9}{'loop lag p50 (ms)':>19}{'p99':>8}{'max':>8}")
+    for name, tool in [("inline", read_page), ("offloaded", read_page_offloaded)]:
+        lags, turns = asyncio.run(run(tool, args.sessions, args.seconds))
+        print(f"{name:<11}{turns / args.seconds:>9.1f}{percentile(lags, 0.5) * 1000:>19.1f}"
+              f"{percentile(lags, 0.99) * 1000:>8.1f}{max(lags) * 1000:>8.1f}")
+
+    async def round_trips(n: int = 200) -> float:
+        offloaded_ping = cpu_bound(ping, pool=pool)
+        await offloaded_ping()
+        start = time.perf_counter()
+        for _ in range(n):
+            await offloaded_ping()
+        return (time.perf_counter() - start) / n
+
+    print(f"\npool round trip for a trivial call: {asyncio.run(round_trips()) * 1000:.2f} ms")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
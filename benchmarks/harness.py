@@ -0,0 +1,288 @@
+"""
+Load-test any example agent offline with a scripted fake model.
+
+    python -m benchmarks.harness 03-workflows-agents/sequential_agent --requests 200 --concurrency 16
+    python -m benchmarks.harness 02-agents-with-custom-tools/currency_agent --mode http \\
+        --script benchmarks/scripts/currency_agent.json --out results/currency.json
+    python -m benchmarks.harness 03-workflows-agents/loop_agent --compare results/loop-before.json
+
+Loads the agent folder's `root_agent`, replaces every model with a fake and
+runs `--requests` requests (one new session each) with at most
+`--concurrency` in flight:
+
+- `--mode inprocess`: the models become `FakeLlm`s;
+- `--mode http`: the models become real `Gemini` / `LiteLlm` clients pointed
+  at a local `StubModelServer`, so the HTTP and JSON layers are measured too.
+
+Wrappers such as `RateLimitedLlm` or `CachedLlm` are kept; only the model
+inside them is replaced (`--bare` replaces the whole model).
+
+The fake answers from a JSON script keyed by agent name (`"*"` for every
+other agent). Each entry is a list of replies, one per model turn of that
+agent within a request. A reply is either text, a function call, or several
+parallel calls:
+
+    {"currency_agent": [{"function_call": {"name": "get_exchange_rate", "args": {"base_currency": "USD", "target_currency": "EUR"}}},
+                        "100 USD is 92 EUR."],
+     "*": ["Fake answer."]}
+
+Reports throughput, p50/p95/p99 latency, model calls per request and tool
+time per request (measured around every tool call by a runner plugin), and
+writes them as JSON with the git commit, for comparison across commits.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+# The Gemini client needs a key even when it talks to the stub; LiteLLM should not fetch its price list.
+os.environ.setdefault("GOOGLE_API_KEY", "harness-stub")
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from google.adk.models.base_llm import BaseLlm  # noqa: E402
+from google.adk.models.google_llm import Gemini  # noqa: E402
+from google.adk.models.llm_request import LlmRequest  # noqa: E402
+from google.adk.plugins.base_plugin import BasePlugin  # noqa: E402
+from google.adk.runners import InMemoryRunner  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from adk_common.fake_llm import FakeLlm  # noqa: E402
+from adk_common.llm_wrapper import LazyLlm, WrappedLlm  # noqa: E402
+from adk_common.loader import REPO_ROOT, iter_agents, load_agent_module  # noqa: E402
+from adk_common.stub_server import StubModelServer  # noqa: E402
+
+_AGENT_NAME = re.compile(r'Your internal name is "([^"]+)"')
+
+
+# --- 1. Scripted answers ---
+
+def _to_content(reply) -> types.Content:
+    if isinstance(reply, str):
+        return types.Content(role="model", parts=[types.Part(text=reply)])
+    calls = reply.get("function_calls") or [reply["function_call"]]
+    return types.Content(role="model", parts=[
+        types.Part(function_call=types.FunctionCall(name=call["name"], args=call.get("args", {}))) for call in calls
+    ])
+
+
+def _agent_name(llm_request: LlmRequest) -> str:
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    if instruction is not None and not isinstance(instruction, str):
+        instruction = " ".join(p.text or "" for p in instruction.parts or [])
+    match = _AGENT_NAME.search(instruction or "")
+    return match.group(1) if match else "*"
+
+
+def scripted_responder(script: dict):
+    """
+    A `FakeLlm` / `StubModelServer` responder that replays `script`.
+
+    The agent is recognised from the identity line ADK puts in every system
+    instruction, and the reply index is the number of turns the model has
+    already taken in this request, so concurrent requests never interfere.
+    """
+    def respond(llm_request: LlmRequest):
+        name = _agent_name(llm_request)
+        replies = script.get(name) or script.get("*") or [f"Fake answer from {name}."]
+        if isinstance(replies, (str, dict)):
+            replies = [replies]
+        turn = sum(1 for content in llm_request.contents if content.role == "model")
+        return _to_content(replies[min(turn, len(replies) - 1)])
+
+    return respond
+
+
+# --- 2. Swapping the models ---
+
+def _model_name(model) -> str:
+    if isinstance(model, str):
+        return model
+    while isinstance(model, WrappedLlm):
+        model = model.llm
+    return model.model
+
+
+def replace_models(root, factory, bare: bool = False) -> int:
+    """Replaces the innermost model of every LLM agent under `root` with `factory(model_name, original)`."""
+    replaced = 0
+    for agent in iter_agents(root):
+        model = getattr(agent, "model", None)
+        if not model:
+            continue
+        if bare or not isinstance(model, WrappedLlm):
+            agent.model = factory(_model_name(model), model)
+        else:
+            while isinstance(model.llm, WrappedLlm):
+                model = model.llm
+            model.llm = factory(model.llm.model, model.llm)
+        replaced += 1
+    return replaced
+
+
+def http_client(url: str):
+    """A factory that points real clients at the stub server: `LiteLlm` stays `LiteLlm`, everything else becomes `Gemini`."""
+    def factory(name: str, original) -> BaseLlm:
+        if isinstance(original, LazyLlm):
+            original = original.llm
+        if type(original).__name__ == "LiteLlm":
+            from google.adk.models.lite_llm import LiteLlm
+            return LiteLlm(model=name, api_base=url)
+        return Gemini(model=name, base_url=url)
+
+    return factory
+
+
+# --- 3. Running the load ---
+
+class ToolTimer(BasePlugin):
+    """Runner plugin that adds up the wall time of every tool call, per invocation (= request)."""
+
+    def __init__(self):
+        super().__init__(name="harness_tool_timer")
+        self.started = {}
+        self.seconds = collections.defaultdict(float)
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        self.started[tool_context.function_call_id] = time.perf_counter()
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        start = self.started.pop(tool_context.function_call_id, None)
+        if start is not None:
+            self.seconds[tool_context.invocation_id] += time.perf_counter() - start
+
+
+async def run_load(root, prompts, requests: int, concurrency: int):
+    timer = ToolTimer()
+    runner = InMemoryRunner(agent=root, plugins=[timer])
+    slots = asyncio.Semaphore(concurrency)
+    latencies, tools, errors = [], [], []
+
+    async def one(i: int):
+        async with slots:
+            session = await runner.session_service.create_session(app_name=runner.app_name, user_id=f"user-{i}")
+            message = types.Content(role="user", parts=[types.Part(text=prompts[i % len(prompts)])])
+            start = time.perf_counter()
+            invocation = None
+            try:
+                async for event in runner.run_async(user_id=f"user-{i}", session_id=session.id, new_message=message):
+                    invocation = event.invocation_id
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                return
+            latencies.append(time.perf_counter() - start)
+            tools.append(timer.seconds.pop(invocation, 0.0))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    return time.perf_counter() - start, latencies, tools, errors
+
+
+def percentile(values, q: float) -> float:
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = q * (len(values) - 1)
+    low = int(index)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (index - low)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(result: dict, baseline: dict):
+    print(f"\ncompared with {baseline.get('commit')} ({baseline.get('mode')}, concurrency {baseline.get('concurrency')}):")
+    for key in ["throughput_rps", "latency_p50_ms", "latency_p95_ms", "latency_p99_ms",
+                "llm_calls_per_request", "tool_seconds_per_request"]:
+        old, new = baseline.get(key), result.get(key)
+        if old:
+            print(f"  {key:<26}{old:>12.3f} -> {new:>12.3f}  ({(new - old) / old:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("agent_dir", help="agent folder, e.g. 03-workflows-agents/loop_agent")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake model call")
+    parser.add_argument("--script", help="JSON file with the scripted replies")
+    parser.add_argument("--prompt", action="append", help="user message(s), used round-robin")
+    parser.add_argument("--bare", action="store_true", help="replace wrapper models too, not just the model inside")
+    parser.add_argument("--out", help="write the results JSON here")
+    parser.add_argument("--compare", help="a previous results JSON to compare with")
+    args = parser.parse_args()
+
+    script = {}
+    if args.script:
+        with open(args.script) as f:
+            script = json.load(f)
+    responder = scripted_responder(script)
+    prompts = args.prompt or ["Hello! Please help me with a quick request."]
+
+    module = load_agent_module(args.agent_dir)
+    root = module.root_agent
+    stub = None
+    fakes = []
+    if args.mode == "http":
+        stub = StubModelServer(responder=responder, latency=args.latency).start()
+        factory = http_client(stub.url)
+    else:
+        def factory(name, original):
+            fakes.append(FakeLlm(model=name, responder=responder, latency=args.latency))
+            return fakes[-1]
+    models = replace_models(root, factory, bare=args.bare)
+
+    try:
+        seconds, latencies, tools, errors = asyncio.run(run_load(root, prompts, args.requests, args.concurrency))
+    finally:
+        if stub:
+            stub.stop()
+
+    llm_calls = sum(stub.requests.values()) if stub else sum(f.calls for f in fakes)
+    done = len(latencies)
+    result = {
+        "agent": args.agent_dir,
+        "mode": args.mode,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "models_replaced": models,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "fake_latency_s": args.latency,
+        "completed": done,
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "seconds": round(seconds, 4),
+        "throughput_rps": round(done / seconds, 3) if seconds else 0.0,
+        "latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "latency_p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "latency_mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "llm_calls_per_request": round(llm_calls / args.requests, 3),
+        "tool_seconds_per_request": round(statistics.fmean(tools), 6) if tools else 0.0,
+    }
+
+    print(json.dumps(result, indent=2))
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
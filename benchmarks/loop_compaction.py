@@ -0,0 +1,95 @@
+"""
+Prompt tokens per iteration of the story loop with and without context compaction.
+
+    python -m benchmarks.loop_compaction --iterations 20 --budget 1000
+
+Runs `03-workflows-agents/loop_agent` for `--iterations` iterations with
+`FakeLlm` models whose critic never approves and whose refiner always writes
+a different draft, so the loop never exits early and the history keeps
+growing. "before" is the loop without the `ContextCompactor` callbacks,
+"after" the loop as configured in `agent.py` (with `--budget` tokens).
+Prompt tokens are the fake's estimate (~4 characters per token) of what each
+model call was sent, summed over the critic and refiner calls of an iteration.
+"""
+import argparse
+import asyncio
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_common.fake_llm import FakeLlm
+from adk_common.loader import iter_agents, load_agent_module, swap_models
+
+STORY = (
+    "Mara found the lighthouse key in her grandmother's sewing box. That night the lamp, dark for forty "
+    "years, flickered on by itself. Boats that had vanished decades ago began drifting into the harbor, "
+    "their crews unchanged, asking what year it was. Mara climbed the tower to switch it off, and found "
+    "her grandmother waiting at the top, young again, holding the other key."
+)
+CRITIQUE = (
+    "1. The opening is strong, but the middle rushes: give the returning crews one concrete detail. "
+    "2. Mara's motivation for climbing the tower is unclear. 3. The final image needs more weight."
+)
+
+
+def draft(iteration: int) -> str:
+    # Rotate the sentences so consecutive drafts are never similar enough to trigger ConvergenceCheck.
+    sentences = STORY.split(". ")
+    shift = iteration % len(sentences)
+    return f"Revision {iteration}: " + ". ".join(sentences[shift:] + sentences[:shift])
+
+
+async def run(root) -> list:
+    counter = {"refiner": 0}
+
+    def refiner(_):
+        counter["refiner"] += 1
+        return draft(counter["refiner"])
+
+    models = {
+        "InitialWriterAgent": FakeLlm(responder=lambda _: draft(0)),
+        "CriticAgent": FakeLlm(responder=lambda _: CRITIQUE),
+        "RefinerAgent": FakeLlm(responder=refiner),
+    }
+    swap_models(root, lambda agent: models[agent.name])
+    runner = InMemoryRunner(agent=root)
+    session = await runner.session_service.create_session(app_name=runner.app_name, user_id="bench")
+    message = types.Content(role="user", parts=[types.Part(text="A short story about a haunted lighthouse.")])
+    async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+        pass
+    session = await runner.session_service.get_session(app_name=runner.app_name, user_id="bench", session_id=session.id)
+    return session.state.get("loop_metrics", [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--budget", type=int, default=1_000, help="token budget of each model request")
+    args = parser.parse_args()
+
+    module = load_agent_module("03-workflows-agents/loop_agent")
+    module.context_compactor.token_budget = args.budget
+
+    def build(compacted: bool):
+        root = module.root_agent.clone()
+        loop = root.sub_agents[1]
+        loop.max_iterations = args.iterations
+        if not compacted:
+            for agent in iter_agents(root):
+                if hasattr(agent, "before_model_callback"):
+                    agent.before_model_callback = None
+        return root
+
+    before = asyncio.run(run(build(compacted=False)))
+    after = asyncio.run(run(build(compacted=True)))
+
+    print(f"{'iteration':>9}{'before':>10}{'after':>10}")
+    for b, a in zip(before, after):
+        print(f"{b['iteration']:>9}{b['prompt_tokens']:>10}{a['prompt_tokens']:>10}")
+    total_before = sum(m["prompt_tokens"] for m in before)
+    total_after = sum(m["prompt_tokens"] for m in after)
+    print(f"{'total':>9}{total_before:>10}{total_after:>10}  ({1 - total_after / total_before:.0%} fewer prompt tokens)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Model calls of the story refinement loop with and without the deterministic loop controller.
+
+    python -m benchmarks.loop_early_exit --max-iterations 4
+
+Replays a recorded set of critic/refiner outputs through both versions of
+`03-workflows-agents/loop_agent` with `FakeLlm` models:
+
+- baseline:   the original Critic -> Refiner loop, where the RefinerAgent
+              has to call `exit_loop` itself once the critique is "APPROVED";
+- controlled: the loop in `agent.py`, where ConvergenceCheck / ApprovalCheck
+              stop the loop without calling the RefinerAgent.
+"""
+import argparse
+import asyncio
+import importlib
+
+from google.adk.agents import LoopAgent, SequentialAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_common.fake_llm import FakeLlm
+from adk_common.loader import load_agent_module, swap_models
+
+DRAFT = (
+    "Mara found the lighthouse key in her grandmother's sewing box. That night the lamp, dark for "
+    "forty years, flickered on by itself. Boats that had vanished decades ago began drifting into the "
+    "harbor, their crews unchanged, asking what year it was. Mara climbed the tower to switch it off."
+)
+REWRITE = (
+    "The key was cold, heavier than it looked, wrapped in a note in her grandmother's hand: do not "
+    "light it. Mara lit it anyway. By midnight the harbor was crowded with boats lost in 1983, their "
+    "crews young and frightened, and one of them was calling her grandmother's name."
+)
+
+# Each run: what the critic says on each iteration and what the refiner writes back.
+RECORDED_RUNS = [
+    {"name": "approved_first", "critiques": ["APPROVED"], "rewrites": []},
+    {"name": "approved_punctuated", "critiques": ["**Approved.**"], "rewrites": []},
+    {"name": "approved_second", "critiques": ["Raise the stakes before the ending.", "APPROVED"], "rewrites": [REWRITE]},
+    {"name": "approved_third", "critiques": ["Add a twist.", "Sharpen the last line.", "APPROVED"],
+     "rewrites": [REWRITE, REWRITE.replace("calling her", "whispering her")]},
+    {"name": "converged", "critiques": ["Polish the ending.", "Polish the ending a little more.", "Still polishing."],
+     "rewrites": [DRAFT.replace("switch it off.", "switch it off again."), DRAFT.replace("switch it off.", "switch it off, again.")]},
+    {"name": "never_approved", "critiques": ["Rewrite it.", "Rewrite it again.", "And again.", "Once more."],
+     "rewrites": [REWRITE, DRAFT, REWRITE, DRAFT]},
+]
+
+EXIT_CALL = types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name="exit_loop", args={}))])
+
+
+def make_models(run, is_approved):
+    """One FakeLlm per agent, replaying `run`. The refiner calls `exit_loop` on approval, as the instruction asks."""
+    script = {"critic": 0, "refiner": 0, "last_critique": ""}
+
+    def writer(_):
+        return DRAFT
+
+    def critic(_):
+        critiques = run["critiques"]
+        script["last_critique"] = critiques[min(script["critic"], len(critiques) - 1)]
+        script["critic"] += 1
+        return script["last_critique"]
+
+    def refiner(_):
+        if is_approved(script["last_critique"]):
+            return EXIT_CALL
+        rewrites = run["rewrites"] or [DRAFT]
+        reply = rewrites[min(script["refiner"], len(rewrites) - 1)]
+        script["refiner"] += 1
+        return reply
+
+    return {
+        "InitialWriterAgent": FakeLlm(responder=writer),
+        "CriticAgent": FakeLlm(responder=critic),
+        "RefinerAgent": FakeLlm(responder=refiner),
+    }
+
+
+async def replay(root, models):
+    swap_models(root, lambda agent: models[agent.name])
+    runner = InMemoryRunner(agent=root)
+    session = await runner.session_service.create_session(app_name=runner.app_name, user_id="bench")
+    message = types.Content(role="user", parts=[types.Part(text="A story about a lighthouse.")])
+    async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+        pass
+    session = await runner.session_service.get_session(app_name=runner.app_name, user_id="bench", session_id=session.id)
+    return sum(m.calls for m in models.values()), session.state.get("loop_metrics", [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-iterations", type=int, default=4)
+    args = parser.parse_args()
+
+    module = load_agent_module("03-workflows-agents/loop_agent")
+    controller = importlib.import_module(module.__package__ + ".controller")
+
+    print(f"{'run':<22}{'baseline calls':>16}{'controlled calls':>18}  exit")
+    totals = [0, 0]
+    for run in RECORDED_RUNS:
+        # Baseline: fresh copies of the original Critic -> Refiner loop.
+        baseline = SequentialAgent(name="StoryPipeline", sub_agents=[
+            module.initial_writer_agent.clone(),
+            LoopAgent(name="StoryRefinementLoop", max_iterations=args.max_iterations,
+                      sub_agents=[module.critic_agent.clone(), module.refiner_agent.clone()]),
+        ])
+        baseline_calls, _ = asyncio.run(replay(baseline, make_models(run, controller.is_approved)))
+
+        controlled = module.root_agent.clone()
+        controlled.sub_agents[1].max_iterations = args.max_iterations
+        controlled_calls, metrics = asyncio.run(replay(controlled, make_models(run, controller.is_approved)))
+
+        exit_reason = metrics[-1].get("exit_reason", "") if metrics else ""
+        print(f"{run['name']:<22}{baseline_calls:>16}{controlled_calls:>18}  {exit_reason} after {len(metrics)} iteration(s)")
+        totals[0] += baseline_calls
+        totals[1] += controlled_calls
+
+    saved = 1 - totals[1] / totals[0]
+    print(f"{'total':<22}{totals[0]:>16}{totals[1]:>18}  ({saved:.0%} fewer model calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Cold vs. warm latency and throughput vs. concurrency for the Ollama agent's model settings.
+
+    python -m benchmarks.ollama_tuning --load-time 2 --latency 0.2 --parallel 4
+
+Runs the real `LiteLlm` client against a `StubModelServer` that simulates an
+Ollama server (`OllamaRuntime`): loading the model takes `--load-time`
+seconds, the server unloads it after `--server-keep-alive` seconds idle
+(Ollama's 5-minute default, shrunk), it runs `--parallel` requests at once
+and queues at most `--max-queue` more (503 beyond that). Like Ollama, it
+reloads the model for a request with another `num_ctx`, so a warm-up with
+the wrong context size shows up as a second load.
+
+1. Cold vs. warm: two questions separated by an idle gap longer than the
+   server's keep-alive. "default" is a plain `LiteLlm`; "tuned" is
+   `ollama_llm(...)` with `keep_alive="30m"` and a warm-up at startup.
+2. Throughput vs. concurrency: `--requests` questions at each concurrency
+   level with the model already loaded, sent straight to the server
+   ("default") or through `OllamaLlm`'s client-side slot queue ("queued",
+   `num_parallel=--parallel`).
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import litellm  # noqa: E402
+from google.adk.models.lite_llm import LiteLlm  # noqa: E402
+from google.adk.models.llm_request import LlmRequest  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from adk_common.ollama import OllamaSettings, SlotQueue, ollama_llm  # noqa: E402
+from adk_common.stub_server import OllamaRuntime, StubModelServer  # noqa: E402
+from benchmarks.harness import percentile  # noqa: E402
+
+MODEL = "ollama_chat/llama3.1:8b"
+
+
+def question(i: int) -> LlmRequest:
+    return LlmRequest(model=MODEL, contents=[types.Content(role="user", parts=[types.Part(text=f"Question {i}?")])])
+
+
+async def ask(model, i: int) -> float:
+    start = time.perf_counter()
+    async for _ in model.generate_content_async(question(i)):
+        pass
+    return time.perf_counter() - start
+
+
+async def cold_vs_warm(url: str, tuned: bool, idle: float):
+    if tuned:
+        model = ollama_llm(MODEL, api_base=url, settings=OllamaSettings(keep_alive="30m"))
+        startup = await model.warm_up()
+    else:
+        model, startup = LiteLlm(model=MODEL, api_base=url), 0.0
+    first = await ask(model, 0)
+    await asyncio.sleep(idle)
+    after_idle = await ask(model, 1)
+    return startup, first, after_idle
+
+
+async def load(model, requests: int, concurrency: int):
+    gate = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(i):
+        nonlocal errors
+        async with gate:
+            try:
+                latencies.append(await ask(model, i))
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    return time.perf_counter() - start, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--load-time", type=float, default=2.0, help="seconds to load the model")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per answer")
+    parser.add_argument("--parallel", type=int, default=4, help="server slots (OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--max-queue", type=int, default=4, help="server queue (OLLAMA_MAX_QUEUE)")
+    parser.add_argument("--server-keep-alive", type=float, default=1.0, help="server default keep-alive, seconds")
+    parser.add_argument("--idle", type=float, default=1.5, help="idle gap between the two questions, seconds")
+    parser.add_argument("--requests", type=int, default=64)
+    args = parser.parse_args()
+    litellm.suppress_debug_info = True  # The 503s are counted, not printed
+
+    print("1. cold vs. warm (seconds)")
+    print(f"   {'client':<10}{'startup':>9}{'1st question':>14}{'after idle':>12}")
+    for name, tuned in [("default", False), ("tuned", True)]:
+        runtime = OllamaRuntime(load_time=args.load_time, parallel=args.parallel, keep_alive=args.server_keep_alive)
+        with StubModelServer(responder=lambda _: "An answer.", latency=args.latency, ollama=runtime) as stub:
+            startup, first, after_idle = asyncio.run(cold_vs_warm(stub.url, tuned, args.idle))
+        print(f"   {name:<10}{startup:>9.2f}{first:>14.2f}{after_idle:>12.2f}   ({runtime.loads} model loads)")
+
+    print(f"\n2. throughput vs. concurrency ({args.requests} questions, {args.parallel} server slots, "
+          f"queue of {args.max_queue}, {args.latency:.2f}s per answer)")
+    print(f"   {'concurrency':>11}  {'client':<9}{'req/s':>7}{'p50 (s)':>9}{'p95':>7}{'errors':>8}")
+    for concurrency in [1, 2, 4, 8, 16, 32]:
+        for name in ["default", "queued"]:
+            runtime = OllamaRuntime(parallel=args.parallel, max_queue=args.max_queue, keep_alive=-1)
+            with StubModelServer(responder=lambda _: "An answer.", latency=args.latency, ollama=runtime) as stub:
+                if name == "default":
+                    model = LiteLlm(model=MODEL, api_base=stub.url)
+                else:
+                    model = ollama_llm(MODEL, api_base=stub.url, settings=OllamaSettings(num_parallel=args.parallel))
+                    model.slots = SlotQueue()
+                seconds, latencies, errors = asyncio.run(load(model, args.requests, concurrency))
+            print(f"   {concurrency:>11}  {name:<9}{len(latencies) / seconds:>7.1f}{percentile(latencies, 0.5):>9.2f}"
+                  f"{percentile(latencies, 0.95):>7.2f}{errors:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Update cost of the house price model: incremental vs. a full refit, by history size.
+
+    python -m benchmarks.online_price_model --history 10000 100000 1000000 --batch 1000
+
+For each `--history` size, times how long adding one `--batch` of listings
+takes when the model
+
+- refits:      `LinearRegression().fit` on the whole history plus the batch
+               (what the agent did before, at any scale);
+- incremental: `OnlineLinearModel.partial_fit` of the batch alone.
+
+Then streams the largest history through the model in batches and compares
+the coefficients and predictions with a full refit on the same rows, and
+times `ListingFeed` reading a JSONL and a CSV file of `--feed-rows` listings.
+"""
+import argparse
+import csv
+import importlib
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+
+from adk_common.loader import load_agent_module
+
+
+def make_listings(n: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    sqft = rng.uniform(500, 4000, n)
+    bedrooms = np.clip(np.round(sqft / 800 + rng.integers(-1, 2, n)), 1, 6)
+    location = rng.integers(1, 11, n).astype(float)
+    price = 150 * sqft + 20_000 * bedrooms + 45_000 * location - 100_000 + rng.normal(0, 30_000, n)
+    return np.column_stack([sqft, bedrooms, location]), price
+
+
+def timed(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--batch", type=int, default=1_000)
+    parser.add_argument("--feed-rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    module = load_agent_module("04-agents-to-agents-A2A/house_price_predictor_agent")
+    training = importlib.import_module(module.__package__ + ".online_training")
+    X_batch, y_batch = make_listings(args.batch, seed=1)
+
+    print(f"adding a batch of {args.batch} listings, median of {args.repeat}")
+    print(f"{'history rows':>12}{'refit (ms)':>12}{'incremental (ms)':>18}")
+    for rows in args.history:
+        X, y = make_listings(rows)
+        X_all, y_all = np.vstack([X, X_batch]), np.concatenate([y, y_batch])
+        refit = timed(lambda: LinearRegression().fit(X_all, y_all), args.repeat)
+        model = training.OnlineLinearModel(n_features=3)
+        model.partial_fit(X, y)
+        incremental = timed(lambda: model.partial_fit(X_batch, y_batch), args.repeat)
+        print(f"{rows:>12,}{refit * 1000:>12.2f}{incremental * 1000:>18.3f}")
+
+    # Same rows, streamed in batches vs. fitted at once.
+    X, y = make_listings(max(args.history))
+    model = training.OnlineLinearModel(n_features=3)
+    for start in range(0, len(y), args.batch):
+        model.partial_fit(X[start:start + args.batch], y[start:start + args.batch])
+    reference = LinearRegression().fit(X, y)
+    coefficients = model.coefficients
+    coef_error = np.max(np.abs(coefficients.coef - reference.coef_) / np.abs(reference.coef_))
+    X_test, _ = make_listings(10_000, seed=2)
+    price_error = np.max(np.abs(model.predict(X_test) - reference.predict(X_test)))
+    print(f"\n{len(y):,} rows in batches of {args.batch} vs. one refit: max relative coefficient difference "
+          f"{coef_error:.1e}, max prediction difference ${price_error:.2e}")
+
+    X, y = make_listings(args.feed_rows, seed=3)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"jsonl": os.path.join(tmp, "listings.jsonl"), "csv": os.path.join(tmp, "listings.csv")}
+        with open(paths["jsonl"], "w") as f:
+            for row, price in zip(X, y):
+                f.write(json.dumps({"sqft": row[0], "bedrooms": row[1], "location_score": row[2], "price": price}) + "\n")
+        with open(paths["csv"], "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["sqft", "bedrooms", "location_score", "price"])
+            writer.writerows(np.column_stack([X, y]).tolist())
+        for kind, path in paths.items():
+            feed = training.ListingFeed(path)
+            model = training.OnlineLinearModel(n_features=3)
+            start = time.perf_counter()
+            for X_chunk, y_chunk in feed.chunks():
+                model.partial_fit(X_chunk, y_chunk)
+            seconds = time.perf_counter() - start
+            print(f"{kind:<6} feed: {feed.rows:,} rows in {seconds:.2f}s ({feed.rows / seconds:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
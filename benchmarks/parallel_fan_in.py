@@ -0,0 +1,107 @@
+"""
+Time to first summary and total latency of the research system when one branch is slow.
+
+    python -m benchmarks.parallel_fan_in --branch-latency 0.5 1.0 4.0 --aggregator-latency 0.5 --deadline 2.0 --settle 0
+
+Runs `03-workflows-agents/parallel_agent` with `FakeLlm` models. The three
+researchers take `--branch-latency` seconds each (one slow `google_search`
+branch), the AggregatorAgent `--aggregator-latency` seconds per call:
+
+- sequential:  the plain SequentialAgent, the aggregator starts after the slowest branch;
+- incremental: `IncrementalFanInAgent` (the `root_agent`), a provisional
+               summary as soon as one branch is done (and no other has landed
+               for `--settle` seconds), refined as the others land;
+- deadline:    the same with `deadline_seconds=--deadline`, so the slow branch
+               is cancelled and the summary finalized without it.
+
+"first summary" is when the first executive summary (provisional or not)
+reaches the client, "total" when the run (and so the final summary) is done.
+"""
+import argparse
+import asyncio
+import importlib
+import statistics
+import time
+
+from google.adk.agents import SequentialAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_common.fake_llm import FakeLlm
+from adk_common.loader import load_agent_module, swap_models
+
+REPORT_KEYS = {"TechResearcher": "tech", "HealthResearcher": "health", "FinanceResearcher": "finance"}
+
+
+def factory(branch_latency: dict, aggregator_latency: float, calls: dict):
+    def summarise(llm_request):
+        calls["aggregator"] += 1
+        instruction = str(llm_request.config.system_instruction or "")
+        covered = [topic for name, topic in REPORT_KEYS.items() if f"{name} report" in instruction]
+        return f"Executive summary of the {', '.join(covered) or 'no'} research."
+
+    def make(agent):
+        if agent.name in branch_latency:
+            # A Gemini model name, so the researchers' `google_search` tool accepts the fake.
+            return FakeLlm(model="gemini-2.5-flash-lite", responder=lambda _, name=agent.name: f"{name} report.",
+                           latency=branch_latency[agent.name])
+        return FakeLlm(model="gemini-2.5-flash-lite", responder=summarise, latency=aggregator_latency)
+    return make
+
+
+async def run_once(root) -> tuple:
+    runner = InMemoryRunner(agent=root)
+    session = await runner.session_service.create_session(app_name=runner.app_name, user_id="bench")
+    message = types.Content(role="user", parts=[types.Part(text="Generate the executive summary.")])
+    start = time.perf_counter()
+    summaries = []
+    async for event in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+        if event.author == "AggregatorAgent" and event.content and not event.partial:
+            summaries.append((time.perf_counter() - start, "".join(p.text or "" for p in event.content.parts)))
+    total = time.perf_counter() - start
+    return summaries, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--branch-latency", type=float, nargs=3, default=[0.5, 1.0, 4.0],
+                        help="seconds per model call of the tech, health and finance researchers")
+    parser.add_argument("--aggregator-latency", type=float, default=0.5)
+    parser.add_argument("--deadline", type=float, default=2.0)
+    parser.add_argument("--settle", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    module = load_agent_module("03-workflows-agents/parallel_agent")
+    aggregation = importlib.import_module(module.__package__ + ".aggregation")
+    fan_out, aggregator = module.root_agent.sub_agents
+
+    def incremental(**options):
+        return lambda: aggregation.IncrementalFanInAgent(
+            name="ResearchSystem", sub_agents=[fan_out.clone(), aggregator.clone()],
+            settle_seconds=args.settle, **options)
+
+    modes = [
+        ("sequential", lambda: SequentialAgent(name="ResearchSystem", sub_agents=[fan_out.clone(), aggregator.clone()])),
+        ("incremental", incremental()),
+        ("deadline", incremental(deadline_seconds=args.deadline)),
+    ]
+    branch_latency = dict(zip(REPORT_KEYS, args.branch_latency))
+    print("branches: " + ", ".join(f"{name} {seconds}s" for name, seconds in branch_latency.items())
+          + f"; aggregator {args.aggregator_latency}s per call; median of {args.repeat} run(s)")
+    print(f"{'mode':<13}{'first summary (s)':>18}{'total (s)':>11}{'aggregator calls':>18}  final summary")
+    for name, build in modes:
+        firsts, totals = [], []
+        for _ in range(args.repeat):
+            root = build()
+            calls = {"aggregator": 0}
+            swap_models(root, factory(branch_latency, args.aggregator_latency, calls))
+            summaries, total = asyncio.run(run_once(root))
+            firsts.append(summaries[0][0])
+            totals.append(total)
+        print(f"{name:<13}{statistics.median(firsts):>18.2f}{statistics.median(totals):>11.2f}"
+              f"{calls['aggregator']:>18}  {summaries[-1][1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Fan-out against a quota-enforcing fake endpoint, with and without the shared rate scheduler.
+
+    python -m benchmarks.parallel_fanout_quota --branches 30 --rpm 20 --window 2
+
+All branches call one `FakeLlm` that allows `--rpm` requests per `--window`
+seconds and answers anything above that with HTTP 429. The unthrottled run
+uses a plain `ParallelAgent`; the throttled run routes the same calls through
+`RateLimitedLlm`, with at most `--max-in-flight` calls at once.
+"""
+import argparse
+import asyncio
+import dataclasses
+import time
+
+from google.adk.agents import Agent, ParallelAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_common.fake_llm import FakeLlm
+from adk_common.rate_limit import ModelQuota, RateLimitedLlm, RateScheduler
+
+
+async def run_fanout(branches: int, quota: ModelQuota, latency: float, throttled: bool, max_in_flight):
+    endpoint = FakeLlm(model="fake-gemini", latency=latency, quota=quota)
+    scheduler = RateScheduler({endpoint.model: dataclasses.replace(quota, max_in_flight=max_in_flight)})
+
+    def branch_model():
+        return RateLimitedLlm(llm=endpoint, scheduler=scheduler) if throttled else endpoint
+
+    researchers = [
+        Agent(name=f"Researcher{i}", model=branch_model(), instruction=f"Research topic {i}.", output_key=f"research_{i}")
+        for i in range(branches)
+    ]
+    team = ParallelAgent(name="ResearchTeam", sub_agents=researchers)
+
+    runner = InMemoryRunner(agent=team)
+    session = await runner.session_service.create_session(app_name=runner.app_name, user_id="bench")
+    message = types.Content(role="user", parts=[types.Part(text="Go.")])
+
+    started = time.perf_counter()
+    error = None
+    try:
+        async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+            pass
+    except Exception as e:  # The unthrottled fan-out is expected to hit 429s
+        error = e
+    elapsed = time.perf_counter() - started
+
+    session = await runner.session_service.get_session(app_name=runner.app_name, user_id="bench", session_id=session.id)
+    completed = sum(1 for i in range(branches) if f"research_{i}" in session.state)
+    return {
+        "mode": "throttled" if throttled else "unthrottled",
+        "completed": completed,
+        "rejected_429": endpoint.rejected,
+        "peak_in_flight": endpoint.peak_in_flight,
+        "seconds": elapsed,
+        "error": type(error).__name__ if error else "",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--branches", type=int, default=30)
+    parser.add_argument("--rpm", type=float, default=20, help="Requests allowed per window")
+    parser.add_argument("--window", type=float, default=2.0, help="Quota window in seconds (60 for a real per-minute quota)")
+    parser.add_argument("--latency", type=float, default=0.1, help="Fake model latency in seconds")
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    args = parser.parse_args()
+
+    quota = ModelQuota(requests_per_minute=args.rpm, window_seconds=args.window)
+    ideal = args.branches / args.rpm * args.window
+    print(f"{args.branches} branches, quota {args.rpm:g} requests / {args.window:g}s "
+          f"(lower bound ~{ideal:.1f}s to finish every branch)\n")
+    print(f"{'mode':<12}{'completed':>10}{'429s':>7}{'peak':>6}{'seconds':>9}  error")
+    for throttled in (False, True):
+        r = asyncio.run(run_fanout(args.branches, quota, args.latency, throttled, args.max_in_flight))
+        print(f"{r['mode']:<12}{r['completed']:>10}{r['rejected_429']:>7}{r['peak_in_flight']:>6}{r['seconds']:>9.2f}  {r['error']}")
+
+
+if __name__ == "__main__":
+    main()
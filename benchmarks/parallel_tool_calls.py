@@ -0,0 +1,99 @@
+"""
+Per-turn tool latency of the currency agent when the model emits parallel function calls.
+
+    python -m benchmarks.parallel_tool_calls --tool-latency 0.2 --sessions 1 8 32 --rate-limit 4
+
+Runs `02-agents-with-custom-tools/currency_agent` with a `FakeLlm` that
+asks for `get_fee_for_payment_method` and `get_exchange_rate` in one
+response, then answers. Both tools are given `--tool-latency` seconds of
+blocking I/O (`time.sleep`, like the `requests.get` a live rate API would
+need), and `--sessions` conversations run at once.
+
+- as-is:      the plain sync tools, which ADK runs on the event loop, so
+              every call in the process runs one after another;
+- dispatched: the same tools through `ToolDispatcher` (threads, with
+              `get_exchange_rate` capped at `--rate-limit` calls at once).
+
+The tool phase of a turn is the time from the model's function-call event
+to the merged function-response event. Also checks that the responses come
+back in the order of the calls.
+"""
+import argparse
+import asyncio
+import functools
+import time
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_common.fake_llm import FakeLlm
+from adk_common.loader import load_agent_module
+from adk_common.tool_dispatch import ToolDispatcher
+from benchmarks.harness import percentile, scripted_responder
+
+SCRIPT = {"currency_agent": [
+    {"function_calls": [
+        {"name": "get_fee_for_payment_method", "args": {"method": "platinum credit card"}},
+        {"name": "get_exchange_rate", "args": {"base_currency": "USD", "target_currency": "EUR"}},
+    ]},
+    "You will receive 455.70 EUR after the 2% platinum credit card fee.",
+]}
+
+
+def slow(tool, seconds: float):
+    @functools.wraps(tool)
+    def call(*args, **kwargs):
+        time.sleep(seconds)  # A blocking HTTP call
+        return tool(*args, **kwargs)
+    return call
+
+
+async def run(agent, sessions: int):
+    runner = InMemoryRunner(agent=agent)
+    phases, in_order = [], 0
+
+    async def one(i: int):
+        nonlocal in_order
+        session = await runner.session_service.create_session(app_name=runner.app_name, user_id=f"u{i}")
+        message = types.Content(role="user", parts=[types.Part(text="Convert 500 USD to EUR with my platinum card.")])
+        called = None
+        async for event in runner.run_async(user_id=f"u{i}", session_id=session.id, new_message=message):
+            if event.get_function_calls():
+                called, names = time.perf_counter(), [call.name for call in event.get_function_calls()]
+            elif event.get_function_responses() and called:
+                phases.append(time.perf_counter() - called)
+                in_order += [response.name for response in event.get_function_responses()] == names
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(sessions)])
+    return phases, in_order, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tool-latency", type=float, default=0.2)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--rate-limit", type=int, default=4, help="max concurrent get_exchange_rate calls")
+    args = parser.parse_args()
+
+    module = load_agent_module("02-agents-with-custom-tools/currency_agent")
+    tools = [slow(module.get_fee_for_payment_method, args.tool_latency), slow(module.get_exchange_rate, args.tool_latency)]
+
+    print(f"two calls per turn, {args.tool_latency:.2f}s each")
+    print(f"{'sessions':>8}  {'tools':<11}{'tool phase p50 (s)':>19}{'p95':>7}{'total (s)':>11}{'in order':>10}"
+          f"{'peak rate calls':>17}")
+    for sessions in args.sessions:
+        for name in ["as-is", "dispatched"]:
+            dispatcher = ToolDispatcher(limits={"get_exchange_rate": args.rate_limit}, max_threads=64)
+            agent = module.root_agent.clone(update={
+                "model": FakeLlm(responder=scripted_responder(SCRIPT)),
+                "tools": tools if name == "as-is" else dispatcher.tools(tools),
+            })
+            phases, in_order, total = asyncio.run(run(agent, sessions))
+            peak = dispatcher.stats.get("get_exchange_rate", {}).get("peak_in_flight", "-")
+            print(f"{sessions:>8}  {name:<11}{percentile(phases, 0.5):>19.2f}{percentile(phases, 0.95):>7.2f}"
+                  f"{total:>11.2f}{f'{in_order}/{sessions}':>10}{peak:>17}")
+
+
+if __name__ == "__main__":
+    main()
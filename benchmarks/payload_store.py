@@ -0,0 +1,153 @@
+"""
+Session size and serialization cost of a multi-page research run, with and without the payload store.
+
+    python -m benchmarks.payload_store --sessions 5 --pages 10 --page-kb 10
+
+Runs `01-agent-prompt-to-action/helpful_agent_ollama` (the investigative
+journalist, with its `ToolOutputBudget`) on a `FakeLlm` that searches once
+and then reads `--pages` pages, one `read_website` call per turn, before
+answering. The tools are offline stand-ins with the same names and result
+shapes: `search_web` returns sources plus raw results, `read_website` a
+~`--page-kb` KB page. Session i reads pages i..i+pages-1, so consecutive
+sessions share most of their pages (the same sources come up again).
+
+- inline:   the runner as it was; pages are stored in the session events;
+- payloads: with `PayloadPlugin`, pages are written to a `PayloadStore` and
+            the events keep handles.
+
+Per session (median): JSON size and `model_dump_json` time, then the time
+to append every event to a SQLite `EventLogSessionService` and to load the
+session back, with the memory the loaded session takes. (A deep copy, as
+`InMemorySessionService.get_session` makes, shares its strings with the
+original, so it costs the same in both modes.) Also checks that the model
+got exactly the same requests in both modes.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from adk_common.fake_llm import FakeLlm
+from adk_common.loader import load_agent_module
+from adk_common.payload_store import PayloadPlugin, PayloadStore
+from adk_common.session_store import EventLogSessionService
+
+WORDS = ("solid-state battery electrolyte lithium anode cathode ceramic polymer dendrite cycle density "
+         "charge prototype pilot line yield cost supplier vehicle range safety research university").split()
+
+
+def page_text(page: int, kb: int) -> str:
+    rng = random.Random(page)
+    text = f"Page {page}: " + " ".join(rng.choice(WORDS) for _ in range(kb * 1024 // 7))
+    return text[:kb * 1024]
+
+
+def fake_tools(page_kb: int):
+    def search_web(query: str) -> dict:
+        """Searches the web and returns a list of relevant URLs."""
+        results = [{"title": f"Source {k}", "href": f"https://example.com/page-{k}", "body": page_text(k, 1)[:600]}
+                   for k in range(1, 9)]
+        return {"status": "success", "sources": "\n".join(f"Source {r['title']} - {r['href']}" for r in results),
+                "raw_results": results}
+
+    async def read_website(url: str) -> dict:
+        """Visits a specific URL and scrapes its textual content."""
+        return {"status": "success", "content": page_text(int(url.rsplit("-", 1)[1]), page_kb)}
+
+    return [search_web, read_website]
+
+
+def researcher(first_page: int, pages: int, requests: list):
+    def respond(llm_request):
+        requests.append([c.model_dump_json() for c in llm_request.contents])
+        reads = sum(1 for c in llm_request.contents for p in c.parts or []
+                    if p.function_call and p.function_call.name == "read_website")
+        if not any(p.function_call for c in llm_request.contents for p in c.parts or []):
+            call = types.FunctionCall(name="search_web", args={"query": "solid-state battery breakthroughs"})
+        elif reads < pages:
+            call = types.FunctionCall(name="read_website",
+                                      args={"url": f"https://example.com/page-{first_page + reads}"})
+        else:
+            return "A report on solid-state batteries, synthesized from the pages read."
+        return types.Content(role="model", parts=[types.Part(function_call=call)])
+    return respond
+
+
+async def run_session(agent, plugins, index: int, pages: int, requests: list):
+    agent = agent.clone(update={"model": FakeLlm(responder=researcher(index + 1, pages, requests))})
+    runner = Runner(app_name="research", agent=agent, session_service=InMemorySessionService(), plugins=plugins)
+    session = await runner.session_service.create_session(app_name="research", user_id="bench")
+    message = types.Content(role="user", parts=[types.Part(text="What are the latest solid-state battery results?")])
+    async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+        pass
+    return await runner.session_service.get_session(app_name="research", user_id="bench", session_id=session.id)
+
+
+def measure(session, db_path: str) -> dict:
+    start = time.perf_counter()
+    dumped = session.model_dump_json()
+    dump_seconds = time.perf_counter() - start
+
+    store = EventLogSessionService(db_path)
+    stored = asyncio.run(store.create_session(app_name="research", user_id="bench", session_id=session.id))
+    start = time.perf_counter()
+    for event in session.events:
+        asyncio.run(store.append_event(stored, event))
+    append_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    asyncio.run(store.get_session(app_name="research", user_id="bench", session_id=session.id))
+    load_seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    loaded = asyncio.run(store.get_session(app_name="research", user_id="bench", session_id=session.id))
+    loaded_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del loaded
+    return {"json_kb": len(dumped) / 1024, "dump_ms": dump_seconds * 1000, "append_ms": append_seconds * 1000,
+            "load_ms": load_seconds * 1000, "loaded_kb": loaded_bytes / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=10, help="pages read per session")
+    parser.add_argument("--page-kb", type=int, default=10)
+    args = parser.parse_args()
+
+    module = load_agent_module("01-agent-prompt-to-action/helpful_agent_ollama")
+    agent = module.root_agent.clone(update={"tools": fake_tools(args.page_kb)})
+
+    print(f"{args.sessions} sessions x (1 search + {args.pages} pages of {args.page_kb} KB); median per session")
+    print(f"{'mode':<10}{'JSON (KB)':>10}{'dump (ms)':>11}{'SQLite append (ms)':>20}{'load (ms)':>11}"
+          f"{'loaded (KB)':>13}")
+    requests = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PayloadStore(os.path.join(tmp, "payloads"))
+        plugin = PayloadPlugin(store)
+        for mode, plugins in (("inline", []), ("payloads", [plugin])):
+            requests[mode] = []
+            rows = []
+            for i in range(args.sessions):
+                session = asyncio.run(run_session(agent, plugins, i, args.pages, requests[mode]))
+                rows.append(measure(session, os.path.join(tmp, f"{mode}-{i}.db")))
+            median = {key: statistics.median(row[key] for row in rows) for key in rows[0]}
+            print(f"{mode:<10}{median['json_kb']:>10.1f}{median['dump_ms']:>11.2f}{median['append_ms']:>20.1f}"
+                  f"{median['load_ms']:>11.2f}{median['loaded_kb']:>13.1f}")
+
+        files = sum(len(names) for _, _, names in os.walk(store.root))
+        print(f"\npayload store: {plugin.stats['offloaded']} payloads ({plugin.stats['offloaded_chars'] / 1024:.0f} KB) "
+              f"offloaded, {files} files ({store.stats['bytes_written'] / 1024:.0f} KB) written, "
+              f"{store.stats['deduplicated']} deduplicated; {plugin.stats['expanded']} handles expanded for the model")
+    print(f"same model requests in both modes: {requests['inline'] == requests['payloads']}")
+
+
+if __name__ == "__main__":
+    main()
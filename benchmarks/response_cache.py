@@ -0,0 +1,106 @@
+"""
+Model calls and latency of the parallel research system with and without the response cache.
+
+    python -m benchmarks.response_cache --latency 0.3
+
+Replays a day of requests (exact repeats and re-worded duplicates) through
+`03-workflows-agents/parallel_agent` with `FakeLlm` models in three modes:
+no cache, exact layer only, and exact + similarity layer. Every model is
+wrapped, but the researchers use `google_search`, a built-in tool, so their
+requests bypass the cache ("bypassed"); only the aggregator's can hit. Then
+checks that a function-tool turn only hits when the tool result is the same.
+"""
+import argparse
+import asyncio
+import time
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_common.fake_llm import FakeLlm
+from adk_common.loader import load_agent_module, swap_models
+from adk_common.response_cache import CachedLlm, ResponseCache, hashed_ngram_embedder
+
+REQUESTS = [
+    "Run today's research briefing",
+    "Run today's research briefing",
+    "run today's research briefing!",
+    "Run today's research briefing.",
+    "What's new in tech, health and finance?",
+    "What's new in tech, health and finance",
+    "Run today's research briefing",
+    "what's new in tech health and finance?",
+]
+
+
+async def replay(root, models):
+    runner = InMemoryRunner(agent=root)
+    start = time.perf_counter()
+    for text in REQUESTS:
+        session = await runner.session_service.create_session(app_name=runner.app_name, user_id="bench")
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+            pass
+    return time.perf_counter() - start, sum(m.calls for m in models)
+
+
+def tool_turn(result: str) -> LlmRequest:
+    call = types.FunctionCall(name="get_exchange_rate", args={"base": "USD", "target": "EUR"})
+    return LlmRequest(
+        model="fake-llm",
+        contents=[
+            types.Content(role="user", parts=[types.Part(text="How many euros is 100 USD?")]),
+            types.Content(role="model", parts=[types.Part(function_call=call)]),
+            types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+                name="get_exchange_rate", response={"rate": result}))]),
+        ],
+    )
+
+
+async def check_tool_turns():
+    fake = FakeLlm(responder=lambda request: "100 USD is about 92 EUR.")
+    model = CachedLlm(llm=fake, cache=ResponseCache(embedder=hashed_ngram_embedder))
+    for rate in ["0.92", "0.92", "0.95"]:
+        async for _ in model.generate_content_async(tool_turn(rate)):
+            pass
+    return fake.calls, model.cache.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per model call")
+    args = parser.parse_args()
+
+    module = load_agent_module("03-workflows-agents/parallel_agent")
+    modes = [
+        ("no cache", None),
+        ("exact", lambda: ResponseCache()),
+        ("exact+semantic", lambda: ResponseCache(embedder=hashed_ngram_embedder)),
+    ]
+
+    print(f"{len(REQUESTS)} requests, {args.latency}s per model call")
+    print(f"{'mode':<16}{'model calls':>12}{'seconds':>10}{'hit rate':>10}  stats")
+    for name, make_cache in modes:
+        root = module.root_agent.clone()
+        cache = make_cache() if make_cache else None
+        models = []
+
+        def factory(agent):
+            # A Gemini model name, so the researchers' `google_search` tool accepts the fake.
+            fake = FakeLlm(model="gemini-2.5-flash-lite", responder=lambda _, name=agent.name: f"{name} report.",
+                           latency=args.latency)
+            models.append(fake)
+            return CachedLlm(llm=fake, cache=cache) if cache is not None else fake
+
+        swap_models(root, factory)
+        seconds, calls = asyncio.run(replay(root, models))
+        hit_rate = f"{cache.hit_rate:.0%}" if cache is not None else "-"
+        print(f"{name:<16}{calls:>12}{seconds:>10.2f}{hit_rate:>10}  {cache.stats if cache is not None else ''}")
+
+    calls, stats = asyncio.run(check_tool_turns())
+    print(f"\ntool turn with results 0.92, 0.92, 0.95 -> {calls} model calls, {stats}")
+
+
+if __name__ == "__main__":
+    main()
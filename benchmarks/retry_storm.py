@@ -0,0 +1,107 @@
+"""
+Tail latency of model calls through a 429 storm, per retry policy.
+
+    python -m benchmarks.retry_storm --rps 20 --seconds 10 --storm-start 2 --storm 4 --rate 0.9
+
+Sends `--rps` calls per second for `--seconds` seconds (open loop: calls
+start on schedule whether or not earlier ones finished) to a local
+`StubModelServer` that answers `--rate` of the requests with `429` and
+`Retry-After: 1` between `--storm-start` and `--storm-start + --storm`.
+Each policy gets a fresh server and the same schedule:
+
+- legacy:  `Gemini(retry_options=HttpRetryOptions(attempts=5, exp_base=7, initial_delay=1))`,
+           what the agents used before (waits ~1 s, ~7 s, ~49 s, ...);
+- jitter:  `RetryingLlm` with decorrelated jitter and Retry-After, but no
+           budget and no circuit breaker;
+- budget:  the same plus the process-wide retry budget;
+- full:    `RetryingLlm` as the agents use it (jitter, Retry-After, retry
+           budget, circuit breaker).
+
+A last row, "full*", runs the `full` policy against a storm whose 429s
+carry a malformed `Retry-After: soon`: the calls must still be retried
+(on the policy's own backoff), not fail on the header.
+
+The breaker's `reset_timeout` is shortened to 2 s to fit the run. Reports
+the share of calls that succeeded, latency percentiles over all
+calls (a failure counts at the time it was reported) and the number of
+requests the server saw per call (retry amplification).
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "retry-storm-stub")
+
+from google.adk.models.google_llm import Gemini  # noqa: E402
+from google.adk.models.llm_request import LlmRequest  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from adk_common.retry import RetryBudget, RetryCoordinator, RetryingLlm  # noqa: E402
+from adk_common.stub_server import StubModelServer, storm  # noqa: E402
+from benchmarks.harness import percentile  # noqa: E402
+
+MODEL = "gemini-2.5-flash-lite"
+
+
+def policies(url: str) -> dict:
+    legacy = types.HttpRetryOptions(attempts=5, exp_base=7, initial_delay=1, http_status_codes=[429, 500, 503, 504])
+    unbounded = RetryCoordinator(budget=RetryBudget(ratio=1e9), failure_threshold=10**9)
+    return {
+        "legacy": lambda: Gemini(model=MODEL, base_url=url, retry_options=legacy),
+        "jitter": lambda: RetryingLlm(llm=Gemini(model=MODEL, base_url=url), coordinator=unbounded),
+        "budget": lambda: RetryingLlm(llm=Gemini(model=MODEL, base_url=url),
+                                      coordinator=RetryCoordinator(failure_threshold=10**9)),
+        "full": lambda: RetryingLlm(llm=Gemini(model=MODEL, base_url=url), coordinator=RetryCoordinator(reset_timeout=2.0)),
+    }
+
+
+async def run(model, rps: float, seconds: float):
+    request = LlmRequest(model=MODEL, contents=[types.Content(role="user", parts=[types.Part(text="Hello!")])])
+    results = []
+
+    async def one():
+        start = time.perf_counter()
+        try:
+            async for _ in model.generate_content_async(request):
+                pass
+            results.append((True, time.perf_counter() - start))
+        except Exception:
+            results.append((False, time.perf_counter() - start))
+
+    tasks = []
+    for _ in range(int(rps * seconds)):
+        tasks.append(asyncio.create_task(one()))
+        await asyncio.sleep(1 / rps)
+    await asyncio.gather(*tasks)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=20)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--storm-start", type=float, default=2)
+    parser.add_argument("--storm", type=float, default=4, help="storm duration in seconds")
+    parser.add_argument("--rate", type=float, default=0.9, help="share of requests answered with 429 during the storm")
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # The clients log every retry
+
+    print(f"{'policy':<8}{'calls':>7}{'ok':>8}{'p50 (s)':>9}{'p95':>8}{'p99':>8}{'max':>8}{'req/call':>10}")
+    for name, retry_after in [("legacy", 1), ("jitter", 1), ("budget", 1), ("full", 1), ("full*", "soon")]:
+        faults = storm(duration=args.storm, rate=args.rate, retry_after=retry_after, start=args.storm_start, seed=7)
+        with StubModelServer(responder=lambda _: "OK", latency=args.latency, faults=faults) as stub:
+            model = policies(stub.url)[name.rstrip("*")]()
+            results = asyncio.run(run(model, args.rps, args.seconds))
+            sent = stub.requests["gemini"]
+        latencies = [seconds for _, seconds in results]
+        ok = sum(1 for success, _ in results if success)
+        print(f"{name:<8}{len(results):>7}{ok / len(results):>8.1%}{percentile(latencies, 0.5):>9.2f}"
+              f"{percentile(latencies, 0.95):>8.2f}{percentile(latencies, 0.99):>8.2f}{max(latencies):>8.2f}"
+              f"{sent / len(results):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
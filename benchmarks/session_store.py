@@ -0,0 +1,149 @@
+"""
+Append and load latency of `EventLogSessionService` (SQLite) vs ADK's `InMemorySessionService`.
+
+    python -m benchmarks.session_store --sizes 1000 100000 --history 20
+
+For each size the store is filled with that many sessions, then a random
+sample of sessions gets `--history` events appended one by one (append
+latency) and is loaded back with `get_session` (load latency, full history
+and last 5 events). Finally `--workers` processes append to the same SQLite
+sessions at once to check that they share them safely.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+from adk_common.session_store import EventLogSessionService
+
+APP = "bench"
+
+
+def make_event(i: int) -> Event:
+    return Event(
+        author="WriterAgent",
+        invocation_id=f"inv-{i}",
+        content=types.Content(role="model", parts=[types.Part(text=f"Draft paragraph {i}. " * 20)]),
+        actions=EventActions(state_delta={"blog_draft": f"draft {i}", "iteration": i}),
+    )
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summary(latencies):
+    ms = [v * 1000 for v in latencies]
+    return f"p50 {statistics.median(ms):7.3f} ms  p95 {percentile(ms, 0.95):7.3f} ms"
+
+
+async def fill(service, size: int):
+    start = time.perf_counter()
+    batch = 500
+    for first in range(0, size, batch):
+        await asyncio.gather(*[
+            service.create_session(app_name=APP, user_id=f"user-{i % 1000}", session_id=f"s-{i}", state={"topic": i})
+            for i in range(first, min(size, first + batch))
+        ])
+    return time.perf_counter() - start
+
+
+async def measure(service, size: int, sample: int, history: int):
+    rng = random.Random(size)
+    ids = [rng.randrange(size) for _ in range(sample)]
+    appends, loads, recent_loads = [], [], []
+    for i in ids:
+        session = await service.get_session(app_name=APP, user_id=f"user-{i % 1000}", session_id=f"s-{i}")
+        for n in range(history):
+            start = time.perf_counter()
+            await service.append_event(session, make_event(n))
+            appends.append(time.perf_counter() - start)
+    for i in ids:
+        start = time.perf_counter()
+        session = await service.get_session(app_name=APP, user_id=f"user-{i % 1000}", session_id=f"s-{i}")
+        loads.append(time.perf_counter() - start)
+        assert session.state["iteration"] == history - 1
+        start = time.perf_counter()
+        await service.get_session(app_name=APP, user_id=f"user-{i % 1000}", session_id=f"s-{i}",
+                                  config=GetSessionConfig(num_recent_events=5))
+        recent_loads.append(time.perf_counter() - start)
+    return appends, loads, recent_loads
+
+
+def worker(db_path: str, worker_id: int, sessions: int, appends: int, results):
+    async def run():
+        service = EventLogSessionService(db_path)
+        conflicts = 0
+        for n in range(appends):
+            session_id = f"s-{n % sessions}"
+            while True:
+                session = await service.get_session(app_name=APP, user_id="shared", session_id=session_id,
+                                                    config=GetSessionConfig(num_recent_events=0))
+                try:
+                    await service.append_event(session, make_event(n))
+                    break
+                except ValueError:
+                    conflicts += 1  # Another worker got there first: reload and retry.
+        results.put((worker_id, conflicts))
+
+    asyncio.run(run())
+
+
+def multi_process_check(db_path: str, workers: int, sessions: int = 4, appends: int = 100):
+    service = EventLogSessionService(db_path)
+    for i in range(sessions):
+        asyncio.run(service.create_session(app_name=APP, user_id="shared", session_id=f"s-{i}"))
+    results = multiprocessing.Queue()
+    start = time.perf_counter()
+    processes = [multiprocessing.Process(target=worker, args=(db_path, w, sessions, appends, results))
+                 for w in range(workers)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    seconds = time.perf_counter() - start
+    conflicts = sum(results.get()[1] for _ in processes)
+    stored = sum(
+        len(asyncio.run(service.get_session(app_name=APP, user_id="shared", session_id=f"s-{i}")).events)
+        for i in range(sessions)
+    )
+    print(f"\n{workers} processes x {appends} appends on {sessions} shared sessions: {stored} events stored "
+          f"(expected {workers * appends}), {conflicts} stale reloads, {seconds:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--sample", type=int, default=50, help="sessions that get events and are loaded back")
+    parser.add_argument("--history", type=int, default=20, help="events appended per sampled session")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            print(f"\n{size:,} sessions, {args.sample} sampled x {args.history} events")
+            services = [
+                ("in-memory", InMemorySessionService()),
+                ("sqlite", EventLogSessionService(os.path.join(tmp, f"sessions-{size}.db"))),
+            ]
+            for name, service in services:
+                fill_seconds = asyncio.run(fill(service, size))
+                appends, loads, recent = asyncio.run(measure(service, size, args.sample, args.history))
+                print(f"  {name:<10} fill {fill_seconds:6.2f}s | append {summary(appends)} | "
+                      f"load {summary(loads)} | load last 5 {summary(recent)}")
+
+        multi_process_check(os.path.join(tmp, "shared.db"), args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Memory of the sentiment ensemble's CPU pool workers: a copy of the weights per worker vs. one shared copy.
+
+    python -m benchmarks.shared_weights --workers 1 4 8 --scale 0.1
+    python -m benchmarks.shared_weights --models real   # the hugging_agent models (needs transformers)
+
+Starts a `CpuPool` of each `--workers` size and sends it `--calls-per-worker`
+sentiment calls per worker, then reads every process's memory from
+`/proc/<pid>/smaps_rollup` (Linux):
+
+- per-worker: the warm-up loads the ensemble in each worker as it starts
+              (`cpu_bound(warm_up=load_ensemble)`, as before);
+- pre-fork:   the pool process loads it once, freezes it, and forks the
+              workers (`cpu_bound(warm_up=load_ensemble, preload=True)`,
+              with `CpuPool.start()` before the event loop runs).
+
+"unique" is a worker's USS, the memory only it uses (what killing it
+would free); RSS counts shared pages too. "total" is the PSS of the pool
+process and its workers, the memory they take together. "ready" is the
+time until the first round of calls has been answered, loading included
+(the pre-fork pools after the first fork from the copy already loaded).
+
+`--models fake` (the default, no torch needed) stands in for FinBERT,
+RoBERTa and DistilBERT with read-only float32 weights of their parameter
+counts times `--scale`, and a 30k-entry vocabulary each; a call tokenizes
+the text and multiplies it through all the weights. `--models real` loads
+the three pipelines of `04-agents-to-agents-A2A/hugging_agent`.
+"""
+import argparse
+import asyncio
+import functools
+import gc
+import multiprocessing
+import time
+
+import numpy as np
+
+from adk_common.cpu_pool import CpuPool
+from adk_common.loader import load_agent_module
+
+HEADLINE = "Company X reports record revenue of $5B, but misses EPS targets by 10% amid supply chain fears."
+# Parameter counts of bert-base (FinBERT), roberta-base and distilbert-base.
+MODELS = {"finbert": 110_000_000, "roberta": 125_000_000, "distilbert": 67_000_000}
+HIDDEN = 768
+SCALE = 0.1
+
+
+class FakeEnsemble:
+    """Three read-only weight matrices and vocabularies of the real models' sizes (times `SCALE`)."""
+
+    def __init__(self):
+        rng = np.random.default_rng(0)
+        self.weights, self.vocab = {}, {}
+        for name, params in MODELS.items():
+            weights = rng.standard_normal((int(params * SCALE) // HIDDEN, HIDDEN), dtype=np.float32)
+            weights.setflags(write=False)
+            self.weights[name] = weights
+            self.vocab[name] = {f"{name}-token-{i}": i for i in range(30_522)}
+
+    def analyze(self, text: str) -> dict:
+        results = {}
+        for name, weights in self.weights.items():
+            ids = [self.vocab[name].get(f"{name}-token-{len(word)}", 0) for word in text.split()]
+            x = np.full(HIDDEN, sum(ids) / max(1, len(ids)) / 30_522, dtype=np.float32)
+            results[name] = float(np.tanh(weights @ x).mean())
+        return results
+
+
+@functools.lru_cache(maxsize=1)
+def load_fake_ensemble() -> FakeEnsemble:
+    return FakeEnsemble()
+
+
+def fake_sentiment(headline: str) -> str:
+    return str(load_fake_ensemble().analyze(headline))
+
+
+def memory_kb(pid) -> dict:
+    """{"rss", "pss", "uss"} of a process in KB, from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {"rss": fields["Rss"], "pss": fields["Pss"], "uss": fields["Private_Clean"] + fields["Private_Dirty"]}
+
+
+async def call_pool(pool: CpuPool, tool, workers: int, calls_per_worker: int):
+    await asyncio.gather(*(pool.run(tool, HEADLINE) for _ in range(workers)))
+    ready = time.perf_counter()
+    await asyncio.gather(*(pool.run(tool, HEADLINE) for _ in range(workers * calls_per_worker)))
+    return ready
+
+
+def run_pool(load, tool, workers: int, preload: bool, calls_per_worker: int) -> dict:
+    pool = CpuPool(max_workers=workers)
+    pool.add_warm_up(load, preload=preload)
+    try:
+        start = time.perf_counter()
+        if preload:
+            pool.start()  # As a server does at startup, before its threads.
+        ready = asyncio.run(call_pool(pool, tool, workers, calls_per_worker)) - start
+        children = [memory_kb(process.pid) for process in multiprocessing.active_children()]
+        parent = memory_kb("self")
+    finally:
+        pool.shutdown()
+    return {"ready": ready, "workers": children, "parent": parent}
+
+
+def main():
+    global SCALE
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--calls-per-worker", type=int, default=4)
+    parser.add_argument("--models", choices=("fake", "real"), default="fake")
+    parser.add_argument("--scale", type=float, default=SCALE, help="fake weights, as a share of the real models' size")
+    args = parser.parse_args()
+    SCALE = args.scale
+
+    if args.models == "real":
+        module = load_agent_module("04-agents-to-agents-A2A/hugging_agent")
+        load, tool = module.load_ensemble, module.analyze_market_sentiment.cpu_bound_function
+        print("the hugging_agent ensemble (FinBERT, RoBERTa, DistilBERT)")
+    else:
+        load, tool = load_fake_ensemble, fake_sentiment
+        weights_mb = sum(MODELS.values()) * SCALE * 4 / 2**20
+        print(f"fake ensemble: {weights_mb:.0f} MB of weights ({SCALE:g} x the real models) + 3 x 30k-token vocabularies")
+
+    print(f"{'mode':<12}{'workers':>8}{'unique/worker (MB)':>20}{'RSS/worker (MB)':>17}{'total (MB)':>12}{'ready (s)':>11}")
+    # Per-worker first: once the pool process has preloaded the ensemble, every fork inherits it.
+    for mode, preload in (("per-worker", False), ("pre-fork", True)):
+        for workers in args.workers:
+            result = run_pool(load, tool, workers, preload, args.calls_per_worker)
+            children = result["workers"]
+            unique = sum(c["uss"] for c in children) / len(children) / 1024
+            rss = sum(c["rss"] for c in children) / len(children) / 1024
+            total = (result["parent"]["pss"] + sum(c["pss"] for c in children)) / 1024
+            print(f"{mode:<12}{workers:>8}{unique:>20.1f}{rss:>17.1f}{total:>12.0f}{result['ready']:>11.2f}")
+    print(f"\nobjects frozen out of the collector in the pool process: {gc.get_freeze_count():,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Overhead of `TelemetryPlugin`, and what its spans and metrics look like.
+
+    python -m benchmarks.telemetry_overhead --requests 300
+
+Runs the currency agent (two tool calls and three model calls per request)
+and the blog pipeline (three sub-agents) with zero-latency `FakeLlm` models,
+so the plugin's own cost is not hidden behind model latency:
+
+- off:      no plugin;
+- no-op:    the plugin with no tracer provider configured (metrics only);
+- exported: the plugin with an SDK tracer provider and a batch span processor,
+            as `configure_otlp` sets it up (spans go to an in-memory exporter).
+
+The three modes take turns for `--rounds` rounds and the fastest round of
+each is kept, which filters out most of the scheduling noise. Prints the time
+per request and the overhead per request, then the span tree of one blog pipeline request and a few Prometheus lines.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from adk_common.fake_llm import FakeLlm
+from adk_common.loader import load_agent_module
+from adk_common.telemetry import Metrics, TelemetryPlugin
+from benchmarks.harness import replace_models, scripted_responder
+
+AGENTS = {
+    "02-agents-with-custom-tools/currency_agent": "benchmarks/scripts/currency_agent.json",
+    "03-workflows-agents/sequential_agent": None,
+}
+
+
+async def run(root, plugins, requests: int) -> float:
+    runner = InMemoryRunner(agent=root, plugins=plugins)
+    message = types.Content(role="user", parts=[types.Part(text="Convert 500 USD to EUR with my platinum card.")])
+    start = time.perf_counter()
+    for _ in range(requests):
+        session = await runner.session_service.create_session(app_name=runner.app_name, user_id="bench")
+        async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+            pass
+    return (time.perf_counter() - start) / requests
+
+
+def print_tree(spans):
+    children = {}
+    for span in spans:
+        parent = span.parent.span_id if span.parent else None
+        children.setdefault(parent, []).append(span)
+
+    def walk(parent, depth):
+        for span in sorted(children.get(parent, []), key=lambda s: s.start_time):
+            attributes = {k: v for k, v in span.attributes.items() if k.startswith(("gen_ai.usage", "adk.request", "adk.cache", "adk.tool.result"))}
+            ms = (span.end_time - span.start_time) / 1e6
+            print(f"  {'  ' * depth}{span.name:<40}{ms:8.2f} ms  {json.dumps(attributes) if attributes else ''}")
+            walk(span.context.span_id, depth + 1)
+
+    walk(None, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="requests per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    metrics = Metrics()
+
+    print(f"{'agent':<44}{'off (ms)':>10}{'no-op':>10}{'exported':>10}   overhead/request")
+    for agent_dir, script_path in AGENTS.items():
+        script = {}
+        if script_path:
+            with open(script_path) as f:
+                script = json.load(f)
+        root = load_agent_module(agent_dir).root_agent
+        replace_models(root, lambda name, _: FakeLlm(model=name, responder=scripted_responder(script)), bare=True)
+
+        modes = {
+            "off": lambda: [],
+            "no-op": lambda: [TelemetryPlugin(metrics=Metrics())],
+            "exported": lambda: [TelemetryPlugin(metrics=metrics, tracer=provider.get_tracer("bench"))],
+        }
+        asyncio.run(run(root, [], 20))  # Warm-up
+        best = {mode: float("inf") for mode in modes}
+        for _ in range(args.rounds):
+            for mode, plugins in modes.items():
+                best[mode] = min(best[mode], asyncio.run(run(root, plugins(), args.requests)))
+        off, noop, exported = best["off"], best["no-op"], best["exported"]
+        print(f"{agent_dir:<44}{off * 1000:>10.3f}{noop * 1000:>10.3f}{exported * 1000:>10.3f}"
+              f"   +{(noop - off) * 1e6:.0f} µs / +{(exported - off) * 1e6:.0f} µs")
+
+    provider.force_flush()
+    exporter.clear()
+    asyncio.run(run(root, [TelemetryPlugin(metrics=metrics, tracer=provider.get_tracer("bench"))], 1))
+    provider.force_flush()
+    print("\nspans of one blog pipeline request:")
+    print_tree(exporter.get_finished_spans())
+
+    print("\nsome of the Prometheus metrics:")
+    for line in metrics.render().splitlines():
+        if line.startswith(("adk_model_calls_total", "adk_tool_calls_total", "adk_model_tokens_total")):
+            print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
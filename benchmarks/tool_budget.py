@@ -0,0 +1,139 @@
+"""
+Prompt tokens and prefill time of a research turn with and without the tool output budget.
+
+    python -m benchmarks.tool_budget --prefill-rate 400
+
+Runs an agent with the journalist's tool set on a `FakeLlm` that plays a
+typical research turn: `search_web`, then `read_website` on two results in
+parallel, then `analyze_market_sentiment` on the headline, then the answer.
+The tools are offline fakes that return what the real ones return: five
+DuckDuckGo results with the formatted `sources` *and* the `raw_results`,
+10,000 characters of page text per read, and a `str(dict)` of three model
+scores.
+
+"raw" is the agent without callbacks, "budgeted" the same agent with the
+`ToolOutputBudget` from `helpful_agent_ollama/agent.py`. For each model call
+the prompt is counted with the local tokenizer and converted to prefill
+seconds at `--prefill-rate` tokens per second (llama3.1:8b on a laptop GPU
+prefills a few hundred tokens per second).
+"""
+import argparse
+import asyncio
+import json
+
+from google.adk.agents import Agent
+from google.adk.models.llm_request import LlmRequest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_common.fake_llm import FakeLlm
+from adk_common.tool_budget import ToolOutputBudget, count_tokens
+from benchmarks.harness import scripted_responder
+
+PARAGRAPH = (
+    "The central bank held its benchmark rate at 5.25% on Wednesday, citing sticky services inflation "
+    "and a labour market that has cooled more slowly than expected. Officials signalled that cuts remain "
+    "possible later in the year if price pressures ease, while markets trimmed bets on a June move. "
+)
+
+
+def search_web(query: str) -> dict:
+    """Searches the web (offline fake with the shape of the real tool)."""
+    raw_results = [
+        {"title": f"Rate decision coverage {i}", "href": f"https://news.example.com/rates/{i}",
+         "body": PARAGRAPH[:180 + 20 * i]}
+        for i in range(5)
+    ]
+    sources = "\n".join(f"Source {i + 1}: {r['title']} - {r['href']}" for i, r in enumerate(raw_results))
+    return {"status": "success", "sources": sources, "raw_results": raw_results}
+
+
+def read_website(url: str) -> dict:
+    """Reads a page (offline fake with the shape of the real tool)."""
+    text = (f"{url}\n" + PARAGRAPH * 60)[:10000]
+    return {"status": "success", "content": text + "... [content truncated]"}
+
+
+def analyze_market_sentiment(headline: str) -> str:
+    """Scores a headline with three models (offline fake with the shape of the real tool)."""
+    return str({
+        "FinBERT (Professional)": {"label": "negative", "score": 0.8123},
+        "RoBERTa (Social/Twitter)": {"label": "neutral", "score": 0.6410},
+        "DistilBERT (General)": {"label": "NEGATIVE", "score": 0.9712},
+    })
+
+
+SCRIPT = {"*": [
+    {"function_call": {"name": "search_web", "args": {"query": "central bank rate decision"}}},
+    {"function_calls": [
+        {"name": "read_website", "args": {"url": "https://news.example.com/rates/0"}},
+        {"name": "read_website", "args": {"url": "https://news.example.com/rates/1"}},
+    ]},
+    {"function_call": {"name": "analyze_market_sentiment", "args": {"headline": "Central bank holds rates"}}},
+    "The central bank held rates; sentiment across the three models is bearish.",
+]}
+
+
+def prompt_tokens(llm_request: LlmRequest) -> int:
+    """The request's contents and instruction, counted with the local tokenizer."""
+    pieces = [str(llm_request.config.system_instruction or "")] if llm_request.config else []
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                pieces.append(part.text)
+            elif part.function_call:
+                pieces.append(json.dumps({"name": part.function_call.name, "args": part.function_call.args}))
+            elif part.function_response:
+                pieces.append(json.dumps(part.function_response.response, default=str))
+    return count_tokens("\n".join(pieces))
+
+
+async def run(budget) -> tuple:
+    tokens = []
+    respond = scripted_responder(SCRIPT)
+
+    def responder(llm_request):
+        tokens.append(prompt_tokens(llm_request))
+        return respond(llm_request)
+
+    callbacks = {}
+    if budget:
+        callbacks = {"after_tool_callback": budget.after_tool_callback,
+                     "before_model_callback": budget.before_model_callback}
+    agent = Agent(name="investigative_journalist", model=FakeLlm(responder=responder),
+                  instruction="You are a senior investigative researcher.",
+                  tools=[search_web, read_website, analyze_market_sentiment], **callbacks)
+    runner = InMemoryRunner(agent=agent)
+    session = await runner.session_service.create_session(app_name=runner.app_name, user_id="bench")
+    message = types.Content(role="user", parts=[types.Part(text="What did the central bank decide today?")])
+    async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+        pass
+    session = await runner.session_service.get_session(app_name=runner.app_name, user_id="bench", session_id=session.id)
+    return tokens, session.state.get("tool_tokens", {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prefill-rate", type=float, default=400, help="prompt tokens per second")
+    parser.add_argument("--turn-budget", type=int, default=2_400)
+    args = parser.parse_args()
+
+    raw, _ = asyncio.run(run(None))
+    budget = ToolOutputBudget(turn_budget=args.turn_budget, tool_budgets={"search_web": 400, "read_website": 1_200})
+    budgeted, per_tool = asyncio.run(run(budget))
+
+    print(f"{'model call':<28}{'raw tokens':>11}{'budgeted':>10}{'prefill raw (s)':>17}{'budgeted':>10}")
+    steps = ["1. question", "2. after search_web", "3. after 2× read_website", "4. after sentiment"]
+    for step, before, after in zip(steps, raw, budgeted):
+        print(f"{step:<28}{before:>11}{after:>10}{before / args.prefill_rate:>17.2f}{after / args.prefill_rate:>10.2f}")
+    print(f"{'total':<28}{sum(raw):>11}{sum(budgeted):>10}{sum(raw) / args.prefill_rate:>17.2f}"
+          f"{sum(budgeted) / args.prefill_rate:>10.2f}")
+
+    print('\ntokens per tool (state["tool_tokens"])')
+    print(f"{'tool':<28}{'calls':>6}{'raw':>8}{'kept':>8}")
+    for tool, stats in per_tool.items():
+        print(f"{tool:<28}{stats['calls']:>6}{stats['raw_tokens']:>8}{stats['kept_tokens']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Throughput and accuracy of the finance topic gate used by `hugging_agent`.
+
+    python -m benchmarks.topic_gate --texts 200000
+
+Generates `--texts` synthetic prompts, half finance (headlines and
+questions built from templates) and half off-topic. The off-topic half
+includes traps that contain a finance keyword as part of a longer word
+("fedora", "confederate", "bestseller", "supermarket") or an everyday
+sense of one ("trade my old bike", "buy a birthday present"). It then
+checks every text with:
+
+- substring:   the old `validate_topic` (`any(k in text.lower() ...)` over 13 keywords);
+- lexicon:     `PhraseMatcher` over `FINANCE_TERMS` (whole words, one pass);
+- lexicon+nb:  the lexicon, then `NaiveBayes` for texts with no term (the agent's gate).
+
+Finally runs an agent with the gate on a few prompts and counts the model
+calls, to show that refused prompts never reach the model.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from google.adk.agents import Agent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_common.fake_llm import FakeLlm
+from adk_common.finance_lexicon import FINANCE_EXAMPLES, FINANCE_TERMS, OFF_TOPIC_EXAMPLES
+from adk_common.topic_gate import NaiveBayes, PhraseMatcher, TopicGate
+
+OLD_KEYWORDS = ['stock', 'market', 'price', 'usd', 'bitcoin', 'revenue', 'profit', 'loss', 'inflation', 'fed',
+                'trade', 'buy', 'sell']
+
+COMPANIES = ["Apple", "Nvidia", "Tesla", "Siemens", "Toyota", "Unilever", "Shopify", "Barclays", "Airbus", "Netflix"]
+FINANCE_TEMPLATES = [
+    "{c} shares jump after quarterly earnings beat estimates",
+    "{c} cuts full-year guidance as demand slows, stock falls {n}%",
+    "Is {c} a good investment after the {n}% selloff?",
+    "Analysts raise their price target on {c} to ${n}0",
+    "The Fed is expected to hold interest rates steady next week",
+    "Bond yields climb as inflation comes in hotter than expected",
+    "How will a rate cut affect my mortgage payments?",
+    "Bitcoin slides {n}% as crypto exchanges report heavy outflows",
+    "{c} announces a ${n} billion buyback and raises its dividend",
+    "Oil prices rise after OPEC agrees to extend output cuts",
+    "What does an inverted yield curve say about a recession?",
+    "{c} files for chapter 11 bankruptcy protection",
+    "Should I move my savings into treasuries or an index fund?",
+    "{c} to acquire a rival in a ${n} billion deal",
+    "Unemployment rate falls to {n}.1% as payrolls beat forecasts",
+]
+OFF_TOPIC_TEMPLATES = [
+    "Where can I buy a fedora like the one in the film?",
+    "Write a short essay on the confederate army's supply lines",
+    "Recommend a bestseller for a {n} hour flight",
+    "What time does the supermarket close on Sunday?",
+    "I want to trade my old bike for a guitar, is that fair?",
+    "Help me buy a birthday present for my sister who turns {n}",
+    "How do I sell the idea of a dog to my parents?",
+    "Give me a pizza recipe that serves {n} people",
+    "What is the best way to learn {n} new words a day?",
+    "Plan a {n} day hiking trip in the Dolomites",
+    "Why do cats knead blankets?",
+    "How do I fix a dripping kitchen tap?",
+    "Summarise the plot of Hamlet in {n} sentences",
+    "What are the rules of cricket?",
+    "Translate 'where is the train station' into Spanish",
+]
+
+
+def make_texts(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    texts = []
+    for i in range(n):
+        finance = i % 2 == 0
+        template = rng.choice(FINANCE_TEMPLATES if finance else OFF_TOPIC_TEMPLATES)
+        texts.append((template.format(c=rng.choice(COMPANIES), n=rng.randint(2, 40)), finance))
+    return texts
+
+
+def substring_check(text: str) -> bool:
+    return any(k in text.lower() for k in OLD_KEYWORDS)
+
+
+async def model_calls(gate: TopicGate, prompts: list) -> int:
+    calls = 0
+
+    def respond(llm_request):
+        nonlocal calls
+        calls += 1
+        return "Bullish: the ensemble agrees with the headline."
+
+    agent = Agent(name="HedgeFundAnalyst", model=FakeLlm(responder=respond), instruction="Analyse the headline.",
+                  before_agent_callback=gate.before_agent_callback)
+    runner = InMemoryRunner(agent=agent)
+    for i, prompt in enumerate(prompts):
+        session = await runner.session_service.create_session(app_name=runner.app_name, user_id=f"u{i}")
+        message = types.Content(role="user", parts=[types.Part(text=prompt)])
+        async for _ in runner.run_async(user_id=f"u{i}", session_id=session.id, new_message=message):
+            pass
+    return calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=200_000)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    matcher = PhraseMatcher(FINANCE_TERMS)
+    print(f"compiled {len(FINANCE_TERMS)} terms into {len(matcher._goto)} states "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+    classifier = NaiveBayes(FINANCE_EXAMPLES, OFF_TOPIC_EXAMPLES).probability
+    texts = make_texts(args.texts)
+
+    lexicon = TopicGate(matcher)
+    gated = TopicGate(matcher, classifier=classifier, threshold=args.threshold)
+    checks = [
+        ("substring", substring_check),
+        ("lexicon", lambda text: lexicon.check(text).allowed),
+        ("lexicon+nb", lambda text: gated.check(text).allowed),
+    ]
+    print(f"{'check':<12}{'texts/s':>10}{'accuracy':>10}{'finance kept':>14}{'off-topic refused':>19}")
+    for name, check in checks:
+        start = time.perf_counter()
+        verdicts = [check(text) for text, _ in texts]
+        elapsed = time.perf_counter() - start
+        kept = sum(v for v, (_, finance) in zip(verdicts, texts) if finance)
+        refused = sum(not v for v, (_, finance) in zip(verdicts, texts) if not finance)
+        finance_total = sum(finance for _, finance in texts)
+        print(f"{name:<12}{len(texts) / elapsed:>10,.0f}{(kept + refused) / len(texts):>10.1%}"
+              f"{kept / finance_total:>14.1%}{refused / (len(texts) - finance_total):>19.1%}")
+
+    gate = TopicGate(matcher, classifier=classifier, threshold=args.threshold)
+    prompts = [text for text, _ in make_texts(20, seed=1)]
+    calls = asyncio.run(model_calls(gate, prompts))
+    print(f"\nagent with the gate: {len(prompts)} prompts, {gate.stats['refused']} refused, {calls} model calls")
+
+
+if __name__ == "__main__":
+    main()
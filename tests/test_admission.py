@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from adk_common.admission import AdmissionController, AgentLimits, Overloaded
+from adk_common.telemetry import Metrics
+
+
+def controller(**limits) -> AdmissionController:
+    return AdmissionController(default=AgentLimits(**limits), metrics=Metrics())
+
+
+def test_admits_up_to_the_concurrency_right_away():
+    async def scenario():
+        admission = controller(concurrency=2, max_queue=4)
+        assert await admission.acquire("agent") == 0.0
+        assert await admission.acquire("agent") == 0.0
+        waiting = asyncio.create_task(admission.acquire("agent"))
+        await asyncio.sleep(0)
+        assert admission.depth("agent") == 1 and not waiting.done()
+        admission.release("agent")
+        assert await waiting >= 0.0
+        assert admission.depth("agent") == 0
+
+    asyncio.run(scenario())
+
+
+def test_agents_have_separate_slots():
+    async def scenario():
+        admission = controller(concurrency=1)
+        await admission.acquire("a")
+        assert await asyncio.wait_for(admission.acquire("b"), 1) == 0.0
+
+    asyncio.run(scenario())
+
+
+def test_interactive_requests_go_before_batch_ones():
+    async def scenario():
+        admission = controller(concurrency=1, max_queue=4, interactive_timeout=None)
+        await admission.acquire("agent")
+        order = []
+
+        async def request(priority):
+            await admission.acquire("agent", priority)
+            order.append(priority)
+
+        tasks = [asyncio.create_task(request("batch")), asyncio.create_task(request("interactive"))]
+        await asyncio.sleep(0)
+        admission.release("agent")
+        await asyncio.sleep(0)
+        admission.release("agent")
+        await asyncio.gather(*tasks)
+        assert order == ["interactive", "batch"]
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects_batch_and_sheds_it_for_interactive():
+    async def scenario():
+        admission = controller(concurrency=1, max_queue=1, interactive_timeout=None)
+        await admission.acquire("agent")
+        queued_batch = asyncio.create_task(admission.acquire("agent", "batch"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(Overloaded) as rejected:
+            await admission.acquire("agent", "batch")
+        assert rejected.value.reason == "queue_full"
+        assert rejected.value.retry_after >= 1
+
+        interactive = asyncio.create_task(admission.acquire("agent", "interactive"))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as shed:
+            await queued_batch
+        assert shed.value.reason == "shed"
+        admission.release("agent")
+        await interactive
+
+    asyncio.run(scenario())
+
+
+def test_turns_away_requests_that_cannot_finish_in_time():
+    async def scenario():
+        admission = controller(concurrency=1, max_queue=4)
+        await admission.acquire("agent")
+        admission.release("agent", run_seconds=10.0)  # The agent's runs take about 10 s.
+        await admission.acquire("agent")
+        with pytest.raises(Overloaded) as late:
+            await admission.acquire("agent", timeout=5.0)
+        assert late.value.reason == "deadline"
+
+    asyncio.run(scenario())
+
+
+def test_release_drops_a_waiter_whose_deadline_passed():
+    now = [0.0]
+
+    async def scenario():
+        admission = AdmissionController(default=AgentLimits(concurrency=1, max_queue=4), metrics=Metrics(),
+                                        clock=lambda: now[0])
+        await admission.acquire("agent")
+        admission.release("agent", run_seconds=1.0)
+        await admission.acquire("agent")
+        waiter = asyncio.create_task(admission.acquire("agent", timeout=5.0))
+        await asyncio.sleep(0)
+        now[0] = 4.5  # Starting now, its 1 s run would end after its deadline.
+        admission.release("agent", run_seconds=1.0)
+        with pytest.raises(Overloaded) as late:
+            await waiter
+        assert late.value.reason == "deadline"
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        admission = controller(concurrency=1, max_queue=4)
+        await admission.acquire("agent")
+        waiter = asyncio.create_task(admission.acquire("agent"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert admission.depth("agent") == 0
+
+    asyncio.run(scenario())
+
+
+def test_unknown_priority():
+    with pytest.raises(ValueError):
+        asyncio.run(controller().acquire("agent", "urgent"))
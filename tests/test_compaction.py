@@ -0,0 +1,55 @@
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from adk_common.compaction import ContextCompactor, summarize
+from adk_common.rate_limit import estimate_request_tokens
+
+DRAFT = ("Mara found the lighthouse key in her grandmother's sewing box. That night the lamp flickered on. "
+         "Boats that had vanished decades ago drifted into the harbor. Mara climbed the tower and found her "
+         "grandmother waiting at the top, holding the other key.")
+CRITIQUE = "1. The middle rushes. 2. Mara's motivation is unclear. 3. The final image needs more weight."
+
+
+def conversation(turns: int) -> list:
+    contents = [types.Content(role="user", parts=[types.Part(text="A story about a lighthouse.")])]
+    for i in range(turns):
+        contents.append(types.Content(role="model", parts=[types.Part(text=f"Revision {i}: {DRAFT * 3}")]))
+        contents.append(types.Content(role="model", parts=[types.Part(text=CRITIQUE)]))
+    return contents
+
+
+class Context:
+    def __init__(self, state):
+        self.state = state
+
+
+def test_summary_keeps_whole_sentences():
+    summary = summarize(DRAFT * 3, 200)
+    assert summary.startswith("[summary of ")
+    assert "Mara found the lighthouse key" in summary and summary.rstrip(" …").endswith("other key.")
+    assert len(summary) < len(DRAFT * 3)
+    assert summarize(CRITIQUE, 200) == CRITIQUE
+
+
+def test_request_with_its_instruction_fits_the_budget():
+    compactor = ContextCompactor(token_budget=600)
+    instruction = "Critique this story: " + DRAFT * 3
+    llm_request = LlmRequest(contents=conversation(12), config=types.GenerateContentConfig(system_instruction=instruction))
+    assert estimate_request_tokens(llm_request) > 2_000
+    compactor.before_model_callback(Context({}), llm_request)
+    assert estimate_request_tokens(llm_request) <= 600 + 2  # The digest is joined to the instruction with "\n\n".
+    assert "messages left out of the history" in llm_request.config.system_instruction
+    assert all(content.role != "user" or "left out" not in content.parts[0].text for content in llm_request.contents)
+
+
+def test_first_and_recent_messages_are_kept():
+    contents = conversation(12)
+    compacted, digest = ContextCompactor(token_budget=300).compact(contents)
+    assert compacted[0] is contents[0]
+    assert compacted[-2:] == contents[-2:]
+    assert digest.startswith("Earlier in this conversation")
+
+
+def test_small_requests_are_left_alone():
+    contents = conversation(1)
+    assert ContextCompactor(token_budget=2_000).compact(contents) == (contents, "")
@@ -0,0 +1,42 @@
+"""CpuPool: the start method of its workers."""
+import asyncio
+import gc
+import os
+import threading
+
+import pytest
+
+from adk_common.cpu_pool import CpuPool, _can_prefork
+
+
+def worker_pid() -> int:
+    return os.getpid()
+
+
+def test_pool_started_by_a_call_does_not_fork():
+    # Another thread is running when the first call starts the pool, as in a server.
+    pool = CpuPool(max_workers=1)
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+    try:
+        pid = asyncio.run(pool.run(worker_pid))
+        assert pid != os.getpid()
+        assert pool._executor._mp_context.get_start_method() != "fork"
+    finally:
+        stop.set()
+        thread.join()
+        pool.shutdown()
+    assert pool.stats["worker_pid"]["calls"] == 1
+
+
+@pytest.mark.skipif(not _can_prefork(), reason="pre-fork is Linux only")
+def test_start_forks_the_workers_after_the_preloads():
+    pool = CpuPool(max_workers=1)
+    pool.add_warm_up(worker_pid, preload=True)
+    try:
+        pool.start()
+        assert pool._executor._mp_context.get_start_method() == "fork"
+    finally:
+        pool.shutdown()
+        gc.unfreeze()  # `preload` froze the test process's objects.
@@ -0,0 +1,63 @@
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def online_training():
+    path = os.path.join(ROOT, "04-agents-to-agents-A2A", "house_price_predictor_agent", "online_training.py")
+    spec = importlib.util.spec_from_file_location("online_training", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def houses(rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.uniform(500, 5_000, rows), rng.integers(1, 6, rows), rng.uniform(1, 10, rows)])
+    y = 120 * X[:, 0] + 15_000 * X[:, 1] + 30_000 * X[:, 2] + 50_000 + rng.normal(0, 20_000, rows)
+    return X, y
+
+
+def lstsq(X, y):
+    solution = np.linalg.lstsq(np.column_stack([X, np.ones(len(y))]), y, rcond=None)[0]
+    return solution[:-1], solution[-1]
+
+
+@pytest.mark.parametrize("batch", [1, 7, 100, 1_000])
+def test_batches_match_a_full_refit(online_training, batch):
+    X, y = houses(1_000)
+    stats = online_training.RunningLeastSquares(3)
+    for start in range(0, len(y), batch):
+        stats.update(X[start:start + batch], y[start:start + batch])
+    coef, intercept = stats.solve()
+    expected_coef, expected_intercept = lstsq(X, y)
+    assert stats.n == len(y)
+    np.testing.assert_allclose(coef, expected_coef, rtol=1e-8)
+    assert intercept == pytest.approx(expected_intercept, rel=1e-8)
+
+
+def test_each_step_matches_the_rows_so_far(online_training):
+    X, y = houses(300, seed=1)
+    stats = online_training.RunningLeastSquares(3)
+    for end in (50, 120, 300):
+        stats.update(X[stats.n:end], y[stats.n:end])
+        coef, intercept = stats.solve()
+        expected_coef, expected_intercept = lstsq(X[:end], y[:end])
+        np.testing.assert_allclose(coef, expected_coef, rtol=1e-8)
+        assert intercept == pytest.approx(expected_intercept, rel=1e-8)
+
+
+def test_empty_batch_changes_nothing(online_training):
+    X, y = houses(20)
+    stats = online_training.RunningLeastSquares(3)
+    stats.update(X, y)
+    before = stats.solve()
+    stats.update(np.empty((0, 3)), np.empty(0))
+    after = stats.solve()
+    assert stats.n == 20
+    np.testing.assert_array_equal(before[0], after[0])
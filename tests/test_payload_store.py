@@ -0,0 +1,41 @@
+import asyncio
+
+from google.adk.agents import LlmAgent, SequentialAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_common.fake_llm import FakeLlm
+from adk_common.payload_store import HANDLE, PayloadPlugin, PayloadStore
+
+DRAFT = "The future of energy storage. " * 200  # ~6 KB, over `min_chars`
+
+
+def test_draft_is_offloaded_from_state_but_not_from_the_reply(tmp_path):
+    editor_instructions = []
+
+    def editor(request):
+        editor_instructions.append(request.config.system_instruction)
+        return "Edited."
+
+    writer_agent = LlmAgent(name="WriterAgent", model=FakeLlm(responder=lambda request: DRAFT),
+                            instruction="Write a draft.", output_key="blog_draft")
+    editor_agent = LlmAgent(name="EditorAgent", model=FakeLlm(responder=editor),
+                            instruction="Edit this draft: {blog_draft}")
+    plugin = PayloadPlugin(PayloadStore(str(tmp_path)), state_keys={"blog_draft"})
+    runner = InMemoryRunner(agent=SequentialAgent(name="Pipeline", sub_agents=[writer_agent, editor_agent]),
+                            app_name="blog", plugins=[plugin])
+
+    async def run():
+        session = await runner.session_service.create_session(app_name="blog", user_id="u")
+        events = [event async for event in runner.run_async(
+            user_id="u", session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text="Energy storage")]))]
+        return events, await runner.session_service.get_session(app_name="blog", user_id="u", session_id=session.id)
+
+    events, session = asyncio.run(run())
+    reply = next(event for event in events if event.author == "WriterAgent")
+    assert reply.content.parts[0].text == DRAFT  # What the user sees
+    assert HANDLE.fullmatch(reply.actions.state_delta["blog_draft"])
+    assert HANDLE.fullmatch(session.state["blog_draft"])
+    assert plugin.store.resolve(session.state["blog_draft"]) == DRAFT
+    assert DRAFT in editor_instructions[0] and "payload://" not in editor_instructions[0]
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from adk_common.fake_llm import FakeLlm
+from adk_common.rate_limit import ModelQuota, RateLimitedLlm, RateScheduler, TokenBucket
+
+MODEL = "gemini-2.5-flash-lite"
+# 20 requests per half-second window: a 30-call fan-out needs about a second.
+QUOTA = ModelQuota(requests_per_minute=20, window_seconds=0.5)
+
+
+def request(text: str = "Research this topic.") -> LlmRequest:
+    return LlmRequest(model=MODEL, contents=[types.Content(role="user", parts=[types.Part(text=text)])])
+
+
+async def call(model: RateLimitedLlm):
+    return [response async for response in model.generate_content_async(request())][-1]
+
+
+def limited(fake: FakeLlm, scheduler: RateScheduler, quota: ModelQuota = QUOTA) -> RateLimitedLlm:
+    scheduler.set_quota(MODEL, quota)
+    return RateLimitedLlm(llm=fake, scheduler=scheduler)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_reservations_queue_in_arrival_order():
+    clock = Clock()
+    bucket = TokenBucket(limit=10, window=1.0, burst=2, clock=clock)  # Refills 8 tokens/s
+    assert [bucket.reserve(1) for _ in range(2)] == [0.0, 0.0]
+    waits = [bucket.reserve(1) for _ in range(3)]
+    assert waits == sorted(waits) and waits[0] > 0
+    assert waits[-1] == 3 / 8
+    clock.now = 1.0
+    assert bucket.reserve(1) == 0.0
+
+
+def test_fan_out_gets_no_429():
+    fake = FakeLlm(model=MODEL, quota=QUOTA)
+    model = limited(fake, RateScheduler())
+
+    async def fan_out():
+        return await asyncio.gather(*(call(model) for _ in range(30)))
+
+    responses = asyncio.run(fan_out())
+    assert len(responses) == 30 and fake.calls == 30
+    assert fake.rejected == 0
+
+
+def test_without_the_scheduler_the_fan_out_gets_429s():
+    fake = FakeLlm(model=MODEL, quota=QUOTA)
+
+    async def fan_out():
+        return await asyncio.gather(*(fake.generate_content_async(request()).__anext__() for _ in range(30)),
+                                    return_exceptions=True)
+
+    asyncio.run(fan_out())
+    assert fake.rejected == 10
+
+
+def test_bucket_is_shared_across_callers():
+    # Two agents' models on the same quota, called from two threads with their own event loops.
+    fake = FakeLlm(model=MODEL, quota=QUOTA)
+    scheduler = RateScheduler()
+    models = [limited(fake, scheduler), limited(fake, scheduler)]
+
+    def branch(model):
+        async def fan_out():
+            await asyncio.gather(*(call(model) for _ in range(15)))
+        asyncio.run(fan_out())
+
+    threads = [threading.Thread(target=branch, args=(model,)) for model in models]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert fake.calls == 30 and fake.rejected == 0
+    assert scheduler.stats[MODEL]["requests"] == 30
+    assert scheduler.stats[MODEL]["waited"] > 0
+
+
+def test_queue_wait_is_reported_in_custom_metadata():
+    model = limited(FakeLlm(model=MODEL), RateScheduler())
+
+    async def fan_out():
+        return await asyncio.gather(*(call(model) for _ in range(30)))
+
+    responses = asyncio.run(fan_out())
+    waits = [(r.custom_metadata or {}).get("queue_wait_s") for r in responses]
+    assert waits[0] is None  # Within the burst: no wait to report
+    assert all(wait > 0 for wait in waits[-10:])
+    assert max(waits[-10:]) < 2.0
+
+
+def test_max_in_flight_caps_concurrent_calls():
+    fake = FakeLlm(model=MODEL, latency=0.05)
+    model = limited(fake, RateScheduler(), ModelQuota(max_in_flight=3))
+
+    async def fan_out():
+        return await asyncio.gather(*(call(model) for _ in range(12)))
+
+    responses = asyncio.run(fan_out())
+    assert fake.peak_in_flight == 3
+    assert responses[-1].custom_metadata["queue_wait_s"] > 0  # Waited for a slot
+
+
+def test_max_in_flight_is_per_event_loop():
+    fake = FakeLlm(model=MODEL, latency=0.05)
+    scheduler = RateScheduler()
+    model = limited(fake, scheduler, ModelQuota(max_in_flight=2))
+
+    async def fan_out():
+        await asyncio.gather(*(call(model) for _ in range(4)))
+
+    # Semaphores belong to the loop that created them: a second asyncio.run must not reuse the first one's.
+    asyncio.run(fan_out())
+    asyncio.run(fan_out())
+    assert fake.calls == 8 and fake.peak_in_flight == 2
@@ -0,0 +1,127 @@
+import asyncio
+import importlib
+import shutil
+
+import pytest
+import yaml
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_common.fake_llm import FakeLlm
+from adk_common.loader import load_agent_module, swap_models
+
+AGENT_DIR = "03-multiagent/research_coordinator_configuration"
+
+
+@pytest.fixture(scope="module")
+def agent_module():
+    return load_agent_module(AGENT_DIR)
+
+
+@pytest.fixture(scope="module")
+def reloader(agent_module):
+    return importlib.import_module(f"{agent_module.__package__}.reloader")
+
+
+@pytest.fixture
+def setup(agent_module, reloader, tmp_path):
+    """A runner on a fake-model copy of the pipeline, and a reloader watching a copy of its YAML."""
+    path = tmp_path / "agents.yaml"
+    shutil.copy(agent_module.CONFIG_PATH, path)
+    config = agent_module.load_config(str(path))
+    registry = {}
+    root = agent_module.build_agent("root_agent", config, registry)
+    swap_models(root, lambda agent: FakeLlm(model="gemini-2.5-flash-lite", latency=0.2,
+                                            responder=lambda request, name=agent.name: f"{name} answer"))
+    runner = InMemoryRunner(agent=root)
+    return runner, reloader.ConfigReloader(runner, config, registry, path=str(path)), path
+
+
+def edit(path, change):
+    config = yaml.safe_load(path.read_text())
+    change(config["agents"])
+    path.write_text(yaml.safe_dump(config, sort_keys=False))
+
+
+def tree(root) -> dict:
+    """{agent name: (agent, parent)} of every agent under `root`."""
+    nodes = {}
+    pending = [root]
+    while pending:
+        agent = pending.pop()
+        nodes[agent.name] = (agent, agent.parent_agent)
+        pending.extend(agent.sub_agents)
+    return nodes
+
+
+def test_reload_leaves_an_in_flight_run_on_the_old_tree(setup):
+    runner, config_reloader, path = setup
+    old_root = runner.agent
+    before = tree(old_root)
+
+    async def run_while_reloading():
+        session = await runner.session_service.create_session(app_name=runner.app_name, user_id="u")
+        message = types.Content(role="user", parts=[types.Part(text="solid-state batteries")])
+        authors = []
+        async for event in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+            if not authors:  # The researchers are running: edit the summarizer under them.
+                edit(path, lambda agents: agents["summarizer_agent"].update(instruction="Summarize: {research_findings}"))
+                assert config_reloader.reload() == ["root_agent", "summarizer_agent"]
+            authors.append(event.author)
+        return authors
+
+    authors = asyncio.run(run_while_reloading())
+    assert authors[-1] == "SummarizerAgent"
+    # The old tree is exactly as it was: same agents, same parents, lookups still work.
+    assert tree(old_root) == before
+    assert old_root.find_agent("ResearchAgent") is before["ResearchAgent"][0]
+
+    new_root = runner.agent
+    assert new_root is not old_root
+    after = tree(new_root)
+    assert set(after) == set(before)
+    assert all(after[name][0] is not before[name][0] for name in after)  # Nothing shared with the old tree
+    assert after["ResearchTeam"][1] is new_root and after["ResearchAgent"][1] is after["ResearchTeam"][0]
+    assert after["SummarizerAgent"][0].instruction == "Summarize: {research_findings}"
+    assert after["ResearchAgent"][0].model is before["ResearchAgent"][0].model  # Copied, not rebuilt
+
+
+def test_failed_rebuild_keeps_everything(setup):
+    runner, config_reloader, path = setup
+    old_root = runner.agent
+    before = tree(old_root)
+    registry = dict(config_reloader.registry)
+    edit(path, lambda agents: agents["summarizer_agent"].pop("instruction"))  # Fails in build_agent
+
+    assert config_reloader.reload() == []
+    assert runner.agent is old_root
+    assert tree(old_root) == before
+    assert config_reloader.registry == registry
+
+
+GRAPH = {"agents": {
+    "research_agent": {"tools": ["google_search"]},
+    "background_agent": {"tools": ["google_search"]},
+    "research_team": {"type": "parallel", "sub_agents": ["research_agent", "background_agent"]},
+    "summarizer_agent": {"tools": []},
+    "root_agent": {"type": "sequential", "sub_agents": ["research_team", "summarizer_agent"]},
+    "coordinator": {"tools": ["research_agent", "summarizer_agent"]},
+}}
+
+
+def test_dependents_of_a_leaf_go_up_only(reloader):
+    assert reloader._dependents(GRAPH, {"summarizer_agent"}) == {"summarizer_agent", "root_agent", "coordinator"}
+
+
+def test_dependents_skip_unchanged_siblings(reloader):
+    dirty = reloader._dependents(GRAPH, {"research_agent"})
+    assert dirty == {"research_agent", "research_team", "root_agent", "coordinator"}
+    assert "background_agent" not in dirty
+
+
+def test_dependents_of_the_root(reloader):
+    assert reloader._dependents(GRAPH, {"root_agent"}) == {"root_agent"}
+
+
+def test_dependents_of_nothing(reloader):
+    assert reloader._dependents(GRAPH, set()) == set()
@@ -0,0 +1,142 @@
+import asyncio
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from adk_common.fake_llm import FakeLlm
+from adk_common.response_cache import CachedLlm, ResponseCache, hashed_ngram_embedder
+
+
+def request(text: str, instruction: str = "Be brief.", model: str = "gemini-2.5-flash-lite") -> LlmRequest:
+    return LlmRequest(model=model, contents=[types.Content(role="user", parts=[types.Part(text=text)])],
+                      config=types.GenerateContentConfig(system_instruction=instruction))
+
+
+def answer(text: str) -> list:
+    return [LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_exact_hit_and_miss():
+    cache = ResponseCache()
+    assert cache.lookup(request("What is ADK?")) is None
+    cache.store(request("What is ADK?"), answer("A toolkit."))
+    layer, responses = cache.lookup(request("What is ADK?"))
+    assert layer == "exact" and responses[0].content.parts[0].text == "A toolkit."
+    assert cache.stats["exact_hits"] == 1 and cache.stats["misses"] == 1
+
+
+def test_key_covers_model_and_instruction():
+    cache = ResponseCache()
+    cache.store(request("What is ADK?"), answer("A toolkit."))
+    assert cache.lookup(request("What is ADK?", instruction="Be thorough.")) is None
+    assert cache.lookup(request("What is ADK?", model="gemini-2.5-pro")) is None
+
+
+def test_entries_expire_after_the_ttl():
+    clock = Clock()
+    cache = ResponseCache(ttl_seconds=60, clock=clock)
+    cache.store(request("What is ADK?"), answer("A toolkit."))
+    clock.now = 59
+    assert cache.lookup(request("What is ADK?")) is not None
+    clock.now = 61
+    assert cache.lookup(request("What is ADK?")) is None
+    assert cache.stats["expired"] == 1 and len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.store(request("a"), answer("A"))
+    cache.store(request("b"), answer("B"))
+    cache.lookup(request("a"))
+    cache.store(request("c"), answer("C"))
+    assert cache.lookup(request("b")) is None
+    assert cache.lookup(request("a")) is not None and cache.lookup(request("c")) is not None
+    assert cache.stats["evictions"] == 1
+
+
+def test_semantic_hit_needs_the_same_scope():
+    cache = ResponseCache(embedder=hashed_ngram_embedder)
+    cache.store(request("What are the latest AI trends"), answer("Agents."))
+    layer, _ = cache.lookup(request("what are the latest AI trends?"))
+    assert layer == "semantic"
+    assert cache.lookup(request("what are the latest AI trends?", instruction="Answer in French.")) is None
+    assert cache.lookup(request("How do I bake bread?")) is None
+
+
+def test_hit_rate():
+    cache = ResponseCache()
+    cache.store(request("a"), answer("A"))
+    cache.lookup(request("a"))
+    cache.lookup(request("b"))
+    assert cache.hit_rate == 0.5
+
+
+def test_generation_config_is_part_of_the_key():
+    cache = ResponseCache(embedder=hashed_ngram_embedder)
+    cold = request("What is ADK?")
+    cold.config.temperature = 0.0
+    cache.store(cold, answer("A toolkit."))
+    hot = request("What is ADK?")
+    hot.config.temperature = 1.5
+    assert cache.lookup(hot) is None
+    schema = request("What is ADK?")
+    schema.config.temperature = 0.0
+    schema.config.response_mime_type = "application/json"
+    assert cache.lookup(schema) is None
+    same = request("What is ADK?")
+    same.config.temperature = 0.0
+    assert cache.lookup(same)[0] == "exact"
+
+
+def test_requests_with_built_in_tools_are_never_cached():
+    fake = FakeLlm(model="gemini-2.5-flash-lite", responder=lambda _: "Grounded answer.")
+    model = CachedLlm(llm=fake, cache=ResponseCache(embedder=hashed_ngram_embedder))
+    searching = request("Latest AI trends")
+    searching.config.tools = [types.Tool(google_search=types.GoogleSearch())]
+
+    async def ask():
+        return [r async for r in model.generate_content_async(searching)][-1]
+
+    for _ in range(2):
+        response = asyncio.run(ask())
+        assert not (response.custom_metadata or {}).get("cache")
+    assert fake.calls == 2 and len(model.cache) == 0
+    assert model.cache.stats["bypassed"] == 2
+
+
+def test_grounded_responses_are_not_stored():
+    grounded = LlmResponse(content=types.Content(role="model", parts=[types.Part(text="Per the search...")]),
+                           grounding_metadata=types.GroundingMetadata(web_search_queries=["ai trends"]))
+    model = CachedLlm(llm=FakeLlm(responder=lambda _: grounded), cache=ResponseCache())
+
+    async def ask():
+        return [r async for r in model.generate_content_async(request("AI trends"))]
+
+    asyncio.run(ask())
+    assert len(model.cache) == 0
+
+
+def test_function_tool_turns_hit_only_with_the_same_results():
+    def turn(rate: float) -> LlmRequest:
+        llm_request = request("How much is 100 USD in EUR?")
+        llm_request.contents += [
+            types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(
+                id="call-1", name="get_exchange_rate", args={"from": "USD", "to": "EUR"}))]),
+            types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+                id="call-1", name="get_exchange_rate", response={"rate": rate}))]),
+        ]
+        return llm_request
+
+    cache = ResponseCache()
+    cache.store(turn(0.92), answer("92 EUR."))
+    assert cache.lookup(turn(0.92))[0] == "exact"
+    assert cache.lookup(turn(0.95)) is None
@@ -0,0 +1,58 @@
+import email.utils
+import time
+
+from adk_common.retry import retry_after
+
+
+class HttpError(Exception):
+    def __init__(self, headers=None, details=None):
+        super().__init__("HTTP error")
+        self.headers = headers
+        self.details = details
+
+
+class Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+def test_retry_after_seconds_header():
+    assert retry_after(HttpError(headers={"retry-after": "7"})) == 7.0
+    assert retry_after(HttpError(headers={"Retry-After": "1.5"})) == 1.5
+
+
+def test_retry_after_negative_seconds_is_zero():
+    assert retry_after(HttpError(headers={"retry-after": "-3"})) == 0.0
+
+
+def test_retry_after_http_date():
+    when = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 27 <= retry_after(HttpError(headers={"retry-after": when})) <= 30
+
+
+def test_retry_after_date_in_the_past_is_zero():
+    when = email.utils.formatdate(time.time() - 60, usegmt=True)
+    assert retry_after(HttpError(headers={"retry-after": when})) == 0.0
+
+
+def test_retry_after_malformed_header():
+    assert retry_after(HttpError(headers={"retry-after": "soon"})) is None
+
+
+def test_retry_after_from_response_headers():
+    error = HttpError()
+    error.response = Response({"retry-after": "4"})
+    assert retry_after(error) == 4.0
+
+
+def test_retry_after_gemini_retry_info():
+    details = {"error": {"details": [
+        {"@type": "type.googleapis.com/google.rpc.QuotaFailure"},
+        {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "23s"},
+    ]}}
+    assert retry_after(HttpError(details=details)) == 23.0
+
+
+def test_retry_after_without_a_hint():
+    assert retry_after(HttpError()) is None
+    assert retry_after(ValueError("no HTTP here")) is None
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import time
+
+from adk_common.tool_dispatch import ToolDispatcher
+
+
+def get_exchange_rate(base_currency: str, target_currency: str) -> dict:
+    """Looks up an exchange rate (a slow blocking call)."""
+    time.sleep(0.05)
+    return {"status": "success", "rate": 0.93}
+
+
+def test_sync_tool_calls_run_concurrently_under_the_cap():
+    dispatcher = ToolDispatcher(limits={"get_exchange_rate": 4})
+    tool = dispatcher.wrap(get_exchange_rate)
+    assert tool.__name__ == "get_exchange_rate" and tool.__doc__ == get_exchange_rate.__doc__
+
+    async def turn():
+        start = time.perf_counter()
+        results = await asyncio.gather(*(tool("USD", "EUR") for _ in range(8)))
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(turn())
+    assert all(result["rate"] == 0.93 for result in results)
+    assert elapsed < 0.3  # Two rounds of four, not eight calls in a row
+    stats = dispatcher.stats["get_exchange_rate"]
+    assert stats["calls"] == 8 and stats["peak_in_flight"] == 4
+
+
+def test_each_loop_gets_its_own_cap():
+    # Two runners in two threads, each with its own event loop, share the dispatcher.
+    dispatcher = ToolDispatcher(limits={"get_exchange_rate": 2})
+    tool = dispatcher.wrap(get_exchange_rate)
+    peaks, errors = [], []
+
+    def runner():
+        async def turns():
+            in_flight = peak = 0
+
+            async def call():
+                nonlocal in_flight, peak
+                async with dispatcher._semaphore("get_exchange_rate"):
+                    in_flight += 1
+                    peak = max(peak, in_flight)
+                    await asyncio.sleep(0.01)
+                    in_flight -= 1
+                await tool("USD", "EUR")
+
+            await asyncio.gather(*(call() for _ in range(10)))
+            return peak
+
+        try:
+            peaks.append(asyncio.run(turns()))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=runner) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert peaks == [2, 2]
+    stats = dispatcher.stats["get_exchange_rate"]
+    assert stats["calls"] == 20
+    assert stats["peak_in_flight"] <= 4  # At most the cap on each of the two loops
+    assert dispatcher._in_flight["get_exchange_rate"] == 0
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+from google.genai import types
+
+from adk_common.finance_lexicon import FINANCE_EXAMPLES, FINANCE_TERMS, OFF_TOPIC_EXAMPLES
+from adk_common.topic_gate import NaiveBayes, PhraseMatcher, TopicGate
+
+REFUSAL = "I only cover finance."
+
+
+def gate(**kwargs) -> TopicGate:
+    return TopicGate(PhraseMatcher(FINANCE_TERMS), refusal=REFUSAL, **kwargs)
+
+
+def turn(text: str, state: dict):
+    """The parts of a CallbackContext the gate reads."""
+    return SimpleNamespace(user_content=types.Content(role="user", parts=[types.Part(text=text)]), state=state)
+
+
+def test_matches_whole_words_only():
+    matcher = PhraseMatcher(["fed", "interest rate"])
+    assert matcher.first("What did the Fed do?") == "fed"
+    assert matcher.first("Where can I buy a fedora?") is None
+    assert matcher.first("Interest rates are up again") == "interest rates"
+
+
+def test_lexicon_allows_finance_and_refuses_the_rest():
+    topic_gate = gate()
+    assert topic_gate.check("Is NVIDIA overvalued after the earnings?").allowed
+    decision = topic_gate.check("Give me a recipe for banana bread")
+    assert not decision.allowed and decision.reason == "no match"
+    assert topic_gate.stats["allowed_lexicon"] == 1 and topic_gate.stats["refused"] == 1
+
+
+# Held out from the classifier's examples, and with no lexicon term in them.
+UNSEEN_FINANCE = [
+    "Is Amazon expensive after the holiday sales?",
+    "Is the chipmaker still worth buying after it cut its outlook?",
+    "What happens to growth companies when borrowing costs rise?",
+    "Did Spotify raise its outlook after the subscriber numbers?",
+]
+UNSEEN_OFF_TOPIC = [
+    "Give me a recipe for lemon cake",
+    "What's the best way to train for a marathon?",
+    "Recommend a sci-fi novel for the weekend",
+    "How do I fix a leaking kitchen tap?",
+]
+
+
+def test_classifier_catches_what_the_lexicon_misses():
+    assert all(not gate().check(prompt).allowed for prompt in UNSEEN_FINANCE)  # The lexicon alone refuses them
+    topic_gate = gate(classifier=NaiveBayes(FINANCE_EXAMPLES, OFF_TOPIC_EXAMPLES).probability, threshold=0.8)
+    for prompt in UNSEEN_FINANCE:
+        decision = topic_gate.check(prompt)
+        assert decision.allowed and decision.reason.startswith("classifier"), prompt
+    for prompt in UNSEEN_OFF_TOPIC:
+        assert not topic_gate.check(prompt).allowed, prompt
+    assert topic_gate.stats["allowed_classifier"] == len(UNSEEN_FINANCE)
+    assert topic_gate.stats["allowed_lexicon"] == 0
+
+
+def test_refused_opening_gets_the_canned_answer():
+    state = {}
+    reply = gate().before_agent_callback(turn("Write me a poem about cats", state))
+    assert reply.parts[0].text == REFUSAL
+    assert state["topic_gate"] == {"allowed": False, "reason": "no match"}
+
+
+def test_follow_ups_of_an_allowed_conversation_pass():
+    topic_gate, state = gate(), {}
+    assert topic_gate.before_agent_callback(turn("How did the stock market close?", state)) is None
+    assert topic_gate.before_agent_callback(turn("Why do the models disagree?", state)) is None
+    assert topic_gate.stats["allowed_follow_up"] == 1
+
+
+def test_without_sticky_every_turn_is_checked():
+    topic_gate, state = gate(sticky=False), {}
+    topic_gate.before_agent_callback(turn("How did the stock market close?", state))
+    assert topic_gate.before_agent_callback(turn("Why do the models disagree?", state)).parts[0].text == REFUSAL